@@ -0,0 +1,368 @@
+"""In-process caches for Sienge Financial API"""
+import os
+import json
+import hashlib
+import time
+import asyncio
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Awaitable, Callable, Hashable, Optional, Union
+import logging
+
+import psycopg
+
+from database import DB_CONFIG, execute_single
+
+logger = logging.getLogger(__name__)
+
+# Channel on which sync_sienge.py announces committed syncs (NOTIFY)
+SYNC_NOTIFY_CHANNEL = os.getenv('SYNC_NOTIFY_CHANNEL', 'sienge_data_changed')
+
+# Seconds a probed data generation is trusted before asking sync_control again
+# (only used while the LISTEN connection is down)
+DATA_GENERATION_TTL = float(os.getenv('DATA_GENERATION_TTL', '5'))
+
+# Maximum number of memoized COUNT(*) results (total_mode=cached)
+COUNT_CACHE_MAX_ENTRIES = int(os.getenv('COUNT_CACHE_MAX_ENTRIES', '1000'))
+
+# Response cache limits (per worker); RESPONSE_CACHE_MAX_ENTRIES=0 disables it
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '500'))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+
+
+# Tables rebuilt by both the income and the outcome sync
+SHARED_TABLES = ('financial_report',)
+
+
+class LRUCache:
+    """
+    Least-recently-used mapping bounded by number of entries and approximate bytes
+
+    Entries may be tagged with a data generation; reading with a different
+    generation drops the entry and counts as a miss.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: Optional[int] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key: Hashable, generation: Optional[Hashable] = None) -> Optional[Any]:
+        """Return the cached value (marking it as recently used) or None"""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        entry_generation, value, _, _ = entry
+        if generation is not None and entry_generation != generation:
+            self._remove(key)
+            self.invalidations += 1
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, generation: Optional[Hashable] = None, size: int = 0,
+            scope: Optional[tuple] = None):
+        """
+        Store a value, evicting least recently used entries above the limits
+
+        scope describes which data the value depends on, used by invalidate()
+        """
+        if self.max_entries <= 0 or (self.max_bytes is not None and size > self.max_bytes):
+            return
+
+        if key in self._data:
+            self._remove(key)
+        self._data[key] = (generation, value, size, scope)
+        self.size_bytes += size
+
+        while len(self._data) > self.max_entries or (
+            self.max_bytes is not None and self.size_bytes > self.max_bytes
+        ):
+            oldest = next(iter(self._data))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: Hashable):
+        _, _, size, _ = self._data.pop(key)
+        self.size_bytes -= size
+
+    def invalidate(self, predicate: Callable[[Optional[tuple]], bool], generation: Optional[Hashable] = None) -> int:
+        """
+        Drop the entries whose scope matches predicate
+
+        Surviving entries are re-tagged with generation (when given), since
+        they were checked against the change that produced it.
+
+        Returns:
+            Number of entries dropped
+        """
+        dropped = 0
+        for key in list(self._data):
+            entry_generation, value, size, scope = self._data[key]
+            if predicate(scope):
+                self._remove(key)
+                dropped += 1
+            elif generation is not None:
+                self._data[key] = (generation, value, size, scope)
+        self.invalidations += dropped
+        return dropped
+
+    def clear(self):
+        """Drop every entry"""
+        self._data.clear()
+        self.size_bytes = 0
+
+    def stats(self) -> dict:
+        """Return size and hit/miss/eviction counters"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._data),
+            'max_entries': self.max_entries,
+            'size_bytes': self.size_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations
+        }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+count_cache = LRUCache(COUNT_CACHE_MAX_ENTRIES)
+response_cache = LRUCache(RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_MAX_BYTES)
+
+_generation: Optional[tuple] = None
+_generation_checked_at = 0.0
+_listener_task: Optional[asyncio.Task] = None
+_listener_connected = False
+_notifications_received = 0
+
+
+async def probe_data_generation() -> tuple:
+    """Read the current data generation from sync_control"""
+    result = await execute_single(
+        "SELECT COUNT(*) AS syncs, MAX(id) AS last_id FROM sync_control WHERE status = 'success'"
+    )
+    return (result['syncs'], result['last_id']) if result else (0, None)
+
+
+async def get_data_generation() -> tuple:
+    """
+    Return the current data generation
+
+    The generation changes whenever a sync_control row turns 'success', i.e.
+    whenever sync_sienge.py commits new data. While the LISTEN connection is
+    up the generation is advanced by sync notifications; otherwise it is
+    probed at most every DATA_GENERATION_TTL seconds.
+    """
+    global _generation, _generation_checked_at
+    now = time.monotonic()
+    if _listener_connected and _generation is not None:
+        return _generation
+
+    if _generation is None or now - _generation_checked_at >= DATA_GENERATION_TTL:
+        generation = await probe_data_generation()
+        if _generation is not None and generation != _generation:
+            # New data landed: drop everything computed from the old generation
+            logger.info(f"Data generation changed {_generation} -> {generation}, clearing caches")
+            response_cache.clear()
+            count_cache.clear()
+        _generation = generation
+        _generation_checked_at = now
+    return _generation
+
+
+def scope_affected(scope: Optional[tuple], table: str, date_field: str,
+                   window_start: date, window_end: date) -> bool:
+    """
+    Tell whether a cached result with this scope can change after a sync
+
+    Args:
+        scope: (table, date_field, start_date, end_date) of the cached result, or None
+        table: Table written by the sync
+        date_field: Date field the sync window selects on
+        window_start: Sync window start
+        window_end: Sync window end
+    """
+    if scope is None:
+        return True
+    scope_table, scope_field, scope_start, scope_end = scope
+    if scope_table != table and scope_table not in SHARED_TABLES:
+        return False
+    if scope_field != date_field:
+        # Filtered on another date, synced rows may fall anywhere in it
+        return True
+    return (scope_start is None or scope_start <= window_end) and \
+        (scope_end is None or scope_end >= window_start)
+
+
+async def handle_sync_notification(payload: str):
+    """Invalidate the cache entries affected by a sync notification"""
+    global _generation, _generation_checked_at, _notifications_received
+    _notifications_received += 1
+    try:
+        message = json.loads(payload)
+        table = f"{message['data_type']}_data"
+        date_field = message.get('date_field', 'issue_date')
+        window_start = date.fromisoformat(message['start_date'])
+        window_end = date.fromisoformat(message['end_date'])
+    except (ValueError, TypeError, KeyError) as e:
+        logger.warning(f"Invalid sync notification ({e}), clearing caches: {payload}")
+        response_cache.clear()
+        count_cache.clear()
+        _generation = None
+        return
+
+    generation = await probe_data_generation()
+
+    def affected(scope):
+        return scope_affected(scope, table, date_field, window_start, window_end)
+
+    dropped = response_cache.invalidate(affected, generation) + count_cache.invalidate(affected, generation)
+    _generation = generation
+    _generation_checked_at = time.monotonic()
+    logger.info(
+        f"Sync notification for {table} {window_start}..{window_end}: "
+        f"dropped {dropped} cache entries, generation {generation}"
+    )
+
+
+async def listen_for_syncs():
+    """Hold a LISTEN connection and apply sync notifications, reconnecting on failure"""
+    global _listener_connected, _generation
+    backoff = 1
+    while True:
+        try:
+            conn = await psycopg.AsyncConnection.connect(**DB_CONFIG, autocommit=True)
+            async with conn:
+                await conn.execute(f"LISTEN {SYNC_NOTIFY_CHANNEL}")
+                # Changes missed while disconnected: start from a fresh generation
+                response_cache.clear()
+                count_cache.clear()
+                _generation = await probe_data_generation()
+                _listener_connected = True
+                backoff = 1
+                logger.info(f"Listening for sync notifications on '{SYNC_NOTIFY_CHANNEL}'")
+                async for notify in conn.notifies():
+                    await handle_sync_notification(notify.payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Sync listener disconnected ({e}), retrying in {backoff}s")
+        finally:
+            _listener_connected = False
+        await asyncio.sleep(backoff)
+        backoff = min(backoff * 2, 60)
+
+
+def start_sync_listener():
+    """Start the background LISTEN task (called at app startup)"""
+    global _listener_task
+    if _listener_task is None:
+        _listener_task = asyncio.create_task(listen_for_syncs())
+
+
+async def stop_sync_listener():
+    """Cancel the background LISTEN task (called at app shutdown)"""
+    global _listener_task
+    if _listener_task is not None:
+        _listener_task.cancel()
+        try:
+            await _listener_task
+        except asyncio.CancelledError:
+            pass
+        _listener_task = None
+
+
+def get_listener_stats() -> dict:
+    """Return sync listener state"""
+    return {
+        'channel': SYNC_NOTIFY_CHANNEL,
+        'connected': _listener_connected,
+        'notifications_received': _notifications_received,
+        'generation': list(_generation) if _generation is not None else None
+    }
+
+
+async def cached_call(key: Hashable, compute: Callable[[], Awaitable[Any]],
+                      scope: Union[tuple, Callable[[Any], tuple], None] = None) -> Any:
+    """
+    Return the response cached under key for the current data generation,
+    or compute, cache and return it
+
+    Args:
+        key: Hashable key built from the route and its normalized parameters
+        compute: Coroutine function producing the response on a miss
+        scope: (table, date_field, start_date, end_date) the response depends on,
+            or a function deriving it from the response (None = any sync)
+    """
+    if response_cache.max_entries <= 0:
+        return await compute()
+
+    generation = await get_data_generation()
+    value = response_cache.get(key, generation)
+    if value is not None:
+        return value
+
+    value = await compute()
+    if value is not None:
+        if callable(scope):
+            scope = scope(value)
+        response_cache.set(key, value, generation, size=estimate_size(value), scope=scope)
+    return value
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate in-memory footprint of a cached response, in bytes"""
+    data = getattr(value, 'data', value)
+    return len(repr(data))
+
+
+def normalize_filters(filters: dict) -> tuple:
+    """Build an order-independent, hashable key from a filters dictionary"""
+    return tuple(sorted((k, str(v)) for k, v in filters.items() if v is not None))
+
+
+def negotiated_encoding(accept_encoding: str) -> str:
+    """Content-Encoding the compression middleware will pick for this Accept-Encoding"""
+    accept_encoding = accept_encoding.lower()
+    if 'br' in accept_encoding:
+        return 'br'
+    if 'gzip' in accept_encoding:
+        return 'gzip'
+    return 'identity'
+
+
+def build_etag(generation: Hashable, path: str, query_items: list, encoding: str) -> str:
+    """
+    Strong ETag of a GET response: same data generation + same request = same bytes
+
+    The negotiated encoding is part of the tag, since the compressed and
+    uncompressed representations differ byte for byte.
+    """
+    source = json.dumps([list(generation) if isinstance(generation, tuple) else generation,
+                         path, sorted(query_items), encoding], default=str)
+    return '"' + hashlib.sha256(source.encode()).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Evaluate If-None-Match against an ETag (weak comparison, as RFC 9110 requires)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(','))
+    return any(tag.removeprefix('W/') == etag for tag in candidates)
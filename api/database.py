@@ -1,8 +1,17 @@
 """Database connection and utilities for Sienge Financial API"""
 import os
+import json
+import asyncio
+import base64
+import uuid
+from collections import Counter
+from datetime import timedelta
+from functools import lru_cache
 import psycopg
-from psycopg.rows import dict_row
-from typing import Optional
+from psycopg.rows import dict_row, tuple_row
+from psycopg.types.string import TextLoader
+from psycopg_pool import AsyncConnectionPool
+from typing import Any, AsyncIterator, Awaitable, Callable, Hashable, Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -17,17 +26,145 @@ DB_CONFIG = {
 }
 
 
-def get_db_connection():
-    """Create and return a new database connection with dict_row factory"""
-    try:
-        conn = psycopg.connect(**DB_CONFIG, row_factory=dict_row)
-        return conn
-    except psycopg.Error as e:
-        logger.error(f"Failed to connect to database: {e}")
-        raise
+# Connection pool settings from environment
+POOL_CONFIG = {
+    'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '2')),
+    'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+    'timeout': float(os.getenv('DB_POOL_TIMEOUT', '10')),            # seconds to wait for a free connection
+    'max_idle': float(os.getenv('DB_POOL_MAX_IDLE', '300')),          # close idle connections above min_size
+    'max_lifetime': float(os.getenv('DB_POOL_MAX_LIFETIME', '3600')),  # recycle connections periodically
+}
+
+# Server-side prepared statements: a query text executed DB_PREPARE_THRESHOLD
+# times on a connection is prepared there, later executions skip parse/plan.
+# 'none' disables preparing (required behind PgBouncer in transaction mode).
+_prepare_threshold = os.getenv('DB_PREPARE_THRESHOLD', '2')
+PREPARE_THRESHOLD = None if _prepare_threshold.lower() == 'none' else int(_prepare_threshold)
+# Prepared statements kept per connection (least recently used are deallocated)
+PREPARED_MAX = int(os.getenv('DB_PREPARED_MAX', '200'))
+
+pool: Optional[AsyncConnectionPool] = None
+
+
+async def open_pool():
+    """Create the async connection pool and wait for min_size connections (called at app startup)"""
+    global pool
+    if pool is not None:
+        return pool
+
+    pool = AsyncConnectionPool(
+        kwargs={**DB_CONFIG, 'row_factory': dict_row, 'prepare_threshold': PREPARE_THRESHOLD},
+        configure=configure_connection,
+        min_size=POOL_CONFIG['min_size'],
+        max_size=POOL_CONFIG['max_size'],
+        timeout=POOL_CONFIG['timeout'],
+        max_idle=POOL_CONFIG['max_idle'],
+        max_lifetime=POOL_CONFIG['max_lifetime'],
+        check=AsyncConnectionPool.check_connection,
+        name='sienge_api',
+        open=False
+    )
+    await pool.open(wait=True, timeout=POOL_CONFIG['timeout'])
+    logger.info(f"Database pool opened (min={POOL_CONFIG['min_size']}, max={POOL_CONFIG['max_size']})")
+    return pool
+
+
+async def configure_connection(conn):
+    """Per-connection setup of pooled connections"""
+    conn.prepared_max = PREPARED_MAX
+
+
+async def close_pool():
+    """Close the connection pool (called at app shutdown)"""
+    global pool
+    if pool is not None:
+        await pool.close()
+        pool = None
+        logger.info("Database pool closed")
+
+
+def get_pool_stats() -> dict:
+    """Return pool statistics (size, available, waiting, usage counters)"""
+    if pool is None:
+        return {'status': 'closed'}
+    return {'status': 'open', **pool.get_stats()}
+
+
+async def get_db_connection():
+    """Return the pool, opening it on first use, to borrow connections with `async with pool.connection()`"""
+    if pool is None:
+        await open_pool()
+    return pool
+
+
+# Coalesce identical queries running at the same time into one execution
+QUERY_COALESCING = os.getenv('QUERY_COALESCING', 'true').lower() in ('true', '1', 'yes')
+
+
+class SingleFlight:
+    """
+    Run at most one execution per key at a time, sharing its result with
+    every caller that asks for the same key while it is in flight
+
+    Each waiter awaits a shielded task, so a cancelled request (client gone)
+    does not cancel the execution the others are waiting on.
+    """
 
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.executions = 0
+        self.coalesced = 0
+        self._in_flight: dict = {}
 
-def execute_query(query: str, params: Optional[tuple] = None):
+    async def run(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the result of compute(), joining an in-flight execution of the same key"""
+        if not self.enabled:
+            return await compute()
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task)
+
+        task = asyncio.ensure_future(compute())
+        self._in_flight[key] = task
+        self.executions += 1
+        task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Future):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved when every waiter was cancelled
+            task.exception()
+
+    def stats(self) -> dict:
+        """Return execution/coalescing counters"""
+        requests = self.executions + self.coalesced
+        return {
+            'enabled': self.enabled,
+            'in_flight': len(self._in_flight),
+            'executions': self.executions,
+            'coalesced': self.coalesced,
+            'coalesce_rate': round(self.coalesced / requests, 4) if requests else None
+        }
+
+
+query_flight = SingleFlight(QUERY_COALESCING)
+
+
+def query_key(kind: str, query: str, params: Optional[tuple]) -> tuple:
+    """Single-flight key of a query: whitespace-normalized SQL and its parameters"""
+    return (kind, ' '.join(query.split()), repr(params or ()))
+
+
+def get_coalescing_stats() -> dict:
+    """Return single-flight statistics of execute_query / execute_single"""
+    return query_flight.stats()
+
+
+async def execute_query(query: str, params: Optional[tuple] = None):
     """
     Execute a SELECT query and return results as list of dicts
 
@@ -38,22 +175,21 @@ def execute_query(query: str, params: Optional[tuple] = None):
     Returns:
         List of dictionaries with query results
     """
-    conn = None
-    try:
-        conn = get_db_connection()
-        with conn.cursor() as cur:
-            cur.execute(query, params or ())
-            results = cur.fetchall()
-            return results
-    except psycopg.Error as e:
-        logger.error(f"Database query failed: {e}")
-        raise
-    finally:
-        if conn:
-            conn.close()
+    async def fetch():
+        try:
+            db_pool = await get_db_connection()
+            async with db_pool.connection() as conn:
+                async with conn.cursor() as cur:
+                    await cur.execute(query, params or ())
+                    return await cur.fetchall()
+        except psycopg.Error as e:
+            logger.error(f"Database query failed: {e}")
+            raise
+
+    return await query_flight.run(query_key('all', query, params), fetch)
 
 
-def execute_single(query: str, params: Optional[tuple] = None):
+async def execute_single(query: str, params: Optional[tuple] = None):
     """
     Execute a SELECT query and return single result as dict
 
@@ -64,59 +200,1083 @@ def execute_single(query: str, params: Optional[tuple] = None):
     Returns:
         Dictionary with single query result or None if not found
     """
-    conn = None
-    try:
-        conn = get_db_connection()
-        with conn.cursor() as cur:
-            cur.execute(query, params or ())
-            result = cur.fetchone()
-            return result
-    except psycopg.Error as e:
-        logger.error(f"Database query failed: {e}")
-        raise
-    finally:
-        if conn:
-            conn.close()
+    async def fetch():
+        try:
+            db_pool = await get_db_connection()
+            async with db_pool.connection() as conn:
+                async with conn.cursor() as cur:
+                    await cur.execute(query, params or ())
+                    return await cur.fetchone()
+        except psycopg.Error as e:
+            logger.error(f"Database query failed: {e}")
+            raise
+
+    return await query_flight.run(query_key('one', query, params), fetch)
+
 
+# Rows fetched per round trip by streaming exports
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '2000'))
 
-def build_where_clause(filters: dict, date_field: str = 'due_date') -> tuple[str, list]:
+# Exports streaming at once (per worker). Each one holds a pooled connection for
+# as long as the client takes to download, so they may only use part of the pool
+EXPORT_MAX_CONCURRENT = int(os.getenv('EXPORT_MAX_CONCURRENT', '2'))
+export_slots = asyncio.Semaphore(EXPORT_MAX_CONCURRENT)
+
+
+async def stream_query(query: str, params: Optional[tuple] = None,
+                       batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[list]:
+    """
+    Stream a SELECT query in batches through a named server-side cursor
+
+    Memory stays bounded by batch_size whatever the result size. The pooled
+    connection is held until the iteration ends or is closed, i.e. at the
+    client's download pace; at most EXPORT_MAX_CONCURRENT streams hold one,
+    the others wait for a slot.
+
+    Args:
+        query: SQL query string
+        params: Query parameters (optional)
+        batch_size: Rows fetched per round trip
+
+    Yields:
+        Lists of dictionaries with up to batch_size rows
+    """
+    db_pool = await get_db_connection()
+    async with export_slots, db_pool.connection() as conn:
+        async with conn.cursor(name=f"export_{uuid.uuid4().hex}") as cur:
+            await cur.execute(query, params or ())
+            while True:
+                rows = await cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+
+
+def columnar_cursor(cur):
+    """
+    Configure a cursor for columnar encoding: tuple rows, JSON/JSONB kept as text
+
+    Skipping the per-row dict and the JSON decode lets Arrow/Parquet batches be
+    built straight from the fetched tuples.
+    """
+    cur.row_factory = tuple_row
+    cur.adapters.register_loader('json', TextLoader)
+    cur.adapters.register_loader('jsonb', TextLoader)
+    return cur
+
+
+async def execute_columns(query: str, params: Optional[tuple] = None) -> tuple[list, list]:
+    """
+    Execute a bounded SELECT query for columnar encoding
+
+    Args:
+        query: SQL query string
+        params: Query parameters (optional)
+
+    Returns:
+        (cursor description, list of row tuples)
+    """
+    db_pool = await get_db_connection()
+    async with db_pool.connection() as conn:
+        async with conn.cursor() as cur:
+            columnar_cursor(cur)
+            await cur.execute(query, params or ())
+            return list(cur.description), await cur.fetchall()
+
+
+async def stream_columns(query: str, params: Optional[tuple] = None,
+                         batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[tuple[list, list]]:
+    """
+    Stream a SELECT query for columnar encoding through a named server-side cursor
+
+    Same as stream_query (including the EXPORT_MAX_CONCURRENT limit), but
+    rows are tuples and JSON/JSONB stays as text.
+    The first batch is always yielded (possibly empty) so the column layout
+    is known even when nothing matches.
+
+    Yields:
+        (cursor description, list of up to batch_size row tuples)
+    """
+    db_pool = await get_db_connection()
+    async with export_slots, db_pool.connection() as conn:
+        async with conn.cursor(name=f"export_{uuid.uuid4().hex}") as cur:
+            columnar_cursor(cur)
+            await cur.execute(query, params or ())
+            description = list(cur.description)
+            first = True
+            while True:
+                rows = await cur.fetchmany(batch_size)
+                if not rows and not first:
+                    break
+                first = False
+                yield description, rows
+                if not rows:
+                    break
+
+
+async def estimate_count(table: str, where_clause: str, params: Optional[tuple] = None) -> int:
+    """
+    Estimate the number of matching rows from the planner (no table scan)
+
+    Args:
+        table: Table name
+        where_clause: WHERE clause built by build_where_clause
+        params: Query parameters (optional)
+
+    Returns:
+        Planner row estimate for the filtered query
+    """
+    result = await execute_single(f"EXPLAIN (FORMAT JSON) SELECT 1 FROM {table} WHERE {where_clause}", params)
+    plan = result['QUERY PLAN'] if result else None
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows']) if plan else 0
+
+
+# Filters that are not a plain column: name -> condition template
+FILTER_CONDITIONS = {
+    'start_date': '{date_field} >= %s',
+    'end_date': '{date_field} <= %s',
+    'min_amount': 'original_amount >= %s',
+    'max_amount': 'original_amount <= %s',
+}
+
+
+# Distinct filter combinations counted by the workload log (index advisor input)
+FILTER_PATTERNS_MAX = int(os.getenv('FILTER_PATTERNS_MAX', '1000'))
+
+# (table, sorted filter names, date field) -> number of queries built with it
+filter_patterns: Counter = Counter()
+
+
+def record_filter_pattern(table: Optional[str], fields: tuple, date_field: str):
+    """Count one query shape; new shapes are ignored once FILTER_PATTERNS_MAX is reached"""
+    key = (table, fields, date_field)
+    if key in filter_patterns or len(filter_patterns) < FILTER_PATTERNS_MAX:
+        filter_patterns[key] += 1
+
+
+def get_filter_patterns(top: Optional[int] = None) -> list[dict]:
+    """
+    Return the most used filter combinations, most used first
+
+    Every list is ordered by {date_field} DESC, id, so each entry is the
+    shape of an index that would serve the query in order:
+    scripts/index_advisor.py reads them from /api/stats.
+    """
+    return [
+        {'table': table, 'filters': list(fields), 'date_field': date_field, 'count': count}
+        for (table, fields, date_field), count in filter_patterns.most_common(top)
+    ]
+
+
+@lru_cache(maxsize=1024)
+def where_template(fields: tuple, date_field: str) -> str:
+    """
+    Parameterized WHERE clause of one filter combination
+
+    The same combination always yields the same SQL text, so the queries
+    built on it are prepared once per pooled connection and reused.
+
+    Args:
+        fields: Sorted, validated filter names
+        date_field: Validated date field of the start_date/end_date filters
+    """
+    conditions = []
+    for field in fields:
+        if field in FILTER_CONDITIONS:
+            conditions.append(FILTER_CONDITIONS[field].format(date_field=date_field))
+        elif field.endswith('_name'):
+            # Partial, case-insensitive match (trigram-indexed)
+            conditions.append(f"{field} ILIKE %s")
+        else:
+            conditions.append(f"{field} = %s")
+    return " AND ".join(conditions) if conditions else "TRUE"
+
+
+def build_where_clause(filters: dict, date_field: str, table: str) -> tuple[str, list]:
     """
     Build WHERE clause from filters dictionary
 
+    Filter names and the date field are checked against whitelists before
+    being placed in the SQL; values are always parameters.
+
     Args:
         filters: Dictionary of field_name: value pairs
-        date_field: Name of the date field to use for date range filtering (default: 'due_date')
+        date_field: Name of the date field to use for date range filtering
+        table: Table the clause applies to (key of FILTER_TABLE_COLUMNS); its
+            columns and date fields are the allowed ones
 
     Returns:
         Tuple of (where_clause_string, parameters_list)
+
+    Raises:
+        ValueError: If the date field or a filter name is not allowed
     """
-    conditions = []
-    params = []
-
-    for field, value in filters.items():
-        if value is not None:
-            # Handle LIKE queries for text fields ending with _name
-            if isinstance(value, str) and field.endswith('_name'):
-                conditions.append(f"{field} ILIKE %s")
-                params.append(f"%{value}%")
-            # Handle date range queries with dynamic date field
-            elif field == 'start_date':
-                conditions.append(f"{date_field} >= %s")
-                params.append(value)
-            elif field == 'end_date':
-                conditions.append(f"{date_field} <= %s")
-                params.append(value)
-            # Handle amount range queries
-            elif field == 'min_amount':
-                conditions.append("original_amount >= %s")
-                params.append(value)
-            elif field == 'max_amount':
-                conditions.append("original_amount <= %s")
-                params.append(value)
-            # Handle exact matches
-            else:
-                conditions.append(f"{field} = %s")
-                params.append(value)
-
-    where_clause = " AND ".join(conditions) if conditions else "TRUE"
-    return where_clause, params
\ No newline at end of file
+    date_fields = TABLE_DATE_FIELDS[table]
+    if date_field not in date_fields:
+        raise ValueError(f"Invalid date field '{date_field}'. Allowed: {', '.join(date_fields)}")
+    allowed = FILTER_TABLE_COLUMNS[table]
+
+    fields = tuple(sorted(field for field, value in filters.items() if value is not None))
+    invalid = [field for field in fields if field not in FILTER_CONDITIONS and field not in allowed]
+    if invalid:
+        raise ValueError(f"Invalid filter(s): {', '.join(invalid)}")
+
+    record_filter_pattern(table, fields, date_field)
+    params = [
+        f"%{filters[field]}%" if field.endswith('_name') else filters[field]
+        for field in fields
+    ]
+    return where_template(fields, date_field), params
+
+
+def get_query_template_stats() -> dict:
+    """Return WHERE template cache and prepared statement settings"""
+    info = where_template.cache_info()
+    return {
+        'where_templates': info.currsize,
+        'template_hits': info.hits,
+        'template_misses': info.misses,
+        'prepare_threshold': PREPARE_THRESHOLD,
+        'prepared_max': PREPARED_MAX,
+        'filter_patterns': len(filter_patterns)
+    }
+
+
+def encode_cursor(row: dict, date_field: str) -> str:
+    """
+    Encode the keyset position of a row as an opaque cursor
+
+    Args:
+        row: Last row of the current page
+        date_field: Date field used for ordering
+
+    Returns:
+        URL-safe token with (date_field, date value, id[, record_type])
+    """
+    value = row.get(date_field)
+    payload = {
+        'f': date_field,
+        'v': value.isoformat() if value is not None else None,
+        'id': row['id']
+    }
+    if 'record_type' in row:
+        # Unified (income + outcome) listing: ids are only unique per record type
+        payload['t'] = row['record_type']
+    token = base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode())
+    return token.decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, date_field: str) -> tuple[Optional[str], str]:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Args:
+        cursor: Opaque cursor token
+        date_field: Date field of the current request (must match the cursor)
+
+    Returns:
+        Tuple of (date value or None, id)
+
+    Raises:
+        ValueError: If the cursor is malformed or was issued for another date_field
+    """
+    payload = decode_cursor_payload(cursor, date_field)
+    return payload['v'], payload['id']
+
+
+def decode_cursor_payload(cursor: str, date_field: str) -> dict:
+    """Decode and validate the payload of a cursor (see decode_cursor)"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        field, value, row_id = payload['f'], payload['v'], payload['id']
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError("Invalid cursor") from e
+
+    if field != date_field:
+        raise ValueError(f"Cursor was issued for date_field '{field}', not '{date_field}'")
+    if not isinstance(row_id, str) or (value is not None and not isinstance(value, str)):
+        raise ValueError("Invalid cursor")
+
+    return payload
+
+
+def build_keyset_clause(value: Optional[str], row_id: str, date_field: str = 'due_date') -> tuple[str, list]:
+    """
+    Build the seek condition for rows after a cursor position
+
+    Matches the list ordering `{date_field} DESC, id` (PostgreSQL sorts NULLs
+    first on DESC, so NULL dates come before every dated row).
+
+    Args:
+        value: Date value of the last row seen (None if it was NULL)
+        row_id: id of the last row seen
+        date_field: Date field used for ordering
+
+    Returns:
+        Tuple of (condition_string, parameters_list)
+    """
+    if value is None:
+        return f"(({date_field} IS NULL AND id > %s) OR {date_field} IS NOT NULL)", [row_id]
+    return f"({date_field} < %s OR ({date_field} = %s AND id > %s))", [value, value, row_id]
+
+
+# Date columns accepted for date_field/period_field
+DATE_FIELDS = ('due_date', 'issue_date', 'bill_date', 'installment_base_date', 'payment_date')
+
+# Aggregation dimensions: group_by name -> columns (per table when they differ)
+AGGREGATE_DIMENSIONS = {
+    'company': ['company_id', 'company_name'],
+    'project': ['project_id', 'project_name'],
+    'business_area': ['business_area_id', 'business_area_name'],
+    'cost_center': ['cost_center_name'],
+    'status_parcela': ['status_parcela'],
+}
+AGGREGATE_TABLE_DIMENSIONS = {
+    'income_data': {'client': ['client_id', 'client_name']},
+    'outcome_data': {'creditor': ['creditor_id', 'creditor_name'],
+                     'authorization_status': ['authorization_status']},
+}
+
+# Aggregation metrics: name -> SQL expression
+AGGREGATE_METRICS = {
+    'count': 'COUNT(*)',
+    'sum_original_amount': 'SUM(original_amount)',
+    'avg_original_amount': 'ROUND(AVG(original_amount), 2)',
+    'sum_balance_amount': 'SUM(balance_amount)',
+    'avg_balance_amount': 'ROUND(AVG(balance_amount), 2)',
+    'sum_corrected_balance_amount': 'SUM(corrected_balance_amount)',
+    'avg_corrected_balance_amount': 'ROUND(AVG(corrected_balance_amount), 2)',
+}
+
+DEFAULT_AGGREGATE_METRICS = ['count', 'sum_original_amount', 'sum_balance_amount']
+
+PERIODS = ('day', 'week', 'month')
+
+# Monthly rollups maintained by sync_sienge.py (due_date month grain)
+ROLLUP_TABLES = {
+    'income_data': 'income_rollup_monthly',
+    'outcome_data': 'outcome_rollup_monthly',
+}
+ROLLUP_METRICS = {
+    'count': 'SUM(record_count)',
+    'sum_original_amount': 'SUM(sum_original_amount)',
+    'sum_balance_amount': 'SUM(sum_balance_amount)',
+    'sum_corrected_balance_amount': 'SUM(sum_corrected_balance_amount)',
+}
+ROLLUP_FILTERS = ('company_id', 'company_name', 'project_id', 'business_area_id', 'start_date', 'end_date')
+
+
+def validate_date_field(date_field: str) -> str:
+    """
+    Validate a date column name against DATE_FIELDS
+
+    Raises:
+        ValueError: If the column is not an allowed date field
+    """
+    if date_field not in DATE_FIELDS:
+        raise ValueError(f"Invalid date field '{date_field}'. Allowed: {', '.join(DATE_FIELDS)}")
+    return date_field
+
+
+def parse_list_param(value: Optional[str]) -> list[str]:
+    """Split a comma-separated query parameter into trimmed, non-empty items"""
+    return [item.strip() for item in (value or '').split(',') if item.strip()]
+
+
+def build_group_select(group_by: list[str], dimensions: dict, metrics: list[str],
+                       metric_expressions: dict, period_expression: Optional[str]) -> tuple[str, str]:
+    """
+    Build the SELECT ... GROUP BY ... ORDER BY tail of an aggregate query
+
+    Args:
+        group_by: Dimension names, 'period' included
+        dimensions: Allowed dimension name -> columns
+        metrics: Metric names
+        metric_expressions: Allowed metric name -> SQL expression
+        period_expression: SQL expression for the period column
+
+    Returns:
+        Tuple of (select list, " GROUP BY ... ORDER BY ..." suffix or empty string)
+
+    Raises:
+        ValueError: If a dimension or metric is not allowed
+    """
+    select_columns = []
+    group_columns = []
+    order_columns = []
+    for name in group_by:
+        if name == 'period':
+            select_columns.append(f"{period_expression} AS period")
+            group_columns.append('period')
+            order_columns.append('period DESC')
+        elif name in dimensions:
+            select_columns.extend(dimensions[name])
+            group_columns.extend(dimensions[name])
+            order_columns.extend(dimensions[name])
+        else:
+            raise ValueError(f"Invalid group_by '{name}'. Allowed: period, {', '.join(dimensions)}")
+
+    for name in metrics:
+        if name not in metric_expressions:
+            raise ValueError(f"Invalid metric '{name}'. Allowed: {', '.join(metric_expressions)}")
+        select_columns.append(f"{metric_expressions[name]} AS {name}")
+
+    suffix = ''
+    if group_columns:
+        suffix = f" GROUP BY {', '.join(group_columns)} ORDER BY {', '.join(order_columns)}"
+    return ', '.join(select_columns), suffix
+
+
+def build_aggregate_query(table: str, where_clause: str, group_by: list[str], metrics: list[str],
+                          period: str = 'month', period_field: str = 'due_date') -> str:
+    """
+    Build a GROUP BY query from whitelisted dimensions and metrics
+
+    Args:
+        table: income_data or outcome_data
+        where_clause: WHERE clause built by build_where_clause
+        group_by: Dimension names (AGGREGATE_DIMENSIONS, table dimensions or 'period')
+        metrics: Metric names (AGGREGATE_METRICS)
+        period: Period granularity when grouping by 'period' (day, week, month)
+        period_field: Date column truncated to the period
+
+    Returns:
+        SQL query string (without LIMIT)
+
+    Raises:
+        ValueError: If a dimension, metric, period or date field is not allowed
+    """
+    dimensions = {**AGGREGATE_DIMENSIONS, **AGGREGATE_TABLE_DIMENSIONS.get(table, {})}
+    group_by = list(dict.fromkeys(group_by))
+    metrics = list(dict.fromkeys(metrics or DEFAULT_AGGREGATE_METRICS))
+
+    if 'period' in group_by:
+        if period not in PERIODS:
+            raise ValueError(f"Invalid period '{period}'. Allowed: {', '.join(PERIODS)}")
+        validate_date_field(period_field)
+
+    select_list, suffix = build_group_select(
+        group_by, dimensions, metrics, AGGREGATE_METRICS,
+        f"DATE_TRUNC('{period}', {period_field})::DATE"
+    )
+    return f"SELECT {select_list} FROM {table} WHERE {where_clause}{suffix}"
+
+
+def build_rollup_query(table: str, filters: dict, date_field: str, group_by: list[str], metrics: list[str],
+                       period: str = 'month', period_field: str = 'due_date') -> Optional[tuple[str, list]]:
+    """
+    Build an aggregate query over the monthly rollup table, when it can answer it
+
+    The rollup holds due_date months x company x project x business area x
+    cost center x status, with counts and sums. It can answer a request only
+    if every dimension, metric and filter exists at that grain and date
+    filters cover whole due_date months.
+
+    Args:
+        table: income_data or outcome_data
+        filters: Filters without None values
+        date_field: Date field the start_date/end_date filters apply to
+        group_by: Dimension names
+        metrics: Metric names
+        period: Period granularity when grouping by 'period'
+        period_field: Date column truncated to the period
+
+    Returns:
+        Tuple of (SQL without LIMIT, parameters) or None if the base table must be used
+    """
+    rollup_table = ROLLUP_TABLES.get(table)
+    group_by = list(dict.fromkeys(group_by))
+    metrics = list(dict.fromkeys(metrics or DEFAULT_AGGREGATE_METRICS))
+
+    if rollup_table is None:
+        return None
+    if any(name != 'period' and name not in AGGREGATE_DIMENSIONS for name in group_by):
+        return None
+    if 'period' in group_by and (period != 'month' or period_field != 'due_date'):
+        return None
+    if any(name not in ROLLUP_METRICS for name in metrics):
+        return None
+    if any(field not in ROLLUP_FILTERS for field in filters):
+        return None
+
+    start_date, end_date = filters.get('start_date'), filters.get('end_date')
+    if start_date is not None or end_date is not None:
+        if date_field != 'due_date':
+            return None
+        if start_date is not None and start_date.day != 1:
+            return None
+        if end_date is not None and (end_date + timedelta(days=1)).day != 1:
+            return None
+
+    # Rollup months are first days, so month >= start_date / month <= end_date select whole months
+    where_clause, params = build_where_clause(filters, date_field='month', table=rollup_table)
+    select_list, suffix = build_group_select(group_by, AGGREGATE_DIMENSIONS, metrics, ROLLUP_METRICS, 'month')
+    return f"SELECT {select_list} FROM {rollup_table} WHERE {where_clause}{suffix}", params
+
+
+# Columns selectable through the fields= parameter of the list endpoints
+COMMON_COLUMNS = (
+    'id', 'sync_date', 'installment_id', 'bill_id',
+    'company_id', 'company_name', 'business_area_id', 'business_area_name',
+    'project_id', 'project_name', 'group_company_id', 'group_company_name',
+    'holding_id', 'holding_name', 'subsidiary_id', 'subsidiary_name',
+    'business_type_id', 'business_type_name',
+    'document_identification_id', 'document_identification_name', 'document_number',
+    'origin_id', 'original_amount', 'discount_amount', 'tax_amount',
+    'indexer_id', 'indexer_name', 'due_date', 'issue_date', 'bill_date', 'installment_base_date',
+    'balance_amount', 'corrected_balance_amount', 'status_parcela', 'cost_center_name', 'payment_date'
+)
+
+TABLE_COLUMNS = {
+    'income_data': COMMON_COLUMNS + (
+        'client_id', 'client_name', 'document_forecast', 'periodicity_type',
+        'embedded_interest_amount', 'interest_type', 'interest_rate', 'correction_type',
+        'interest_base_date', 'defaulter_situation', 'sub_judicie', 'main_unit',
+        'installment_number', 'payment_term_id', 'payment_term_descrition', 'bearer_id',
+        'receipts', 'receipts_categories'
+    ),
+    'outcome_data': COMMON_COLUMNS + (
+        'creditor_id', 'creditor_name', 'forecast_document', 'consistency_status',
+        'authorization_status', 'registered_user_id', 'registered_by', 'registered_date',
+        'payments', 'payments_categories', 'departments_costs', 'buildings_costs', 'authorizations'
+    )
+}
+
+# JSONB arrays (TOASTed): left out of every preset except 'all'
+JSONB_COLUMNS = {
+    'income_data': ('receipts', 'receipts_categories'),
+    'outcome_data': ('payments', 'payments_categories', 'departments_costs', 'buildings_costs', 'authorizations')
+}
+
+SUMMARY_COLUMNS = (
+    'id', 'company_id', 'company_name', 'project_id', 'project_name',
+    'business_area_id', 'business_area_name', 'document_number',
+    'due_date', 'issue_date', 'payment_date', 'original_amount', 'balance_amount',
+    'corrected_balance_amount', 'status_parcela', 'cost_center_name'
+)
+
+# Named field sets usable in fields= (e.g. fields=summary or fields=summary,bill_id)
+FIELD_PRESETS = {
+    'income_data': {
+        'summary': SUMMARY_COLUMNS + ('client_id', 'client_name', 'installment_number'),
+        'scalar': tuple(c for c in TABLE_COLUMNS['income_data'] if c not in JSONB_COLUMNS['income_data']),
+        'all': TABLE_COLUMNS['income_data']
+    },
+    'outcome_data': {
+        'summary': SUMMARY_COLUMNS + ('creditor_id', 'creditor_name', 'authorization_status'),
+        'scalar': tuple(c for c in TABLE_COLUMNS['outcome_data'] if c not in JSONB_COLUMNS['outcome_data']),
+        'all': TABLE_COLUMNS['outcome_data']
+    }
+}
+
+
+def build_select_list(table: str, fields: Optional[str], date_field: Optional[str] = 'due_date') -> str:
+    """
+    Build the SELECT list of a list query from a fields= parameter
+
+    Items are column names or presets (FIELD_PRESETS) and may be mixed.
+    id and the ordering date field (if any) are always included, the keyset
+    cursor is built from them.
+
+    Args:
+        table: Table name
+        fields: Comma-separated columns and presets, or None for every column
+        date_field: Date field used for ordering, or None for unordered lookups
+
+    Returns:
+        Comma-separated column list, or '*'
+
+    Raises:
+        ValueError: If an item is neither a column nor a preset of the table
+    """
+    columns = resolve_fields(table, fields, date_field)
+    return ', '.join(columns) if columns else '*'
+
+
+def resolve_fields(table: str, fields: Optional[str], date_field: Optional[str] = 'due_date') -> list[str]:
+    """
+    Expand a fields= parameter into a column list (see build_select_list)
+
+    Returns:
+        Deduplicated column names, or an empty list when fields is empty
+
+    Raises:
+        ValueError: If an item is neither a column nor a preset of the table
+    """
+    names = parse_list_param(fields)
+    if not names:
+        return []
+
+    presets, allowed = FIELD_PRESETS[table], TABLE_COLUMNS[table]
+    columns = ['id', date_field] if date_field else ['id']
+    for name in names:
+        if name in presets:
+            columns.extend(presets[name])
+        elif name in allowed:
+            columns.append(name)
+        else:
+            raise ValueError(
+                f"Invalid field '{name}'. Allowed: presets {', '.join(presets)} or columns of {table}"
+            )
+    return list(dict.fromkeys(columns))
+
+
+# Unified income + outcome listing (/api/financial): record_type -> table, in sort order
+FINANCIAL_TABLES = {'income': 'income_data', 'outcome': 'outcome_data'}
+
+# Connector schema: record_type, then every income column, then the outcome-only ones
+FINANCIAL_COLUMNS = ('record_type',) + TABLE_COLUMNS['income_data'] + tuple(
+    c for c in TABLE_COLUMNS['outcome_data'] if c not in TABLE_COLUMNS['income_data']
+)
+
+# SQL types of the columns only one table has, selected as typed NULLs from the other
+EXCLUSIVE_COLUMN_TYPES = {
+    'client_id': 'INTEGER', 'client_name': 'VARCHAR', 'document_forecast': 'VARCHAR',
+    'periodicity_type': 'VARCHAR', 'embedded_interest_amount': 'NUMERIC(15,2)',
+    'interest_type': 'VARCHAR', 'interest_rate': 'NUMERIC(5,2)', 'correction_type': 'VARCHAR',
+    'interest_base_date': 'DATE', 'defaulter_situation': 'VARCHAR', 'sub_judicie': 'VARCHAR',
+    'main_unit': 'VARCHAR', 'installment_number': 'VARCHAR', 'payment_term_id': 'VARCHAR',
+    'payment_term_descrition': 'VARCHAR', 'bearer_id': 'INTEGER',
+    'receipts': 'JSONB', 'receipts_categories': 'JSONB',
+    'creditor_id': 'INTEGER', 'creditor_name': 'VARCHAR', 'forecast_document': 'VARCHAR',
+    'consistency_status': 'VARCHAR', 'authorization_status': 'VARCHAR',
+    'registered_user_id': 'VARCHAR', 'registered_by': 'VARCHAR',
+    'registered_date': 'TIMESTAMP WITH TIME ZONE', 'payments': 'JSONB',
+    'payments_categories': 'JSONB', 'departments_costs': 'JSONB', 'buildings_costs': 'JSONB',
+    'authorizations': 'JSONB'
+}
+
+TABLE_COLUMNS['financial'] = FINANCIAL_COLUMNS
+FIELD_PRESETS['financial'] = {
+    'summary': ('record_type',) + SUMMARY_COLUMNS + (
+        'client_id', 'client_name', 'creditor_id', 'creditor_name',
+        'installment_number', 'authorization_status'
+    ),
+    'scalar': tuple(c for c in FINANCIAL_COLUMNS
+                    if c not in JSONB_COLUMNS['income_data'] + JSONB_COLUMNS['outcome_data']),
+    'all': FINANCIAL_COLUMNS
+}
+
+# Filters that do not name a column but apply to both tables
+RANGE_FILTERS = ('start_date', 'end_date', 'min_amount', 'max_amount')
+
+
+def financial_branches(filters: dict, record_type: Optional[str] = None) -> list[tuple[str, str, dict]]:
+    """
+    Split unified filters into the per-table branches of the UNION
+
+    A filter on a column only one table has (client_*, creditor_*,
+    authorization_status) leaves out the other table's branch entirely.
+
+    Args:
+        filters: Filters without None values
+        record_type: 'income' or 'outcome' to keep a single branch (None = both)
+
+    Returns:
+        List of (record_type, table, filters) in sort order
+    """
+    branches = []
+    for branch_type, table in FINANCIAL_TABLES.items():
+        if record_type is not None and branch_type != record_type:
+            continue
+        if all(field in RANGE_FILTERS or field in TABLE_COLUMNS[table] for field in filters):
+            branches.append((branch_type, table, filters))
+    return branches
+
+
+def financial_select_list(columns: list[str], table: str, record_type: str) -> str:
+    """SELECT list of one UNION branch: typed NULLs for columns the table lacks"""
+    expressions = []
+    for column in columns:
+        if column == 'record_type':
+            expressions.append(f"'{record_type}'::VARCHAR AS record_type")
+        elif column in TABLE_COLUMNS[table]:
+            expressions.append(column)
+        else:
+            expressions.append(f"NULL::{EXCLUSIVE_COLUMN_TYPES[column]} AS {column}")
+    return ', '.join(expressions)
+
+
+def build_financial_keyset_clause(cursor: tuple, record_type: str,
+                                  date_field: str = 'due_date') -> tuple[str, list]:
+    """
+    Seek condition of one UNION branch for rows after a unified cursor
+
+    The unified order is `{date_field} DESC, record_type, id`: on the cursor's
+    own branch this is the usual keyset; rows tied on the date come entirely
+    after the cursor in a later branch and entirely before it in an earlier one.
+
+    Args:
+        cursor: (date value or None, record_type, id) of the last row seen
+        record_type: Branch the condition is for
+        date_field: Date field used for ordering
+    """
+    value, cursor_type, row_id = cursor
+    if record_type == cursor_type:
+        return build_keyset_clause(value, row_id, date_field)
+    if record_type > cursor_type:
+        # Every id is > '': all date ties qualify
+        return build_keyset_clause(value, '', date_field)
+    if value is None:
+        return f"{date_field} IS NOT NULL", []
+    return f"{date_field} < %s", [value]
+
+
+def decode_financial_cursor(cursor: str, date_field: str) -> tuple[Optional[str], str, str]:
+    """
+    Decode a cursor issued by the unified listing
+
+    Returns:
+        Tuple of (date value or None, record_type, id)
+
+    Raises:
+        ValueError: If the cursor is malformed, has no record type or was issued for another date_field
+    """
+    payload = decode_cursor_payload(cursor, date_field)
+    if payload.get('t') not in FINANCIAL_TABLES:
+        raise ValueError("Invalid cursor")
+    return payload['v'], payload['t'], payload['id']
+
+
+def build_financial_query(branches: list[tuple[str, str, dict]], date_field: str, columns: list[str],
+                          limit: int, offset: int, cursor: Optional[tuple] = None) -> tuple[str, list]:
+    """
+    Build the paged UNION ALL of income and outcome rows
+
+    Each branch is filtered, seeked and limited on its own table (so it can
+    walk its date index) and only the top limit + offset rows of each are
+    merged and sorted by `{date_field} DESC, record_type, id`.
+
+    Args:
+        branches: Output of financial_branches
+        date_field: Validated date field for filtering and ordering
+        columns: Columns of FINANCIAL_COLUMNS to select (must include record_type, id, date_field)
+        limit: Page size
+        offset: Rows to skip (0 with a cursor)
+        cursor: Decoded unified cursor (optional)
+
+    Returns:
+        Tuple of (SQL, parameters)
+    """
+    parts, params = [], []
+    for record_type, table, filters in branches:
+        where_clause, where_params = build_where_clause(filters, date_field=date_field, table=table)
+        if cursor:
+            keyset_clause, keyset_params = build_financial_keyset_clause(cursor, record_type, date_field)
+            where_clause = f"{where_clause} AND {keyset_clause}"
+            where_params = where_params + keyset_params
+        parts.append(
+            f"(SELECT {financial_select_list(columns, table, record_type)} FROM {table} "
+            f"WHERE {where_clause} ORDER BY {date_field} DESC, id LIMIT %s)"
+        )
+        params.extend(where_params + [limit + offset])
+
+    query = f"""
+        SELECT * FROM ({' UNION ALL '.join(parts)}) AS financial
+        ORDER BY {date_field} DESC, record_type, id
+        LIMIT %s OFFSET %s
+    """
+    return query, params + [limit, offset]
+
+
+# Reporting snapshot maintained by the sync (one table, no UNION, no JSONB)
+REPORT_TABLE = 'financial_report'
+
+# Aging fields depend on the current date: computed at read time, never stored
+REPORT_AGING_COLUMNS = {
+    'dias_atraso': """CASE
+        WHEN due_date IS NULL OR COALESCE(balance_amount, 0) <= 0.01 THEN 0
+        ELSE GREATEST(CURRENT_DATE - due_date, 0)
+    END""",
+    'faixa_aging': """CASE
+        WHEN COALESCE(balance_amount, 0) <= 0.01 THEN 'Pago'
+        WHEN due_date IS NULL OR due_date >= CURRENT_DATE THEN 'Atual (A Vencer)'
+        WHEN CURRENT_DATE - due_date <= 30 THEN '1-30 dias'
+        WHEN CURRENT_DATE - due_date <= 60 THEN '31-60 dias'
+        WHEN CURRENT_DATE - due_date <= 90 THEN '61-90 dias'
+        ELSE '90+ dias'
+    END""",
+    'situacao_vencimento': """CASE
+        WHEN COALESCE(balance_amount, 0) <= 0.01 THEN 'Pago'
+        WHEN due_date IS NULL THEN 'Sem vencimento'
+        WHEN due_date < CURRENT_DATE THEN 'Vencido'
+        ELSE 'A Vencer'
+    END"""
+}
+
+REPORT_DERIVED_COLUMNS = (
+    'record_type_label', 'total_movimentacoes', 'valor_liquido', 'data_ultima_movimentacao',
+    'situacao_pagamento', 'taxa_inadimplencia', 'total_departamentos', 'total_edificacoes',
+    'total_autorizacoes'
+)
+
+TABLE_COLUMNS[REPORT_TABLE] = FIELD_PRESETS['financial']['scalar'] + REPORT_DERIVED_COLUMNS + tuple(REPORT_AGING_COLUMNS)
+FIELD_PRESETS[REPORT_TABLE] = {
+    'summary': FIELD_PRESETS['financial']['summary'] + (
+        'record_type_label', 'total_movimentacoes', 'valor_liquido', 'situacao_pagamento', 'situacao_vencimento'
+    ),
+    'scalar': TABLE_COLUMNS[REPORT_TABLE],
+    'all': TABLE_COLUMNS[REPORT_TABLE]
+}
+
+
+# Columns a filter may name, per table: scalar columns only (JSONB arrays and
+# the aging fields computed at read time cannot be compared to a parameter)
+FILTER_TABLE_COLUMNS = {
+    table: frozenset(
+        column for column in columns
+        if column not in REPORT_AGING_COLUMNS
+        and not any(column in jsonb for jsonb in JSONB_COLUMNS.values())
+    )
+    for table, columns in TABLE_COLUMNS.items()
+}
+
+# Rollup tables: the group columns build_rollup_query may filter on
+ROLLUP_COLUMNS = (
+    'month', 'company_id', 'company_name', 'project_id', 'project_name',
+    'business_area_id', 'business_area_name', 'cost_center_name', 'status_parcela'
+)
+FILTER_TABLE_COLUMNS.update({rollup_table: frozenset(ROLLUP_COLUMNS) for rollup_table in ROLLUP_TABLES.values()})
+
+# Date columns the start_date/end_date filters may apply to, per table
+TABLE_DATE_FIELDS = {table: DATE_FIELDS for table in TABLE_COLUMNS}
+TABLE_DATE_FIELDS.update({rollup_table: ('month',) for rollup_table in ROLLUP_TABLES.values()})
+
+
+def report_select_list(columns: list[str]) -> str:
+    """SELECT list over REPORT_TABLE, with the aging columns expanded to their expressions"""
+    return ', '.join(
+        f"{REPORT_AGING_COLUMNS[column]} AS {column}" if column in REPORT_AGING_COLUMNS else column
+        for column in columns
+    )
+
+
+def build_report_keyset_clause(cursor: tuple, date_field: str = 'due_date') -> tuple[str, list]:
+    """
+    Seek condition on REPORT_TABLE for rows after a unified cursor
+
+    Matches the ordering `{date_field} DESC, record_type, id` (NULL dates first).
+
+    Args:
+        cursor: (date value or None, record_type, id) of the last row seen
+        date_field: Date field used for ordering
+    """
+    value, record_type, row_id = cursor
+    if value is None:
+        return (f"(({date_field} IS NULL AND (record_type, id) > (%s, %s)) OR {date_field} IS NOT NULL)",
+                [record_type, row_id])
+    return (f"({date_field} < %s OR ({date_field} = %s AND (record_type, id) > (%s, %s)))",
+            [value, value, record_type, row_id])
+
+
+# Seconds a list snapshot (snapshot=true) can be paged through before it expires
+SNAPSHOT_TTL = int(os.getenv('SNAPSHOT_TTL', '900'))
+
+
+async def create_snapshot(table: str, where_clause: str, params: list, order_by: str,
+                          keyed_by_type: bool = False) -> tuple[str, int]:
+    """
+    Materialize the ordered id list of a filtered query into list_snapshot_rows
+
+    Expired snapshots are purged in the same transaction.
+
+    Args:
+        table: Table the list reads
+        where_clause: WHERE clause of the list (without the keyword)
+        params: Parameters of where_clause
+        order_by: ORDER BY expression of the list
+        keyed_by_type: Store record_type too (ids are unique per record type only)
+
+    Returns:
+        Tuple of (snapshot token, number of rows)
+    """
+    token = str(uuid.uuid4())
+    type_column = 'record_type' if keyed_by_type else "''"
+    db_pool = await get_db_connection()
+    async with db_pool.connection() as conn:
+        async with conn.transaction():
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    "DELETE FROM list_snapshot_rows WHERE token IN "
+                    "(SELECT token FROM list_snapshots WHERE expires_at < NOW())"
+                )
+                await cur.execute("DELETE FROM list_snapshots WHERE expires_at < NOW()")
+                await cur.execute(f"""
+                    INSERT INTO list_snapshot_rows (token, position, record_type, id)
+                    SELECT %s, ROW_NUMBER() OVER (ORDER BY {order_by}), {type_column}, id
+                    FROM {table}
+                    WHERE {where_clause}
+                """, (token, *params))
+                total = cur.rowcount
+                # Header written last, with its total: the API role needs no UPDATE grant
+                await cur.execute(
+                    "INSERT INTO list_snapshots (token, table_name, total, expires_at) "
+                    "VALUES (%s, %s, %s, NOW() + make_interval(secs => %s))",
+                    (token, table, total, SNAPSHOT_TTL)
+                )
+    return token, total
+
+
+async def get_snapshot(token: str) -> Optional[dict]:
+    """Return table_name, total and whether the snapshot is still live, or None if unknown"""
+    return await execute_single(
+        "SELECT table_name, total, expires_at > NOW() AS live FROM list_snapshots WHERE token = %s",
+        (token,)
+    )
+
+
+def build_snapshot_page_query(token: str, position: int, limit: int, table: str, select_list: str,
+                              keyed_by_type: bool = False) -> tuple[str, tuple]:
+    """
+    Build the query reading the rows of a snapshot slice, in snapshot order
+
+    Args:
+        token: Snapshot token
+        position: Last position already read (0 for the first page)
+        limit: Slice size
+        table: Table the snapshot was taken from
+        select_list: SELECT list over table ('*' for every column)
+        keyed_by_type: Join on record_type too
+
+    Returns:
+        Tuple of (query, params). Rows deleted since the snapshot are skipped.
+    """
+    if select_list == '*':
+        select_list = f"{table}.*"
+    join = "id = s.snapshot_id" + (" AND record_type = s.snapshot_type" if keyed_by_type else "")
+    query = f"""
+        SELECT {select_list} FROM (
+            SELECT position AS snapshot_position, record_type AS snapshot_type, id AS snapshot_id
+            FROM list_snapshot_rows
+            WHERE token = %s AND position > %s
+            ORDER BY position
+            LIMIT %s
+        ) s
+        JOIN {table} ON {join}
+        ORDER BY s.snapshot_position
+    """
+    return query, (token, position, limit)
+
+
+def encode_snapshot_cursor(token: str, position: int) -> str:
+    """Encode a position inside a snapshot as an opaque cursor"""
+    payload = json.dumps({'s': token, 'p': position}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_snapshot_cursor(cursor: Optional[str]) -> Optional[tuple[str, int]]:
+    """
+    Decode a cursor produced by encode_snapshot_cursor
+
+    Returns:
+        Tuple of (token, position), or None if cursor is not a snapshot cursor
+
+    Raises:
+        ValueError: If the snapshot cursor is malformed
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except ValueError:
+        return None
+    if not isinstance(payload, dict) or 's' not in payload:
+        return None
+    try:
+        token, position = str(uuid.UUID(payload['s'])), int(payload['p'])
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError("Invalid snapshot cursor") from e
+    if position < 0:
+        raise ValueError("Invalid snapshot cursor")
+    return token, position
+
+
+# Dimension catalog maintained by sync_sienge.py (refresh_dimensions)
+DIMENSION_TABLE = 'dimension_members'
+
+# Catalog dimensions: name -> record types that have it
+DIMENSIONS = {
+    'company': ('income', 'outcome'),
+    'project': ('income', 'outcome'),
+    'business_area': ('income', 'outcome'),
+    'cost_center': ('income', 'outcome'),
+    'client': ('income',),
+    'creditor': ('outcome',),
+}
+
+
+def validate_dimension(dimension: str) -> str:
+    """
+    Validate a dimension name against DIMENSIONS
+
+    Raises:
+        ValueError: If the dimension is not in the catalog
+    """
+    if dimension not in DIMENSIONS:
+        raise ValueError(f"Invalid dimension '{dimension}'. Allowed: {', '.join(DIMENSIONS)}")
+    return dimension
+
+
+def build_dimension_query(dimension: str, record_type: Optional[str] = None) -> tuple[str, tuple]:
+    """
+    Build the query listing the members of a dimension, merged across record types
+
+    Returns:
+        Tuple of (query, params); rows have id, name, records, the due/issue
+        date ranges and the record types the member appears in
+
+    Raises:
+        ValueError: If the dimension is not in DIMENSIONS
+    """
+    validate_dimension(dimension)
+    source_clause, params = "", (dimension,)
+    if record_type:
+        source_clause, params = " AND source = %s", (dimension, record_type)
+    query = f"""
+        SELECT
+            member_id AS id, name, SUM(record_count)::INTEGER AS records,
+            MIN(first_due_date) AS first_due_date, MAX(last_due_date) AS last_due_date,
+            MIN(first_issue_date) AS first_issue_date, MAX(last_issue_date) AS last_issue_date,
+            array_agg(source ORDER BY source) AS record_types
+        FROM {DIMENSION_TABLE}
+        WHERE dimension = %s{source_clause}
+        GROUP BY member_id, name
+        ORDER BY name, member_id
+    """
+    return query, params
+
+
+def escape_like(value: str) -> str:
+    """Escape the LIKE wildcards of a user-supplied search term"""
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def build_search_query(dimension: str, term: str, limit: int) -> tuple[str, tuple]:
+    """
+    Build the type-ahead query of a dimension: catalog members whose name
+    contains term, served by the trigram index on DIMENSION_TABLE.name
+
+    Ranked prefix matches first, then by trigram similarity to term, then by
+    number of records.
+
+    Returns:
+        Tuple of (query, params)
+
+    Raises:
+        ValueError: If the dimension is not in DIMENSIONS
+    """
+    validate_dimension(dimension)
+    pattern = escape_like(term)
+    query = f"""
+        SELECT member_id AS id, name, SUM(record_count)::INTEGER AS records
+        FROM {DIMENSION_TABLE}
+        WHERE dimension = %s AND name ILIKE %s
+        GROUP BY member_id, name
+        ORDER BY name ILIKE %s DESC, similarity(name, %s) DESC, records DESC, name
+        LIMIT %s
+    """
+    return query, (dimension, f"%{pattern}%", f"{pattern}%", term, limit)
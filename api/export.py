@@ -0,0 +1,153 @@
+"""Streaming export encoders for Sienge Financial API"""
+import csv
+import io
+from datetime import date, datetime
+from typing import Any, AsyncIterator
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from psycopg.postgres import types as pg_types
+
+from responses import dumps
+
+# Export formats: format -> (media type, file extension)
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+# Formats encoded from tuple batches (database.stream_columns / execute_columns)
+COLUMNAR_FORMATS = ('arrow', 'parquet')
+
+# PostgreSQL type name -> Arrow type (numeric is sized from the column, see arrow_type)
+ARROW_TYPES = {
+    'int2': pa.int16(),
+    'int4': pa.int32(),
+    'int8': pa.int64(),
+    'float4': pa.float32(),
+    'float8': pa.float64(),
+    'bool': pa.bool_(),
+    'date': pa.date32(),
+    'timestamp': pa.timestamp('us'),
+    'timestamptz': pa.timestamp('us', tz='UTC'),
+}
+
+
+async def ndjson_chunks(batches: AsyncIterator[list]) -> AsyncIterator[bytes]:
+    """
+    Encode row batches as newline-delimited JSON, one chunk per batch
+
+    Rows are encoded like the JSON endpoints (responses.dumps): NUMERIC as
+    strings, so amounts keep their exact value.
+    """
+    async for rows in batches:
+        yield b''.join(dumps(row) + b'\n' for row in rows)
+
+
+def csv_value(value: Any) -> Any:
+    """Flatten a database value for a CSV cell (JSON/JSONB arrive as text)"""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+async def csv_chunks(batches: AsyncIterator[tuple[list, list]]) -> AsyncIterator[bytes]:
+    """
+    Encode (description, rows) batches (database.stream_columns) as CSV, one
+    chunk per batch
+
+    The header row comes from the cursor description, so an export that
+    matches nothing still has one.
+    """
+    header_written = False
+    async for description, rows in batches:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if not header_written:
+            writer.writerow([column.name for column in description])
+            header_written = True
+        writer.writerows([csv_value(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode('utf-8')
+
+
+def arrow_type(column) -> pa.DataType:
+    """
+    Arrow type for a cursor description column
+
+    NUMERIC(p,s) maps to decimal128(p,s); unconstrained NUMERIC (e.g. SUM/AVG
+    results) falls back to float64. Text, JSON/JSONB and anything else map to string.
+    """
+    info = pg_types.get(column.type_code)
+    name = info.name if info else None
+    if name == 'numeric':
+        if column.precision is not None and column.scale is not None:
+            return pa.decimal128(column.precision, column.scale)
+        return pa.float64()
+    return ARROW_TYPES.get(name, pa.string())
+
+
+def arrow_schema(description: list) -> pa.Schema:
+    """Build the Arrow schema of a query from its cursor description"""
+    return pa.schema([pa.field(column.name, arrow_type(column)) for column in description])
+
+
+def arrow_column(values: tuple, data_type: pa.DataType) -> pa.Array:
+    """Convert one column of fetched values to an Arrow array"""
+    if pa.types.is_floating(data_type):
+        values = [float(v) if v is not None else None for v in values]
+    elif pa.types.is_string(data_type):
+        values = [v if v is None or isinstance(v, str) else str(v) for v in values]
+    return pa.array(values, type=data_type)
+
+
+def record_batch(schema: pa.Schema, rows: list) -> pa.RecordBatch:
+    """Build a record batch column by column from non-empty row tuples"""
+    columns = list(zip(*rows))
+    return pa.RecordBatch.from_arrays(
+        [arrow_column(values, field.type) for values, field in zip(columns, schema)],
+        schema=schema
+    )
+
+
+def open_writer(export_format: str, sink, schema: pa.Schema):
+    """Open an Arrow IPC stream or Parquet writer on sink"""
+    if export_format == 'parquet':
+        return pq.ParquetWriter(sink, schema, compression='zstd')
+    return pa.ipc.new_stream(sink, schema)
+
+
+async def columnar_chunks(batches: AsyncIterator[tuple[list, list]],
+                          export_format: str) -> AsyncIterator[bytes]:
+    """
+    Encode (description, rows) batches as an Arrow IPC stream or a Parquet file
+
+    Each database batch becomes one record batch (Parquet: one row group)
+    and is flushed as soon as it is written.
+    """
+    sink = io.BytesIO()
+    writer = None
+    async for description, rows in batches:
+        if writer is None:
+            schema = arrow_schema(description)
+            writer = open_writer(export_format, sink, schema)
+        if rows:
+            writer.write_batch(record_batch(schema, rows))
+        if sink.tell():
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    if writer is not None:
+        writer.close()
+        yield sink.getvalue()
+
+
+def encode_columns(description: list, rows: list, export_format: str) -> bytes:
+    """Encode a fully fetched result (e.g. one list page) as Arrow IPC or Parquet"""
+    sink = io.BytesIO()
+    schema = arrow_schema(description)
+    with open_writer(export_format, sink, schema) as writer:
+        if rows:
+            writer.write_batch(record_batch(schema, rows))
+    return sink.getvalue()
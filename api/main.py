@@ -2,18 +2,42 @@
 Sienge Financial API
 RESTful API for querying financial data from Sienge
 """
-from fastapi import FastAPI, HTTPException, Query, Depends
+from fastapi import FastAPI, HTTPException, Query, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from typing import Optional
+from brotli_asgi import BrotliMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse, Response
+import os
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Optional, Literal
 import logging
-from datetime import date
+from datetime import date, datetime
 
 from models import (
-    ApiResponse, ErrorResponse, IncomeFilters, OutcomeFilters,
-    HealthCheck, ApiInfo
+    ApiResponse, BatchResponse, BatchRequest, ErrorResponse, IncomeFilters, OutcomeFilters,
+    HealthCheck, ApiInfo, TotalMode, ListFormat, RecordType, SubQuery, MultiQueryRequest
+)
+from database import (
+    execute_query, execute_single, build_where_clause,
+    open_pool, close_pool, get_pool_stats, get_coalescing_stats, get_query_template_stats, get_filter_patterns,
+    encode_cursor, decode_cursor, build_keyset_clause, estimate_count,
+    build_aggregate_query, build_rollup_query, validate_date_field, parse_list_param,
+    stream_query, execute_columns, stream_columns, export_slots, build_select_list, resolve_fields,
+    FINANCIAL_TABLES, FINANCIAL_COLUMNS, RANGE_FILTERS, financial_branches, decode_financial_cursor, build_financial_query,
+    REPORT_TABLE, TABLE_COLUMNS, report_select_list, build_report_keyset_clause,
+    create_snapshot, get_snapshot, build_snapshot_page_query, encode_snapshot_cursor, decode_snapshot_cursor,
+    build_search_query, build_dimension_query
+)
+from export import (
+    EXPORT_FORMATS, COLUMNAR_FORMATS, ndjson_chunks, csv_chunks, columnar_chunks, encode_columns
+)
+from responses import fast_response
+from cache import (
+    count_cache, response_cache, cached_call, get_data_generation, normalize_filters,
+    start_sync_listener, stop_sync_listener, get_listener_stats,
+    negotiated_encoding, build_etag, etag_matches
 )
-from database import execute_query, execute_single, build_where_clause
 
 # Configure logging
 logging.basicConfig(
@@ -22,24 +46,112 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Responses smaller than this are sent uncompressed (bytes)
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+# Brotli quality 0-11 (higher = smaller but slower); gzip is used when br is not accepted
+BROTLI_QUALITY = int(os.getenv('BROTLI_QUALITY', '4'))
+
+# Maximum number of ids per multi-get request (/api/income/batch, /api/outcome/batch)
+BATCH_MAX_IDS = int(os.getenv('BATCH_MAX_IDS', '500'))
+
+# Maximum number of sub-queries per /api/query request
+QUERY_MAX_SUBQUERIES = int(os.getenv('QUERY_MAX_SUBQUERIES', '20'))
+
+# Filter combinations listed by /api/stats (most used first)
+FILTER_PATTERNS_TOP = int(os.getenv('FILTER_PATTERNS_TOP', '50'))
+
+# GET routes tagged with an ETag: the cacheable JSON list, aggregate and report
+# endpoints (not exports, lookups, runtime state or snapshot pages)
+ETAG_PATHS = (
+    '/api/income', '/api/outcome', '/api/financial', '/api/report',
+    '/api/income/aggregate', '/api/outcome/aggregate'
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the database pool and sync listener on startup, close them on shutdown"""
+    await open_pool()
+    start_sync_listener()
+    yield
+    await stop_sync_listener()
+    await close_pool()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Sienge Financial API",
     description="API para consulta de dados financeiros do Sienge (Income e Outcome)",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
+
+async def conditional_get(request: Request, call_next):
+    """
+    Tag data GET responses with a strong ETag and answer If-None-Match with 304
+
+    The ETag is derived from the request (path, sorted query, negotiated
+    encoding) and the current data generation, which is known in memory
+    while the sync listener is connected, so revalidation never queries
+    the data tables.
+    """
+    path = request.url.path
+    if request.method != 'GET' or path not in ETAG_PATHS:
+        return await call_next(request)
+    if request.query_params.get('format', 'json') != 'json':
+        return await call_next(request)
+    if request.query_params.get('snapshot', '').lower() in ('true', '1', 'yes', 'on'):
+        # Each snapshot=true request opens a new snapshot, a cached token may have expired
+        return await call_next(request)
+    try:
+        snapshot_page = decode_snapshot_cursor(request.query_params.get('cursor')) is not None
+    except ValueError:
+        snapshot_page = True  # malformed snapshot cursor: the endpoint answers 400
+    if snapshot_page:
+        # A snapshot page depends on the snapshot's expiry, not on the data generation
+        # (an expired one must answer 410, never 304)
+        return await call_next(request)
+
+    try:
+        generation = await get_data_generation()
+    except Exception as e:
+        logger.warning(f"Data generation unavailable, skipping ETag: {e}")
+        return await call_next(request)
+
+    # The day is part of the tag: aging fields are computed against the current date
+    etag = build_etag(
+        (*generation, date.today().isoformat()), path, request.query_params.multi_items(),
+        negotiated_encoding(request.headers.get('accept-encoding', ''))
+    )
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+    if etag_matches(request.headers.get('if-none-match'), etag):
+        return Response(status_code=304, headers={**headers, 'Vary': 'Accept-Encoding'})
+
+    response = await call_next(request)
+    if response.status_code == 200:
+        response.headers.update(headers)
+    return response
+
+
+# Middleware order (outermost first): compression, CORS, conditional GET
+app.middleware("http")(conditional_get)
+
 # Configure CORS - allow all origins for external consumption
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
-    allow_methods=["GET", "OPTIONS"],
+    allow_methods=["GET", "POST", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "X-Total-Mode", "X-Next-Cursor", "ETag"],
 )
 
+# Compress responses above COMPRESSION_MIN_SIZE: brotli when accepted, else gzip
+app.add_middleware(BrotliMiddleware, quality=BROTLI_QUALITY, minimum_size=COMPRESSION_MIN_SIZE)
+
 
 # Exception handlers
 @app.exception_handler(Exception)
@@ -63,7 +175,8 @@ async def http_exception_handler(request, exc):
         content=ErrorResponse(
             error=exc.detail,
             detail=None
-        ).dict()
+        ).dict(),
+        headers=exc.headers
     )
 
 
@@ -80,7 +193,7 @@ async def health_check():
     """Health check endpoint to verify API and database connectivity"""
     try:
         # Test database connection
-        result = execute_single("SELECT 1 as test")
+        result = await execute_single("SELECT 1 as test")
         if result and result.get('test') == 1:
             return HealthCheck()
         else:
@@ -90,6 +203,535 @@ async def health_check():
         raise HTTPException(status_code=503, detail="Service unavailable")
 
 
+# Runtime statistics endpoint
+@app.get("/api/stats")
+async def get_stats():
+    """Runtime statistics (database connection pool, query coalescing, caches)"""
+    return {
+        "pool": get_pool_stats(),
+        "coalescing": get_coalescing_stats(),
+        "query_templates": get_query_template_stats(),
+        "filter_patterns": get_filter_patterns(FILTER_PATTERNS_TOP),
+        "response_cache": response_cache.stats(),
+        "count_cache": count_cache.stats(),
+        "sync_listener": get_listener_stats()
+    }
+
+
+def date_scope(table: str, date_field: str, filters: dict) -> tuple:
+    """Cache scope of a filtered query: which table and date window it reads"""
+    return (table, date_field, filters.get('start_date'), filters.get('end_date'))
+
+
+async def count_total(table: str, filters: dict, date_field: str, where_clause: str,
+                      params: list, total_mode: str) -> Optional[int]:
+    """
+    Compute the total for a list request according to total_mode
+
+    - exact: COUNT(*) on every request
+    - estimate: planner row estimate (EXPLAIN), no scan
+    - none: no total
+    - cached: exact COUNT(*) memoized per filter set until the next successful sync
+    """
+    if total_mode == 'none':
+        return None
+    if total_mode == 'estimate':
+        return await estimate_count(table, where_clause, tuple(params))
+
+    if total_mode == 'cached':
+        generation = await get_data_generation()
+        key = (table, date_field, normalize_filters(filters))
+        cached = count_cache.get(key, generation)
+        if cached is not None:
+            return cached
+
+    count_query = f"SELECT COUNT(*) as total FROM {table} WHERE {where_clause}"
+    count_result = await execute_single(count_query, tuple(params))
+    total = count_result['total'] if count_result else 0
+
+    if total_mode == 'cached':
+        count_cache.set(key, total, generation, scope=date_scope(table, date_field, filters))
+    return total
+
+
+async def list_records(table: str, filters: dict, date_field: str, limit: int, offset: int,
+                       cursor: Optional[str], total_mode: str = 'exact',
+                       fields: Optional[str] = None, snapshot: bool = False) -> ApiResponse:
+    """
+    Run the count and page queries shared by the list endpoints
+
+    With a cursor the page is a keyset seek after the cursor position and
+    offset is ignored; otherwise LIMIT/OFFSET paging is used. fields limits
+    the selected columns. Responses are served from the response cache until
+    the next successful sync. snapshot (or a snapshot cursor) pages through a
+    frozen result set instead, see list_snapshot.
+    """
+    # Remove None values
+    filters = {k: v for k, v in filters.items() if v is not None}
+    select_list = projection(table, fields, date_field)
+
+    if snapshot or snapshot_position(cursor):
+        return await list_snapshot(table, filters, date_field, limit, offset, cursor,
+                                   select_list, f"{date_field} DESC, id")
+
+    key = ('list', table, date_field, normalize_filters(filters), limit, offset, cursor, total_mode, select_list)
+    return await cached_call(
+        key,
+        lambda: query_records(table, filters, date_field, limit, offset, cursor, total_mode, select_list),
+        scope=date_scope(table, date_field, filters)
+    )
+
+
+def projection(table: str, fields: Optional[str], date_field: Optional[str]) -> str:
+    """
+    SELECT list for a fields= parameter and ordering date field (None for
+    lookups by id), invalid values answered with 400
+    """
+    try:
+        if date_field is not None:
+            validate_date_field(date_field)
+        return build_select_list(table, fields, date_field)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def build_page_query(table: str, filters: dict, date_field: str, limit: int, offset: int,
+                     cursor: Optional[str], select_list: str = '*') -> tuple:
+    """
+    Build the WHERE clause and the page query of a list request
+
+    Returns:
+        (where_clause, params, data_query, data_params) - the WHERE clause and
+        params are the unpaged ones, used for the total
+    """
+    # Build WHERE clause with dynamic date field
+    where_clause, params = build_where_clause(filters, date_field=date_field, table=table)
+
+    page_clause, page_params = where_clause, params
+    if cursor:
+        try:
+            cursor_value, cursor_id = decode_cursor(cursor, date_field)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        keyset_clause, keyset_params = build_keyset_clause(cursor_value, cursor_id, date_field)
+        page_clause = f"{where_clause} AND {keyset_clause}"
+        page_params = params + keyset_params
+        offset = 0
+
+    data_query = f"""
+        SELECT {select_list} FROM {table}
+        WHERE {page_clause}
+        ORDER BY {date_field} DESC, id
+        LIMIT %s OFFSET %s
+    """
+    return where_clause, params, data_query, tuple(page_params + [limit, offset])
+
+
+async def query_records(table: str, filters: dict, date_field: str, limit: int, offset: int,
+                        cursor: Optional[str], total_mode: str, select_list: str = '*') -> ApiResponse:
+    """Build and run the count and page queries for list_records"""
+    where_clause, params, data_query, data_params = build_page_query(
+        table, filters, date_field, limit, offset, cursor, select_list
+    )
+
+    # Total and paginated data run concurrently on separate pooled connections
+    total, data = await asyncio.gather(
+        count_total(table, filters, date_field, where_clause, params, total_mode),
+        execute_query(data_query, data_params)
+    )
+
+    return ApiResponse(
+        success=True,
+        total=total,
+        total_mode=total_mode,
+        count=len(data),
+        limit=limit,
+        offset=None if cursor else offset,
+        next_cursor=encode_cursor(data[-1], date_field) if len(data) == limit else None,
+        data=data
+    )
+
+
+def snapshot_position(cursor: Optional[str]) -> Optional[tuple[str, int]]:
+    """(token, position) of a snapshot cursor, None for other cursors, 400 if malformed"""
+    try:
+        return decode_snapshot_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def list_snapshot(table: str, filters: dict, date_field: str, limit: int, offset: int,
+                        cursor: Optional[str], select_list: str, order_by: str,
+                        keyed_by_type: bool = False) -> ApiResponse:
+    """
+    Page through a snapshot of a list: a frozen, ordered id list
+
+    Without a snapshot cursor the ids matching the filters are materialized
+    (create_snapshot) and the first page starts at offset; next_cursor then
+    points into the snapshot, and later pages are primary-key slices of it,
+    whatever the filters of those requests. Syncs committing meanwhile cannot
+    shift pages; values are read live and deleted rows are skipped.
+    Snapshots expire after SNAPSHOT_TTL seconds (410 Gone afterwards).
+    """
+    position = snapshot_position(cursor)
+    if position is None:
+        if cursor:
+            raise HTTPException(status_code=400, detail="snapshot=true cannot be combined with a keyset cursor")
+        try:
+            validate_date_field(date_field)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        where_clause, params = build_where_clause(filters, date_field=date_field, table=table)
+        token, total = await create_snapshot(table, where_clause, params, order_by, keyed_by_type)
+        position = offset
+    else:
+        token, position = position
+        state = await get_snapshot(token)
+        if not state or not state['live']:
+            raise HTTPException(status_code=410, detail="Snapshot expired, restart the read without cursor")
+        if state['table_name'] != table:
+            raise HTTPException(status_code=400, detail=f"Cursor belongs to a snapshot of {state['table_name']}")
+        total = state['total']
+
+    query, params = build_snapshot_page_query(token, position, limit, table, select_list, keyed_by_type)
+    data = await execute_query(query, params)
+    end = position + limit
+
+    return ApiResponse(
+        success=True,
+        total=total,
+        total_mode='snapshot',
+        count=len(data),
+        limit=limit,
+        offset=position,
+        next_cursor=encode_snapshot_cursor(token, end) if end < total else None,
+        data=data
+    )
+
+
+async def list_records_columnar(table: str, filters: dict, date_field: str, limit: int, offset: int,
+                                cursor: Optional[str], total_mode: str, export_format: str,
+                                fields: Optional[str] = None) -> Response:
+    """
+    Serve a list page as an Arrow IPC stream or Parquet file
+
+    Same paging as list_records; the envelope fields travel as headers
+    (X-Total-Count, X-Total-Mode, X-Next-Cursor) since the body is binary.
+    """
+    # Remove None values
+    filters = {k: v for k, v in filters.items() if v is not None}
+    select_list = projection(table, fields, date_field)
+
+    async def compute():
+        where_clause, params, data_query, data_params = build_page_query(
+            table, filters, date_field, limit, offset, cursor, select_list
+        )
+        total, (description, rows) = await asyncio.gather(
+            count_total(table, filters, date_field, where_clause, params, total_mode),
+            execute_columns(data_query, data_params)
+        )
+        next_cursor = None
+        if len(rows) == limit:
+            last_row = dict(zip((column.name for column in description), rows[-1]))
+            next_cursor = encode_cursor(last_row, date_field)
+        return encode_columns(description, rows, export_format), total, next_cursor
+
+    key = ('list', export_format, table, date_field, normalize_filters(filters),
+           limit, offset, cursor, total_mode, select_list)
+    body, total, next_cursor = await cached_call(
+        key, compute, scope=date_scope(table, date_field, filters)
+    )
+
+    headers = {'X-Total-Mode': total_mode}
+    if total is not None:
+        headers['X-Total-Count'] = str(total)
+    if next_cursor:
+        headers['X-Next-Cursor'] = next_cursor
+    return Response(content=body, media_type=EXPORT_FORMATS[export_format][0], headers=headers)
+
+
+async def aggregate_records(table: str, filters: dict, date_field: str, group_by: Optional[str],
+                            metrics: Optional[str], period: str, period_field: str, limit: int) -> ApiResponse:
+    """
+    Run a whitelisted GROUP BY query shared by the aggregate endpoints
+
+    Served from the monthly rollup table when it can answer the request,
+    otherwise aggregated over the base table.
+    """
+    # Remove None values
+    filters = {k: v for k, v in filters.items() if v is not None}
+
+    try:
+        validate_date_field(date_field)
+        group_names, metric_names = parse_list_param(group_by), parse_list_param(metrics)
+        where_clause, params = build_where_clause(filters, date_field=date_field, table=table)
+        query = build_aggregate_query(
+            table, where_clause, group_names, metric_names,
+            period=period, period_field=period_field
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Answer from the monthly rollup when grouping, metrics and filters allow it
+    rollup = build_rollup_query(
+        table, filters, date_field, group_names, metric_names,
+        period=period, period_field=period_field
+    )
+    if rollup:
+        query, params = rollup
+
+    key = ('aggregate', table, date_field, normalize_filters(filters),
+           group_by, metrics, period, period_field, limit)
+    data = await cached_call(
+        key,
+        lambda: execute_query(f"{query} LIMIT %s", tuple(params + [limit])),
+        scope=date_scope(table, date_field, filters)
+    )
+
+    return ApiResponse(
+        success=True,
+        count=len(data),
+        limit=limit,
+        data=data
+    )
+
+
+async def list_financial(filters: dict, record_type: Optional[str], date_field: str, limit: int, offset: int,
+                         cursor: Optional[str], total_mode: str = 'exact',
+                         fields: Optional[str] = None) -> ApiResponse:
+    """
+    Page through income and outcome rows as one stream (UNION ALL)
+
+    Rows carry record_type and are ordered by `{date_field} DESC, record_type, id`;
+    next_cursor encodes the record type so keyset paging stays exact across
+    both tables. The total is the sum of the per-table totals.
+    """
+    # Remove None values
+    filters = {k: v for k, v in filters.items() if v is not None}
+
+    try:
+        validate_date_field(date_field)
+        columns = resolve_fields('financial', fields, date_field) or list(FINANCIAL_COLUMNS)
+        position = decode_financial_cursor(cursor, date_field) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if 'record_type' not in columns:
+        columns.insert(0, 'record_type')
+
+    async def compute():
+        branches = financial_branches(filters, record_type)
+        if not branches:
+            return ApiResponse(success=True, total=0, total_mode=total_mode, count=0, limit=limit,
+                               offset=None if cursor else offset, data=[])
+
+        page_offset = 0 if position else offset
+        query, params = build_financial_query(branches, date_field, columns, limit, page_offset, position)
+
+        counts = []
+        for _, table, branch_filters in branches:
+            where_clause, where_params = build_where_clause(branch_filters, date_field=date_field, table=table)
+            counts.append(count_total(table, branch_filters, date_field, where_clause, where_params, total_mode))
+        data, *totals = await asyncio.gather(execute_query(query, tuple(params)), *counts)
+
+        return ApiResponse(
+            success=True,
+            total=None if total_mode == 'none' else sum(totals),
+            total_mode=total_mode,
+            count=len(data),
+            limit=limit,
+            offset=None if cursor else offset,
+            next_cursor=encode_cursor(data[-1], date_field) if len(data) == limit else None,
+            data=data
+        )
+
+    key = ('financial', record_type, date_field, normalize_filters(filters),
+           limit, offset, cursor, total_mode, tuple(columns))
+    return await cached_call(key, compute)
+
+
+async def list_report(filters: dict, date_field: str, limit: int, offset: int, cursor: Optional[str],
+                      total_mode: str = 'exact', fields: Optional[str] = None,
+                      snapshot: bool = False) -> ApiResponse:
+    """
+    Page through the reporting snapshot (REPORT_TABLE) maintained by the sync
+
+    Same rows, ordering and cursors as /api/financial, plus the derived
+    connector fields, from a single indexed table. Responses are cached per
+    data generation and day (the aging fields depend on the current date).
+    """
+    # Remove None values
+    filters = {k: v for k, v in filters.items() if v is not None}
+
+    try:
+        validate_date_field(date_field)
+        columns = resolve_fields(REPORT_TABLE, fields, date_field) or list(TABLE_COLUMNS[REPORT_TABLE])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if 'record_type' not in columns:
+        columns.insert(0, 'record_type')
+
+    if snapshot or snapshot_position(cursor):
+        return await list_snapshot(REPORT_TABLE, filters, date_field, limit, offset, cursor,
+                                   report_select_list(columns), f"{date_field} DESC, record_type, id",
+                                   keyed_by_type=True)
+
+    try:
+        position = decode_financial_cursor(cursor, date_field) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def compute():
+        where_clause, params = build_where_clause(filters, date_field=date_field, table=REPORT_TABLE)
+        page_clause, page_params, page_offset = where_clause, params, offset
+        if position:
+            keyset_clause, keyset_params = build_report_keyset_clause(position, date_field)
+            page_clause = f"{where_clause} AND {keyset_clause}"
+            page_params = params + keyset_params
+            page_offset = 0
+
+        data_query = f"""
+            SELECT {report_select_list(columns)} FROM {REPORT_TABLE}
+            WHERE {page_clause}
+            ORDER BY {date_field} DESC, record_type, id
+            LIMIT %s OFFSET %s
+        """
+        total, data = await asyncio.gather(
+            count_total(REPORT_TABLE, filters, date_field, where_clause, params, total_mode),
+            execute_query(data_query, tuple(page_params + [limit, page_offset]))
+        )
+
+        return ApiResponse(
+            success=True,
+            total=total,
+            total_mode=total_mode,
+            count=len(data),
+            limit=limit,
+            offset=None if cursor else offset,
+            next_cursor=encode_cursor(data[-1], date_field) if len(data) == limit else None,
+            data=data
+        )
+
+    key = ('report', date.today(), date_field, normalize_filters(filters),
+           limit, offset, cursor, total_mode, tuple(columns))
+    return await cached_call(key, compute)
+
+
+async def fetch_batch(table: str, ids: list[str], fields: Optional[str] = None) -> BatchResponse:
+    """
+    Resolve many records by id in a single round trip, shared by the batch endpoints
+
+    Duplicate ids are collapsed; found rows keep the order of the request and
+    ids without a row are listed in missing.
+    """
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        raise HTTPException(status_code=400, detail="At least one id is required")
+    if len(ids) > BATCH_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_IDS} ids per request, got {len(ids)}")
+    select_list = projection(table, fields, None)
+
+    async def compute():
+        query = f"SELECT {select_list} FROM {table} WHERE id = ANY(%s)"
+        rows = {row['id']: row for row in await execute_query(query, (ids,))}
+        data = [rows[record_id] for record_id in ids if record_id in rows]
+        return BatchResponse(
+            success=True,
+            count=len(data),
+            data=data,
+            missing=[record_id for record_id in ids if record_id not in rows]
+        )
+
+    return await cached_call(('batch', table, tuple(ids), select_list), compute)
+
+
+async def run_subquery(query: SubQuery) -> ApiResponse:
+    """Run one /api/query sub-query through the same code path as its GET endpoint"""
+    table = FINANCIAL_TABLES[query.record_type]
+    filters = query.filters.model_dump(exclude_none=True)
+    unavailable = [f for f in filters if f not in RANGE_FILTERS and f not in TABLE_COLUMNS[table]]
+    if unavailable:
+        raise HTTPException(status_code=400,
+                            detail=f"Filters not available on {query.record_type}: {', '.join(unavailable)}")
+    try:
+        validate_date_field(query.date_field)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if query.type == 'list':
+        limit = query.limit or 100
+        if limit > 1000:
+            raise HTTPException(status_code=400, detail="limit must be at most 1000 for list sub-queries")
+        return await list_records(table, filters, query.date_field, limit, query.offset,
+                                  query.cursor, query.total_mode, query.fields)
+
+    if query.type == 'aggregate':
+        return await aggregate_records(table, filters, query.date_field, query.group_by, query.metrics,
+                                       query.period, query.period_field, query.limit or 1000)
+
+    where_clause, params = build_where_clause(filters, date_field=query.date_field, table=table)
+    total = await count_total(table, filters, query.date_field, where_clause, params, query.total_mode)
+    return ApiResponse(success=True, total=total, total_mode=query.total_mode, data=None)
+
+
+async def timed_subquery(query: SubQuery) -> dict:
+    """Run a sub-query, capturing its result or error and its duration"""
+    start = time.perf_counter()
+    entry = {'type': query.type, 'record_type': query.record_type}
+    try:
+        entry.update(dict(await run_subquery(query)))
+    except HTTPException as e:
+        entry.update(success=False, error=e.detail, status_code=e.status_code)
+    except Exception as e:
+        logger.error(f"Error running sub-query '{query.name}': {e}")
+        entry.update(success=False, error=f"Failed to run sub-query: {str(e)}", status_code=500)
+    entry['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 2)
+    return entry
+
+
+def export_records(table: str, filters: dict, date_field: str, export_format: str) -> StreamingResponse:
+    """
+    Stream every row matching the filters, shared by the export endpoints
+
+    Rows are read through a server-side cursor and encoded batch by batch,
+    so server memory stays constant whatever the result size. Arrow and
+    Parquet are built from tuple batches, one record batch per fetch.
+
+    A stream holds a pooled connection until the download ends: beyond
+    EXPORT_MAX_CONCURRENT running exports, requests get 503 + Retry-After.
+    """
+    # Remove None values
+    filters = {k: v for k, v in filters.items() if v is not None}
+
+    try:
+        validate_date_field(date_field)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    where_clause, params = build_where_clause(filters, date_field=date_field, table=table)
+    query = f"""
+        SELECT * FROM {table}
+        WHERE {where_clause}
+        ORDER BY {date_field} DESC, id
+    """
+    if export_slots.locked():
+        raise HTTPException(status_code=503, detail="Too many exports in progress, retry shortly",
+                            headers={"Retry-After": "30"})
+    if export_format in COLUMNAR_FORMATS:
+        chunks = columnar_chunks(stream_columns(query, tuple(params)), export_format)
+    elif export_format == 'csv':
+        chunks = csv_chunks(stream_columns(query, tuple(params)))
+    else:
+        chunks = ndjson_chunks(stream_query(query, tuple(params)))
+
+    media_type, extension = EXPORT_FORMATS[export_format]
+    filename = f"{table.replace('_data', '')}_{datetime.now():%Y%m%d_%H%M%S}.{extension}"
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
 # Income endpoints
 @app.get("/api/income", response_model=ApiResponse)
 async def get_income_data(
@@ -105,13 +747,25 @@ async def get_income_data(
     min_amount: Optional[float] = Query(None, description="Minimum amount filter"),
     max_amount: Optional[float] = Query(None, description="Maximum amount filter"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum records to return"),
-    offset: int = Query(0, ge=0, description="Number of records to skip (pagination)")
+    offset: int = Query(0, ge=0, description="Number of records to skip (pagination)"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous next_cursor (faster than offset for deep pages)"),
+    total_mode: TotalMode = Query('exact', description="How total is computed: exact (COUNT), estimate (planner), none, or cached (exact, memoized until next sync)"),
+    format: ListFormat = Query('json', description="Response format: json, arrow (IPC stream) or parquet"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns and/or presets (summary, scalar, all); default all columns"),
+    snapshot: bool = Query(False, description="Freeze the ordered result set: next_cursor pages through it, unaffected by syncs, until it expires (JSON only)")
 ):
     """
     Get income data (Contas a Receber) with optional filters
 
     All filters are optional and can be combined.
     Results are paginated with a maximum of 1000 records per request.
+    Pass `next_cursor` back as `cursor` to fetch the next page by keyset seek.
+    Use `total_mode` to skip, estimate or cache the total count.
+    With `format=arrow|parquet` the page is returned as a columnar file and
+    total / next_cursor are sent as X-Total-Count / X-Next-Cursor headers.
+    Use `fields` (e.g. `fields=summary`) to leave out unneeded columns,
+    notably the JSONB arrays. With `snapshot=true` the matching ids are frozen
+    and next_cursor pages through them consistently across syncs.
     """
     try:
         # Build filters dictionary (excluding limit and offset)
@@ -128,38 +782,147 @@ async def get_income_data(
             'max_amount': max_amount
         }
 
-        # Remove None values
-        filters = {k: v for k, v in filters.items() if v is not None}
+        if format in COLUMNAR_FORMATS:
+            if snapshot or snapshot_position(cursor):
+                raise HTTPException(status_code=400, detail="Snapshot paging is only available with format=json")
+            return await list_records_columnar(
+                'income_data', filters, date_field, limit, offset, cursor, total_mode, format, fields
+            )
+        return fast_response(await list_records(
+            'income_data', filters, date_field, limit, offset, cursor, total_mode, fields, snapshot
+        ))
 
-        # Build WHERE clause with dynamic date field
-        where_clause, params = build_where_clause(filters, date_field=date_field)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching income data: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to fetch income data: {str(e)}")
 
-        # Get total count
-        count_query = f"SELECT COUNT(*) as total FROM income_data WHERE {where_clause}"
-        count_result = execute_single(count_query, tuple(params))
-        total = count_result['total'] if count_result else 0
 
-        # Get paginated data
-        data_query = f"""
-            SELECT * FROM income_data
-            WHERE {where_clause}
-            ORDER BY {date_field} DESC, id
-            LIMIT %s OFFSET %s
-        """
-        data = execute_query(data_query, tuple(params + [limit, offset]))
+@app.get("/api/income/aggregate", response_model=ApiResponse)
+async def get_income_aggregate(
+    group_by: Optional[str] = Query(None, description="Comma-separated: period, company, project, business_area, cost_center, status_parcela, client"),
+    metrics: Optional[str] = Query(None, description="Comma-separated: count, sum_/avg_ original_amount, balance_amount, corrected_balance_amount"),
+    period: str = Query('month', description="Period granularity when grouping by period (day, week, month)"),
+    period_field: str = Query('due_date', description="Date field truncated to the period"),
+    company_id: Optional[int] = Query(None, description="Filter by company ID"),
+    company_name: Optional[str] = Query(None, description="Partial search in company name"),
+    client_id: Optional[int] = Query(None, description="Filter by client ID"),
+    client_name: Optional[str] = Query(None, description="Partial search in client name"),
+    project_id: Optional[int] = Query(None, description="Filter by project ID"),
+    business_area_id: Optional[int] = Query(None, description="Filter by business area ID"),
+    start_date: Optional[date] = Query(None, description="Start date for filtering"),
+    end_date: Optional[date] = Query(None, description="End date for filtering"),
+    date_field: str = Query('due_date', description="Date field to use for filtering (due_date, payment_date, issue_date, etc)"),
+    min_amount: Optional[float] = Query(None, description="Minimum amount filter"),
+    max_amount: Optional[float] = Query(None, description="Maximum amount filter"),
+    limit: int = Query(1000, ge=1, le=10000, description="Maximum groups to return")
+):
+    """
+    Get aggregated income data (Contas a Receber) computed in the database
 
-        return ApiResponse(
-            success=True,
-            total=total,
-            count=len(data),
-            limit=limit,
-            offset=offset,
-            data=data
-        )
+    Groups by the requested dimensions and returns the requested metrics,
+    e.g. `group_by=period,company&metrics=count,sum_balance_amount`.
+    Without group_by a single totals row is returned.
+    """
+    try:
+        filters = {
+            'company_id': company_id,
+            'company_name': company_name,
+            'client_id': client_id,
+            'client_name': client_name,
+            'project_id': project_id,
+            'business_area_id': business_area_id,
+            'start_date': start_date,
+            'end_date': end_date,
+            'min_amount': min_amount,
+            'max_amount': max_amount
+        }
+
+        return fast_response(await aggregate_records(
+            'income_data', filters, date_field, group_by, metrics, period, period_field, limit
+        ))
 
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error fetching income data: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to fetch income data: {str(e)}")
+        logger.error(f"Error aggregating income data: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to aggregate income data: {str(e)}")
+
+
+@app.get("/api/income/export", response_class=StreamingResponse)
+async def export_income_data(
+    format: Literal['ndjson', 'csv', 'arrow', 'parquet'] = Query('ndjson', description="Export format: ndjson, csv, arrow (IPC stream) or parquet"),
+    company_id: Optional[int] = Query(None, description="Filter by company ID"),
+    company_name: Optional[str] = Query(None, description="Partial search in company name"),
+    client_id: Optional[int] = Query(None, description="Filter by client ID"),
+    client_name: Optional[str] = Query(None, description="Partial search in client name"),
+    project_id: Optional[int] = Query(None, description="Filter by project ID"),
+    business_area_id: Optional[int] = Query(None, description="Filter by business area ID"),
+    start_date: Optional[date] = Query(None, description="Start date for filtering"),
+    end_date: Optional[date] = Query(None, description="End date for filtering"),
+    date_field: str = Query('due_date', description="Date field to use for filtering (due_date, payment_date, issue_date, etc)"),
+    min_amount: Optional[float] = Query(None, description="Minimum amount filter"),
+    max_amount: Optional[float] = Query(None, description="Maximum amount filter")
+):
+    """
+    Export all matching income data (Contas a Receber) as a streamed file
+
+    No pagination: every row matching the filters is streamed as NDJSON, CSV,
+    Arrow IPC stream or Parquet.
+    """
+    filters = {
+        'company_id': company_id,
+        'company_name': company_name,
+        'client_id': client_id,
+        'client_name': client_name,
+        'project_id': project_id,
+        'business_area_id': business_area_id,
+        'start_date': start_date,
+        'end_date': end_date,
+        'min_amount': min_amount,
+        'max_amount': max_amount
+    }
+
+    return export_records('income_data', filters, date_field, format)
+
+
+@app.get("/api/income/batch", response_model=BatchResponse)
+async def get_income_batch(
+    ids: str = Query(..., description="Comma-separated record IDs (installment_bill), e.g. 47_635,47_1"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns and/or presets (summary, scalar, all); default all columns")
+):
+    """
+    Get many income records by ID in one request
+
+    Returns the rows found, in request order, plus the `missing` ids.
+    At most BATCH_MAX_IDS ids; use POST for longer lists than a URL allows.
+    """
+    try:
+        return fast_response(await fetch_batch('income_data', parse_list_param(ids), fields))
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching income batch: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to fetch income records: {str(e)}")
+
+
+@app.post("/api/income/batch", response_model=BatchResponse)
+async def post_income_batch(request: BatchRequest):
+    """
+    Get many income records by ID, ids in the JSON body
+
+    Same response as GET /api/income/batch.
+    """
+    try:
+        return fast_response(await fetch_batch('income_data', request.ids, request.fields))
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching income batch: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to fetch income records: {str(e)}")
 
 
 @app.get("/api/income/{id}", response_model=ApiResponse)
@@ -171,15 +934,19 @@ async def get_income_by_id(id: str):
     """
     try:
         query = "SELECT * FROM income_data WHERE id = %s"
-        result = execute_single(query, (id,))
+        result = await cached_call(
+            ('id', 'income_data', id),
+            lambda: execute_single(query, (id,)),
+            scope=lambda row: ('income_data', 'issue_date', row.get('issue_date'), row.get('issue_date'))
+        )
 
         if not result:
             raise HTTPException(status_code=404, detail=f"Income record with ID '{id}' not found")
 
-        return ApiResponse(
+        return fast_response(ApiResponse(
             success=True,
             data=result
-        )
+        ))
 
     except HTTPException:
         raise
@@ -204,13 +971,25 @@ async def get_outcome_data(
     max_amount: Optional[float] = Query(None, description="Maximum amount filter"),
     authorization_status: Optional[str] = Query(None, description="Filter by authorization status"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum records to return"),
-    offset: int = Query(0, ge=0, description="Number of records to skip (pagination)")
+    offset: int = Query(0, ge=0, description="Number of records to skip (pagination)"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous next_cursor (faster than offset for deep pages)"),
+    total_mode: TotalMode = Query('exact', description="How total is computed: exact (COUNT), estimate (planner), none, or cached (exact, memoized until next sync)"),
+    format: ListFormat = Query('json', description="Response format: json, arrow (IPC stream) or parquet"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns and/or presets (summary, scalar, all); default all columns"),
+    snapshot: bool = Query(False, description="Freeze the ordered result set: next_cursor pages through it, unaffected by syncs, until it expires (JSON only)")
 ):
     """
     Get outcome data (Contas a Pagar) with optional filters
 
     All filters are optional and can be combined.
     Results are paginated with a maximum of 1000 records per request.
+    Pass `next_cursor` back as `cursor` to fetch the next page by keyset seek.
+    Use `total_mode` to skip, estimate or cache the total count.
+    With `format=arrow|parquet` the page is returned as a columnar file and
+    total / next_cursor are sent as X-Total-Count / X-Next-Cursor headers.
+    Use `fields` (e.g. `fields=summary`) to leave out unneeded columns,
+    notably the JSONB arrays. With `snapshot=true` the matching ids are frozen
+    and next_cursor pages through them consistently across syncs.
     """
     try:
         # Build filters dictionary
@@ -228,38 +1007,151 @@ async def get_outcome_data(
             'authorization_status': authorization_status
         }
 
-        # Remove None values
-        filters = {k: v for k, v in filters.items() if v is not None}
+        if format in COLUMNAR_FORMATS:
+            if snapshot or snapshot_position(cursor):
+                raise HTTPException(status_code=400, detail="Snapshot paging is only available with format=json")
+            return await list_records_columnar(
+                'outcome_data', filters, date_field, limit, offset, cursor, total_mode, format, fields
+            )
+        return fast_response(await list_records(
+            'outcome_data', filters, date_field, limit, offset, cursor, total_mode, fields, snapshot
+        ))
 
-        # Build WHERE clause with dynamic date field
-        where_clause, params = build_where_clause(filters, date_field=date_field)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching outcome data: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to fetch outcome data: {str(e)}")
 
-        # Get total count
-        count_query = f"SELECT COUNT(*) as total FROM outcome_data WHERE {where_clause}"
-        count_result = execute_single(count_query, tuple(params))
-        total = count_result['total'] if count_result else 0
 
-        # Get paginated data
-        data_query = f"""
-            SELECT * FROM outcome_data
-            WHERE {where_clause}
-            ORDER BY {date_field} DESC, id
-            LIMIT %s OFFSET %s
-        """
-        data = execute_query(data_query, tuple(params + [limit, offset]))
+@app.get("/api/outcome/aggregate", response_model=ApiResponse)
+async def get_outcome_aggregate(
+    group_by: Optional[str] = Query(None, description="Comma-separated: period, company, project, business_area, cost_center, status_parcela, creditor, authorization_status"),
+    metrics: Optional[str] = Query(None, description="Comma-separated: count, sum_/avg_ original_amount, balance_amount, corrected_balance_amount"),
+    period: str = Query('month', description="Period granularity when grouping by period (day, week, month)"),
+    period_field: str = Query('due_date', description="Date field truncated to the period"),
+    company_id: Optional[int] = Query(None, description="Filter by company ID"),
+    company_name: Optional[str] = Query(None, description="Partial search in company name"),
+    creditor_id: Optional[int] = Query(None, description="Filter by creditor/supplier ID"),
+    creditor_name: Optional[str] = Query(None, description="Partial search in creditor name"),
+    project_id: Optional[int] = Query(None, description="Filter by project ID"),
+    business_area_id: Optional[int] = Query(None, description="Filter by business area ID"),
+    start_date: Optional[date] = Query(None, description="Start date for filtering"),
+    end_date: Optional[date] = Query(None, description="End date for filtering"),
+    date_field: str = Query('due_date', description="Date field to use for filtering (due_date, payment_date, issue_date, etc)"),
+    min_amount: Optional[float] = Query(None, description="Minimum amount filter"),
+    max_amount: Optional[float] = Query(None, description="Maximum amount filter"),
+    authorization_status: Optional[str] = Query(None, description="Filter by authorization status"),
+    limit: int = Query(1000, ge=1, le=10000, description="Maximum groups to return")
+):
+    """
+    Get aggregated outcome data (Contas a Pagar) computed in the database
 
-        return ApiResponse(
-            success=True,
-            total=total,
-            count=len(data),
-            limit=limit,
-            offset=offset,
-            data=data
-        )
+    Groups by the requested dimensions and returns the requested metrics,
+    e.g. `group_by=period,company&metrics=count,sum_balance_amount`.
+    Without group_by a single totals row is returned.
+    """
+    try:
+        filters = {
+            'company_id': company_id,
+            'company_name': company_name,
+            'creditor_id': creditor_id,
+            'creditor_name': creditor_name,
+            'project_id': project_id,
+            'business_area_id': business_area_id,
+            'start_date': start_date,
+            'end_date': end_date,
+            'min_amount': min_amount,
+            'max_amount': max_amount,
+            'authorization_status': authorization_status
+        }
+
+        return fast_response(await aggregate_records(
+            'outcome_data', filters, date_field, group_by, metrics, period, period_field, limit
+        ))
 
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error fetching outcome data: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to fetch outcome data: {str(e)}")
+        logger.error(f"Error aggregating outcome data: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to aggregate outcome data: {str(e)}")
+
+
+@app.get("/api/outcome/export", response_class=StreamingResponse)
+async def export_outcome_data(
+    format: Literal['ndjson', 'csv', 'arrow', 'parquet'] = Query('ndjson', description="Export format: ndjson, csv, arrow (IPC stream) or parquet"),
+    company_id: Optional[int] = Query(None, description="Filter by company ID"),
+    company_name: Optional[str] = Query(None, description="Partial search in company name"),
+    creditor_id: Optional[int] = Query(None, description="Filter by creditor/supplier ID"),
+    creditor_name: Optional[str] = Query(None, description="Partial search in creditor name"),
+    project_id: Optional[int] = Query(None, description="Filter by project ID"),
+    business_area_id: Optional[int] = Query(None, description="Filter by business area ID"),
+    start_date: Optional[date] = Query(None, description="Start date for filtering"),
+    end_date: Optional[date] = Query(None, description="End date for filtering"),
+    date_field: str = Query('due_date', description="Date field to use for filtering (due_date, payment_date, issue_date, etc)"),
+    min_amount: Optional[float] = Query(None, description="Minimum amount filter"),
+    max_amount: Optional[float] = Query(None, description="Maximum amount filter"),
+    authorization_status: Optional[str] = Query(None, description="Filter by authorization status")
+):
+    """
+    Export all matching outcome data (Contas a Pagar) as a streamed file
+
+    No pagination: every row matching the filters is streamed as NDJSON, CSV,
+    Arrow IPC stream or Parquet.
+    """
+    filters = {
+        'company_id': company_id,
+        'company_name': company_name,
+        'creditor_id': creditor_id,
+        'creditor_name': creditor_name,
+        'project_id': project_id,
+        'business_area_id': business_area_id,
+        'start_date': start_date,
+        'end_date': end_date,
+        'min_amount': min_amount,
+        'max_amount': max_amount,
+        'authorization_status': authorization_status
+    }
+
+    return export_records('outcome_data', filters, date_field, format)
+
+
+@app.get("/api/outcome/batch", response_model=BatchResponse)
+async def get_outcome_batch(
+    ids: str = Query(..., description="Comma-separated record IDs (installment_bill), e.g. 8_12574,8_1"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns and/or presets (summary, scalar, all); default all columns")
+):
+    """
+    Get many outcome records by ID in one request
+
+    Returns the rows found, in request order, plus the `missing` ids.
+    At most BATCH_MAX_IDS ids; use POST for longer lists than a URL allows.
+    """
+    try:
+        return fast_response(await fetch_batch('outcome_data', parse_list_param(ids), fields))
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching outcome batch: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to fetch outcome records: {str(e)}")
+
+
+@app.post("/api/outcome/batch", response_model=BatchResponse)
+async def post_outcome_batch(request: BatchRequest):
+    """
+    Get many outcome records by ID, ids in the JSON body
+
+    Same response as GET /api/outcome/batch.
+    """
+    try:
+        return fast_response(await fetch_batch('outcome_data', request.ids, request.fields))
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching outcome batch: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to fetch outcome records: {str(e)}")
 
 
 @app.get("/api/outcome/{id}", response_model=ApiResponse)
@@ -271,15 +1163,19 @@ async def get_outcome_by_id(id: str):
     """
     try:
         query = "SELECT * FROM outcome_data WHERE id = %s"
-        result = execute_single(query, (id,))
+        result = await cached_call(
+            ('id', 'outcome_data', id),
+            lambda: execute_single(query, (id,)),
+            scope=lambda row: ('outcome_data', 'issue_date', row.get('issue_date'), row.get('issue_date'))
+        )
 
         if not result:
             raise HTTPException(status_code=404, detail=f"Outcome record with ID '{id}' not found")
 
-        return ApiResponse(
+        return fast_response(ApiResponse(
             success=True,
             data=result
-        )
+        ))
 
     except HTTPException:
         raise
@@ -288,6 +1184,227 @@ async def get_outcome_by_id(id: str):
         raise HTTPException(status_code=500, detail=f"Failed to fetch outcome record: {str(e)}")
 
 
+# Unified endpoint
+@app.get("/api/financial", response_model=ApiResponse)
+async def get_financial_data(
+    record_type: Optional[RecordType] = Query(None, description="Only income or only outcome rows (default both)"),
+    company_id: Optional[int] = Query(None, description="Filter by company ID"),
+    company_name: Optional[str] = Query(None, description="Partial search in company name"),
+    client_id: Optional[int] = Query(None, description="Filter by client ID (income rows only)"),
+    client_name: Optional[str] = Query(None, description="Partial search in client name (income rows only)"),
+    creditor_id: Optional[int] = Query(None, description="Filter by creditor/supplier ID (outcome rows only)"),
+    creditor_name: Optional[str] = Query(None, description="Partial search in creditor name (outcome rows only)"),
+    project_id: Optional[int] = Query(None, description="Filter by project ID"),
+    business_area_id: Optional[int] = Query(None, description="Filter by business area ID"),
+    start_date: Optional[date] = Query(None, description="Start date for filtering"),
+    end_date: Optional[date] = Query(None, description="End date for filtering"),
+    date_field: str = Query('due_date', description="Date field to use for filtering (due_date, payment_date, issue_date, etc)"),
+    min_amount: Optional[float] = Query(None, description="Minimum amount filter"),
+    max_amount: Optional[float] = Query(None, description="Maximum amount filter"),
+    authorization_status: Optional[str] = Query(None, description="Filter by authorization status (outcome rows only)"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum records to return"),
+    offset: int = Query(0, ge=0, description="Number of records to skip (pagination)"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous next_cursor (faster than offset for deep pages)"),
+    total_mode: TotalMode = Query('exact', description="How total is computed: exact (COUNT), estimate (planner), none, or cached (exact, memoized until next sync)"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns and/or presets (summary, scalar, all); default all columns")
+):
+    """
+    Get income and outcome data as one list, in the connector schema
+
+    Each row has `record_type` (income / outcome); columns that exist in only
+    one table are null on the other type's rows. Filters on client_*,
+    creditor_* or authorization_status only match the table that has them.
+    Paging, `fields` and `total_mode` work as on /api/income and /api/outcome.
+    """
+    try:
+        filters = {
+            'company_id': company_id,
+            'company_name': company_name,
+            'client_id': client_id,
+            'client_name': client_name,
+            'creditor_id': creditor_id,
+            'creditor_name': creditor_name,
+            'project_id': project_id,
+            'business_area_id': business_area_id,
+            'start_date': start_date,
+            'end_date': end_date,
+            'min_amount': min_amount,
+            'max_amount': max_amount,
+            'authorization_status': authorization_status
+        }
+
+        return fast_response(await list_financial(
+            filters, record_type, date_field, limit, offset, cursor, total_mode, fields
+        ))
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching financial data: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to fetch financial data: {str(e)}")
+
+
+@app.get("/api/report", response_model=ApiResponse)
+async def get_report_data(
+    record_type: Optional[RecordType] = Query(None, description="Only income or only outcome rows (default both)"),
+    company_id: Optional[int] = Query(None, description="Filter by company ID"),
+    company_name: Optional[str] = Query(None, description="Partial search in company name"),
+    client_id: Optional[int] = Query(None, description="Filter by client ID (income rows only)"),
+    client_name: Optional[str] = Query(None, description="Partial search in client name (income rows only)"),
+    creditor_id: Optional[int] = Query(None, description="Filter by creditor/supplier ID (outcome rows only)"),
+    creditor_name: Optional[str] = Query(None, description="Partial search in creditor name (outcome rows only)"),
+    project_id: Optional[int] = Query(None, description="Filter by project ID"),
+    business_area_id: Optional[int] = Query(None, description="Filter by business area ID"),
+    start_date: Optional[date] = Query(None, description="Start date for filtering"),
+    end_date: Optional[date] = Query(None, description="End date for filtering"),
+    date_field: str = Query('due_date', description="Date field to use for filtering (due_date, payment_date, issue_date, etc)"),
+    min_amount: Optional[float] = Query(None, description="Minimum amount filter"),
+    max_amount: Optional[float] = Query(None, description="Maximum amount filter"),
+    authorization_status: Optional[str] = Query(None, description="Filter by authorization status (outcome rows only)"),
+    situacao_pagamento: Optional[str] = Query(None, description="Filter by payment status (Pago, Parcial, Pendente)"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum records to return"),
+    offset: int = Query(0, ge=0, description="Number of records to skip (pagination)"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous next_cursor (faster than offset for deep pages)"),
+    total_mode: TotalMode = Query('exact', description="How total is computed: exact (COUNT), estimate (planner), none, or cached (exact, memoized until next sync)"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns and/or presets (summary, all); default all columns"),
+    snapshot: bool = Query(False, description="Freeze the ordered result set: next_cursor pages through it, unaffected by syncs, until it expires (JSON only)")
+):
+    """
+    Get the Looker-ready reporting snapshot (income + outcome, derived fields precomputed)
+
+    Rows of /api/financial without the JSONB arrays, plus record_type_label,
+    total_movimentacoes, valor_liquido, data_ultima_movimentacao,
+    situacao_pagamento, taxa_inadimplencia, the outcome totals and the aging
+    fields (dias_atraso, faixa_aging, situacao_vencimento, as of today).
+    `snapshot=true` freezes the ordered result set for multi-page reads.
+    """
+    try:
+        filters = {
+            'record_type': record_type,
+            'company_id': company_id,
+            'company_name': company_name,
+            'client_id': client_id,
+            'client_name': client_name,
+            'creditor_id': creditor_id,
+            'creditor_name': creditor_name,
+            'project_id': project_id,
+            'business_area_id': business_area_id,
+            'start_date': start_date,
+            'end_date': end_date,
+            'min_amount': min_amount,
+            'max_amount': max_amount,
+            'authorization_status': authorization_status,
+            'situacao_pagamento': situacao_pagamento
+        }
+
+        return fast_response(await list_report(
+            filters, date_field, limit, offset, cursor, total_mode, fields, snapshot
+        ))
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching report data: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to fetch report data: {str(e)}")
+
+
+@app.get("/api/dimensions/{name}", response_model=ApiResponse)
+async def get_dimension(
+    name: str,
+    record_type: Optional[RecordType] = Query(None, description="Only members present in income or in outcome rows")
+):
+    """
+    List the members of a dimension for filter dropdowns
+
+    Dimensions: company, project, business_area, cost_center, client, creditor.
+    Each member has `id` (null for cost_center), `name`, `records`, the
+    due/issue date ranges and `record_types`. Precomputed by the sync and
+    cached until the next one.
+    """
+    try:
+        query, params = build_dimension_query(name, record_type)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        data = await cached_call(('dimension', name, record_type), lambda: execute_query(query, params))
+        return fast_response(ApiResponse(
+            success=True,
+            total=len(data),
+            count=len(data),
+            data=data
+        ))
+
+    except Exception as e:
+        logger.error(f"Error fetching dimension {name}: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to fetch dimension {name}: {str(e)}")
+
+
+@app.get("/api/search/{dimension}", response_model=ApiResponse)
+async def search_dimension(
+    dimension: str,
+    q: str = Query(..., min_length=1, max_length=100, description="Text contained in the name (case-insensitive)"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum matches to return")
+):
+    """
+    Type-ahead search of a dimension: company, project, business_area, cost_center, client or creditor
+
+    Returns distinct `{id, name, records}` whose name contains `q`, prefix
+    matches first, then by similarity and number of records. Served from the
+    dimension catalog (trigram-indexed).
+    """
+    term = q.strip()
+    if not term:
+        # An empty term would match every member (ILIKE '%%') without the index
+        raise HTTPException(status_code=400, detail="q must contain non-blank characters")
+    try:
+        query, params = build_search_query(dimension, term, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        data = await cached_call(('search', dimension, term.lower(), limit),
+                                 lambda: execute_query(query, params))
+        return fast_response(ApiResponse(
+            success=True,
+            count=len(data),
+            limit=limit,
+            data=data
+        ))
+
+    except Exception as e:
+        logger.error(f"Error searching {dimension}: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to search {dimension}: {str(e)}")
+
+
+@app.post("/api/query", response_model=ApiResponse)
+async def run_queries(request: MultiQueryRequest):
+    """
+    Run several named list, aggregate or count sub-queries in one request
+
+    Sub-queries take the parameters of the matching GET endpoint and run
+    concurrently on the connection pool, sharing its caches. `data` maps each
+    name to its result envelope plus `elapsed_ms`; a failing sub-query
+    reports `success: false`, `error` and `status_code` without failing the
+    others (the top-level `success` is false if any failed).
+    """
+    names = [query.name for query in request.queries]
+    if len(names) > QUERY_MAX_SUBQUERIES:
+        raise HTTPException(status_code=400,
+                            detail=f"At most {QUERY_MAX_SUBQUERIES} sub-queries per request, got {len(names)}")
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise HTTPException(status_code=400, detail=f"Duplicate sub-query names: {', '.join(duplicates)}")
+
+    results = await asyncio.gather(*(timed_subquery(query) for query in request.queries))
+
+    return fast_response(ApiResponse(
+        success=all(result['success'] for result in results),
+        count=len(results),
+        data=dict(zip(names, results))
+    ))
+
+
 # Run with: uvicorn main:app --host 0.0.0.0 --port 8000 --reload
 if __name__ == "__main__":
     import uvicorn
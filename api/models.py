@@ -1,19 +1,38 @@
 """Pydantic models for Sienge Financial API"""
 from pydantic import BaseModel, Field
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Literal
 from datetime import datetime, date
 
 
+TotalMode = Literal['exact', 'estimate', 'none', 'cached']
+
+# Response body of the list endpoints: JSON envelope or columnar (Arrow IPC stream / Parquet)
+ListFormat = Literal['json', 'arrow', 'parquet']
+
+# Record types of the unified /api/financial listing
+RecordType = Literal['income', 'outcome']
+
+# Sub-query kinds of the multi-query endpoint (/api/query)
+SubQueryType = Literal['list', 'aggregate', 'count']
+
+
 class ApiResponse(BaseModel):
     """Standard API response wrapper"""
     success: bool = True
     total: Optional[int] = None
+    total_mode: Optional[str] = None
     count: Optional[int] = None
     limit: Optional[int] = None
     offset: Optional[int] = None
+    next_cursor: Optional[str] = None
     data: Any
 
 
+class BatchResponse(ApiResponse):
+    """Multi-get response: rows found, in request order, and the ids that were not"""
+    missing: List[str] = []
+
+
 class ErrorResponse(BaseModel):
     """Error response model"""
     success: bool = False
@@ -35,6 +54,11 @@ class IncomeFilters(BaseModel):
     max_amount: Optional[float] = Field(None, description="Maximum amount filter")
     limit: int = Field(100, ge=1, le=1000, description="Maximum records to return")
     offset: int = Field(0, ge=0, description="Number of records to skip (pagination)")
+    cursor: Optional[str] = Field(None, description="Keyset cursor from a previous next_cursor")
+    total_mode: TotalMode = Field('exact', description="How total is computed: exact, estimate, none or cached")
+    format: ListFormat = Field('json', description="Response format: json, arrow or parquet")
+    fields: Optional[str] = Field(None, description="Comma-separated columns and/or presets (summary, scalar, all)")
+    snapshot: bool = Field(False, description="Page through a frozen result set (next_cursor), JSON only")
 
 
 class OutcomeFilters(BaseModel):
@@ -52,6 +76,57 @@ class OutcomeFilters(BaseModel):
     authorization_status: Optional[str] = Field(None, description="Filter by authorization status")
     limit: int = Field(100, ge=1, le=1000, description="Maximum records to return")
     offset: int = Field(0, ge=0, description="Number of records to skip (pagination)")
+    cursor: Optional[str] = Field(None, description="Keyset cursor from a previous next_cursor")
+    total_mode: TotalMode = Field('exact', description="How total is computed: exact, estimate, none or cached")
+    format: ListFormat = Field('json', description="Response format: json, arrow or parquet")
+    fields: Optional[str] = Field(None, description="Comma-separated columns and/or presets (summary, scalar, all)")
+    snapshot: bool = Field(False, description="Page through a frozen result set (next_cursor), JSON only")
+
+
+class BatchRequest(BaseModel):
+    """Body of the POST multi-get endpoints"""
+    ids: List[str] = Field(..., min_length=1, description="Record IDs (installment_bill), e.g. [\"47_635\", \"47_636\"]")
+    fields: Optional[str] = Field(None, description="Comma-separated columns and/or presets (summary, scalar, all)")
+
+
+class SubQueryFilters(BaseModel):
+    """Filters of one /api/query sub-query (client_* only on income, creditor_*/authorization_status only on outcome)"""
+    company_id: Optional[int] = None
+    company_name: Optional[str] = None
+    client_id: Optional[int] = None
+    client_name: Optional[str] = None
+    creditor_id: Optional[int] = None
+    creditor_name: Optional[str] = None
+    project_id: Optional[int] = None
+    business_area_id: Optional[int] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    min_amount: Optional[float] = None
+    max_amount: Optional[float] = None
+    authorization_status: Optional[str] = None
+
+
+class SubQuery(BaseModel):
+    """One named sub-query of a /api/query request, same parameters as the GET endpoints"""
+    name: str = Field(..., min_length=1, description="Key of this result in the response")
+    type: SubQueryType = Field(..., description="list, aggregate or count")
+    record_type: RecordType = Field(..., description="income or outcome")
+    filters: SubQueryFilters = Field(default_factory=SubQueryFilters)
+    date_field: str = Field('due_date', description="Date field to use for filtering")
+    limit: Optional[int] = Field(None, ge=1, le=10000, description="list: max 1000, default 100; aggregate: default 1000")
+    offset: int = Field(0, ge=0, description="list: records to skip")
+    cursor: Optional[str] = Field(None, description="list: keyset cursor from a previous next_cursor")
+    total_mode: TotalMode = Field('exact', description="list/count: how total is computed")
+    fields: Optional[str] = Field(None, description="list: comma-separated columns and/or presets")
+    group_by: Optional[str] = Field(None, description="aggregate: comma-separated dimensions")
+    metrics: Optional[str] = Field(None, description="aggregate: comma-separated metrics")
+    period: str = Field('month', description="aggregate: day, week or month")
+    period_field: str = Field('due_date', description="aggregate: date field truncated to the period")
+
+
+class MultiQueryRequest(BaseModel):
+    """Body of /api/query"""
+    queries: List[SubQuery] = Field(..., min_length=1, description="Sub-queries, run concurrently")
 
 
 class HealthCheck(BaseModel):
@@ -68,8 +143,20 @@ class ApiInfo(BaseModel):
     description: str = "API para consulta de dados financeiros do Sienge"
     endpoints: dict = {
         "income": "/api/income",
+        "income_aggregate": "/api/income/aggregate",
+        "income_export": "/api/income/export",
+        "income_batch": "/api/income/batch",
         "outcome": "/api/outcome",
+        "outcome_aggregate": "/api/outcome/aggregate",
+        "outcome_export": "/api/outcome/export",
+        "outcome_batch": "/api/outcome/batch",
+        "financial": "/api/financial",
+        "report": "/api/report",
+        "query": "/api/query",
+        "dimensions": "/api/dimensions/{name}",
+        "search": "/api/search/{dimension}",
         "health": "/api/health",
+        "stats": "/api/stats",
         "docs": "/docs",
         "redoc": "/redoc"
     }
\ No newline at end of file
@@ -0,0 +1,40 @@
+"""Tests of the /api/search type-ahead (no database: queries are stubbed)"""
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+@pytest.fixture
+def executed(monkeypatch):
+    """Record the queries the endpoint runs instead of sending them to PostgreSQL"""
+    queries = []
+
+    async def fake_execute_query(query, params=None):
+        queries.append((query, params))
+        return [{'id': 1, 'name': 'Construtora Alfa', 'records': 3}]
+
+    async def fake_generation():
+        return (1, 1)
+
+    monkeypatch.setattr(main, 'execute_query', fake_execute_query)
+    monkeypatch.setattr(main, 'get_data_generation', fake_generation)
+    monkeypatch.setattr('cache.get_data_generation', fake_generation)
+    main.response_cache.clear()
+    return queries
+
+
+def test_blank_query_is_rejected(executed):
+    response = TestClient(main.app).get('/api/search/company', params={'q': '   '})
+
+    assert response.status_code == 400
+    assert executed == []
+
+
+def test_query_is_stripped(executed):
+    response = TestClient(main.app).get('/api/search/company', params={'q': '  alfa '})
+
+    assert response.status_code == 200
+    assert response.json()['count'] == 1
+    _, params = executed[0]
+    assert '%alfa%' in params
@@ -41,6 +41,8 @@ var CONFIG = {
   // API Endpoints
   INCOME_ENDPOINT: '/api/income',
   OUTCOME_ENDPOINT: '/api/outcome',
+  FINANCIAL_ENDPOINT: '/api/financial', // Income + Outcome unificados (UNION ALL)
+  REPORT_ENDPOINT: '/api/report', // Snapshot unificado com campos derivados pré-calculados
 
   // Field Prefixes
   PREFIX_INCOME: 'income_',
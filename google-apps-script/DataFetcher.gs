@@ -12,10 +12,67 @@
  * Busca todos os dados unificados (Income + Outcome)
  * URL da API é FIXA (uso interno)
  *
+ * ✅ PERFORMANCE: Usa /api/report (snapshot unificado mantido pela sincronização,
+ * com campos derivados já calculados no PostgreSQL; uma única sequência paginada
+ * por cursor). Se o endpoint unificado falhar, cai para a busca separada de
+ * /api/income e /api/outcome.
+ *
  * @param {Object} configParams - Parâmetros de configuração
  * @param {Object} requestFilters - Filtros da query (dateRange, dimensionsFilters)
  */
 function fetchAllData(configParams, requestFilters) {
+  var includeIncome = configParams.includeIncome !== 'false';
+  var includeOutcome = configParams.includeOutcome !== 'false';
+  var primaryDateId = configParams.primary_date || 'due_date';
+
+  if (!includeIncome && !includeOutcome) {
+    throw new Error(ERROR_MESSAGES.NO_DATA_RETURNED);
+  }
+
+  // Copia dos filtros: a busca separada (fallback) não envia record_type
+  var filters = {};
+  for (var key in (requestFilters || {})) {
+    filters[key] = requestFilters[key];
+  }
+  if (!filters.date_field) {
+    filters.date_field = primaryDateId;
+  }
+  if (includeIncome !== includeOutcome) {
+    filters.record_type = includeIncome ? CONFIG.RECORD_TYPE_INCOME : CONFIG.RECORD_TYPE_OUTCOME;
+  }
+
+  try {
+    LOGGING.info('Fetching unified data from ' + CONFIG.API_URL + CONFIG.REPORT_ENDPOINT);
+    var allRecords = fetchAllPaginated(CONFIG.API_URL + CONFIG.REPORT_ENDPOINT, filters);
+
+    // Tipo vem da própria API (coluna record_type)
+    allRecords.forEach(function(record) {
+      record._recordType = record.record_type;
+    });
+
+    if (allRecords.length === 0) {
+      throw new Error(ERROR_MESSAGES.NO_DATA_RETURNED);
+    }
+
+    LOGGING.info('Total unified records: ' + allRecords.length);
+    return allRecords;
+  } catch (e) {
+    if (e.message === ERROR_MESSAGES.NO_DATA_RETURNED) {
+      throw e;
+    }
+    LOGGING.error('Unified endpoint failed, fetching income and outcome separately', e);
+    return fetchAllDataSeparately(configParams, requestFilters);
+  }
+}
+
+/**
+ * Busca Income e Outcome em endpoints separados e mescla no cliente
+ * Usado como fallback quando /api/report não está disponível
+ *
+ * @param {Object} configParams - Parâmetros de configuração
+ * @param {Object} requestFilters - Filtros da query (dateRange, dimensionsFilters)
+ */
+function fetchAllDataSeparately(configParams, requestFilters) {
   var apiUrl = CONFIG.API_URL;
   var includeIncome = configParams.includeIncome !== 'false';
   var includeOutcome = configParams.includeOutcome !== 'false';
@@ -133,11 +190,15 @@ function fetchAllData(configParams, requestFilters) {
         var allTypeRecords = firstPageRecords;
         if (data.count === CONFIG.MAX_RECORDS_PER_REQUEST) {
           LOGGING.info('First page returned ' + data.count + ' records, fetching remaining pages...');
-          var remainingRecords = fetchRemainingPages(
-            endpoint,
-            requestFilters,
-            CONFIG.MAX_RECORDS_PER_REQUEST
-          );
+
+          // ✅ PERFORMANCE: Keyset pagination (next_cursor) evita OFFSET profundo na API
+          var remainingRecords = data.next_cursor
+            ? fetchAllPaginated(endpoint, requestFilters, data.next_cursor)
+            : fetchRemainingPages(
+                endpoint,
+                requestFilters,
+                CONFIG.MAX_RECORDS_PER_REQUEST
+              );
 
           remainingRecords.forEach(function(record) {
             record._recordType = type === 'income'
@@ -421,12 +482,16 @@ function fetchOutcomeData(apiUrl, filters) {
 
 /**
  * Busca todos os dados com paginação automática
+ * Usa keyset pagination (next_cursor) quando a API retorna cursor, senão offset
+ *
  * @param {string} baseUrl - Endpoint da API
  * @param {Object} filters - Filtros da query (opcional)
+ * @param {string} startCursor - Cursor para continuar após uma página já buscada (opcional)
  */
-function fetchAllPaginated(baseUrl, filters) {
+function fetchAllPaginated(baseUrl, filters, startCursor) {
   var allData = [];
   var offset = 0;
+  var cursor = startCursor || null;
   var limit = CONFIG.MAX_RECORDS_PER_REQUEST;
   var hasMore = true;
   var maxIterations = 100; // Segurança contra loops infinitos
@@ -436,7 +501,7 @@ function fetchAllPaginated(baseUrl, filters) {
     iteration++;
 
     // NOVO: Construir URL com filtros
-    var url = buildQueryUrl(baseUrl, filters, limit, offset);
+    var url = buildQueryUrl(baseUrl, filters, limit, offset, cursor);
 
     try {
       var response = cachedFetch(url);
@@ -447,6 +512,7 @@ function fetchAllPaginated(baseUrl, filters) {
       if (response.data && response.data.length > 0) {
         allData = allData.concat(response.data);
         offset += limit;
+        cursor = response.next_cursor || null;
 
         // Verifica se tem mais dados
         // Se retornou menos que o limite, acabou
@@ -478,9 +544,10 @@ function fetchAllPaginated(baseUrl, filters) {
  * @param {Object} filters - Filtros da query (dateRange, dimensionsFilters)
  * @param {number} limit - Limite de registros por página
  * @param {number} offset - Offset para paginação
+ * @param {string} cursor - Cursor keyset (next_cursor da página anterior, opcional)
  * @returns {string} URL completa com query parameters
  */
-function buildQueryUrl(baseUrl, filters, limit, offset) {
+function buildQueryUrl(baseUrl, filters, limit, offset, cursor) {
   // ✅ SECURITY: Valida que limit e offset são números seguros
   var safeLimit = parseInt(limit, 10);
   var safeOffset = parseInt(offset, 10);
@@ -501,6 +568,11 @@ function buildQueryUrl(baseUrl, filters, limit, offset) {
 
   var params = ['limit=' + safeLimit, 'offset=' + safeOffset];
 
+  // Keyset pagination: API ignora offset quando cursor é enviado
+  if (cursor) {
+    params.push('cursor=' + encodeURIComponent(cursor));
+  }
+
   // ==========================================
   // Aplicar campo de data preferencial
   // ==========================================
@@ -509,6 +581,11 @@ function buildQueryUrl(baseUrl, filters, limit, offset) {
     params.push('date_field=' + encodeURIComponent(filters.date_field));
   }
 
+  // Endpoint unificado: restringe a um tipo quando só um foi incluído
+  if (filters && filters.record_type) {
+    params.push('record_type=' + encodeURIComponent(filters.record_type));
+  }
+
   // ==========================================
   // Aplicar filtros de data
   // ==========================================
@@ -183,8 +183,7 @@ function getFieldValue(record, fieldName, isIncome, calculateMetrics, primaryDat
     'issue_date',
     'bill_date',
     'installment_base_date',
-    'payment_date',
-    'data_ultima_movimentacao'
+    'payment_date'
   ];
 
   if (dateFields.indexOf(fieldName) !== -1) {
@@ -209,6 +208,7 @@ function getFieldValue(record, fieldName, isIncome, calculateMetrics, primaryDat
 
   if (fieldName === 'total_movimentacoes') {
     if (!calculateMetrics) return 0;
+    if (hasPrecomputed(record, 'total_movimentacoes')) return toNumber(record.total_movimentacoes, 0);
 
     var movements = isIncome ? record.receipts : record.payments;
     return countJsonbArray(movements);
@@ -216,6 +216,7 @@ function getFieldValue(record, fieldName, isIncome, calculateMetrics, primaryDat
 
   if (fieldName === 'valor_liquido') {
     if (!calculateMetrics) return 0;
+    if (hasPrecomputed(record, 'valor_liquido')) return toNumber(record.valor_liquido, 0);
 
     var movements = isIncome ? record.receipts : record.payments;
     return sumJsonbArray(movements, 'netAmount');
@@ -223,6 +224,7 @@ function getFieldValue(record, fieldName, isIncome, calculateMetrics, primaryDat
 
   if (fieldName === 'data_ultima_movimentacao') {
     if (!calculateMetrics) return '';
+    if (hasPrecomputed(record, 'data_ultima_movimentacao')) return formatDate(record.data_ultima_movimentacao);
 
     var movements = isIncome ? record.receipts : record.payments;
     return getLastDate(movements, 'paymentDate');
@@ -234,6 +236,7 @@ function getFieldValue(record, fieldName, isIncome, calculateMetrics, primaryDat
 
   if (fieldName === 'situacao_pagamento') {
     if (!calculateMetrics) return CONFIG.STATUS_PENDING;
+    if (hasPrecomputed(record, 'situacao_pagamento')) return record.situacao_pagamento;
 
     return calculatePaymentStatus(record, isIncome);
   }
@@ -246,6 +249,9 @@ function getFieldValue(record, fieldName, isIncome, calculateMetrics, primaryDat
     // ✅ PERFORMANCE: Retornar 0 se aging desabilitado
     if (!calculateMetrics || !calculateAging) return 0;
 
+    // ✅ PERFORMANCE: Valor calculado no PostgreSQL (/api/report)
+    if (hasPrecomputed(record, 'dias_atraso')) return toNumber(record.dias_atraso, 0);
+
     // ✅ PERFORMANCE: Verificar cache primeiro
     if (record._metricsCache && record._metricsCache.dias_atraso !== undefined) {
       return record._metricsCache.dias_atraso;
@@ -285,6 +291,9 @@ function getFieldValue(record, fieldName, isIncome, calculateMetrics, primaryDat
     // ✅ PERFORMANCE: Retornar N/A se aging desabilitado
     if (!calculateMetrics || !calculateAging) return 'N/A';
 
+    // ✅ PERFORMANCE: Valor calculado no PostgreSQL (/api/report)
+    if (hasPrecomputed(record, 'faixa_aging')) return record.faixa_aging;
+
     // ✅ PERFORMANCE: Verificar cache primeiro
     if (record._metricsCache && record._metricsCache.faixa_aging !== undefined) {
       return record._metricsCache.faixa_aging;
@@ -321,6 +330,9 @@ function getFieldValue(record, fieldName, isIncome, calculateMetrics, primaryDat
     // ✅ PERFORMANCE: Retornar 0 se aging desabilitado
     if (!calculateMetrics || !calculateAging) return 0;
 
+    // ✅ PERFORMANCE: Valor calculado no PostgreSQL (/api/report)
+    if (hasPrecomputed(record, 'taxa_inadimplencia')) return toNumber(record.taxa_inadimplencia, 0);
+
     // ✅ PERFORMANCE: Verificar cache primeiro
     if (record._metricsCache && record._metricsCache.taxa_inadimplencia !== undefined) {
       return record._metricsCache.taxa_inadimplencia;
@@ -350,6 +362,9 @@ function getFieldValue(record, fieldName, isIncome, calculateMetrics, primaryDat
     // ✅ PERFORMANCE: Retornar N/A se aging desabilitado
     if (!calculateMetrics || !calculateAging) return 'N/A';
 
+    // ✅ PERFORMANCE: Valor calculado no PostgreSQL (/api/report)
+    if (hasPrecomputed(record, 'situacao_vencimento')) return record.situacao_vencimento;
+
     // ✅ PERFORMANCE: Verificar cache primeiro
     if (record._metricsCache && record._metricsCache.situacao_vencimento !== undefined) {
       return record._metricsCache.situacao_vencimento;
@@ -488,6 +503,7 @@ function getFieldValue(record, fieldName, isIncome, calculateMetrics, primaryDat
   // Total Departamentos
   if (fieldName === 'outcome_total_departamentos') {
     if (!isIncome && calculateMetrics) {
+      if (hasPrecomputed(record, 'total_departamentos')) return toNumber(record.total_departamentos, 0);
       return countJsonbArray(record.departments_costs);
     }
     return 0;
@@ -496,6 +512,7 @@ function getFieldValue(record, fieldName, isIncome, calculateMetrics, primaryDat
   // Total Edificações
   if (fieldName === 'outcome_total_edificacoes') {
     if (!isIncome && calculateMetrics) {
+      if (hasPrecomputed(record, 'total_edificacoes')) return toNumber(record.total_edificacoes, 0);
       return countJsonbArray(record.buildings_costs);
     }
     return 0;
@@ -504,6 +521,7 @@ function getFieldValue(record, fieldName, isIncome, calculateMetrics, primaryDat
   // Total Autorizações
   if (fieldName === 'outcome_total_autorizacoes') {
     if (!isIncome && calculateMetrics) {
+      if (hasPrecomputed(record, 'total_autorizacoes')) return toNumber(record.total_autorizacoes, 0);
       return countJsonbArray(record.authorizations);
     }
     return 0;
@@ -515,4 +533,12 @@ function getFieldValue(record, fieldName, isIncome, calculateMetrics, primaryDat
 
   LOGGING.warn('Unknown field: ' + fieldName);
   return '';
-}
\ No newline at end of file
+}
+
+/**
+ * Indica se o registro já traz o campo derivado calculado pela API
+ * (tabela financial_report, servida em /api/report)
+ */
+function hasPrecomputed(record, fieldName) {
+  return record[fieldName] !== undefined && record[fieldName] !== null;
+}
@@ -0,0 +1,267 @@
+-- Migration: Add exploded child tables for JSONB arrays
+-- Date: 2026-10-19
+-- Description: Creates one-row-per-element tables for receipts, payments and
+-- category/department/building apportionments, and backfills them from the
+-- existing JSONB columns. After this, sync_sienge.py keeps them up to date.
+
+-- ==========================================
+-- STEP 1: Create child tables
+-- ==========================================
+
+CREATE TABLE IF NOT EXISTS income_receipts (
+    income_id VARCHAR(30) NOT NULL REFERENCES income_data(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    operation_type_id INTEGER,
+    operation_type_name VARCHAR,
+    gross_amount NUMERIC(15,2),
+    monetary_correction_amount NUMERIC(15,2),
+    interest_amount NUMERIC(15,2),
+    fine_amount NUMERIC(15,2),
+    discount_amount NUMERIC(15,2),
+    tax_amount NUMERIC(15,2),
+    net_amount NUMERIC(15,2),
+    calculation_date DATE,
+    payment_date DATE,
+    account_company_id INTEGER,
+    PRIMARY KEY (income_id, seq)
+);
+
+CREATE TABLE IF NOT EXISTS income_receipts_categories (
+    income_id VARCHAR(30) NOT NULL REFERENCES income_data(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    cost_center_id INTEGER,
+    cost_center_name VARCHAR,
+    financial_category_id VARCHAR,
+    financial_category_name VARCHAR,
+    financial_category_type VARCHAR,
+    financial_category_rate NUMERIC(7,4),
+    project_id INTEGER,
+    project_name VARCHAR,
+    business_area_id INTEGER,
+    business_area_name VARCHAR,
+    PRIMARY KEY (income_id, seq)
+);
+
+CREATE TABLE IF NOT EXISTS outcome_payments (
+    outcome_id VARCHAR(30) NOT NULL REFERENCES outcome_data(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    operation_type_id INTEGER,
+    operation_type_name VARCHAR,
+    gross_amount NUMERIC(15,2),
+    monetary_correction_amount NUMERIC(15,2),
+    interest_amount NUMERIC(15,2),
+    fine_amount NUMERIC(15,2),
+    discount_amount NUMERIC(15,2),
+    tax_amount NUMERIC(15,2),
+    net_amount NUMERIC(15,2),
+    corrected_net_amount NUMERIC(15,2),
+    calculation_date DATE,
+    payment_date DATE,
+    sequencial_number INTEGER,
+    payment_authentication VARCHAR,
+    PRIMARY KEY (outcome_id, seq)
+);
+
+CREATE TABLE IF NOT EXISTS outcome_payments_categories (
+    outcome_id VARCHAR(30) NOT NULL REFERENCES outcome_data(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    cost_center_id INTEGER,
+    cost_center_name VARCHAR,
+    financial_category_id VARCHAR,
+    financial_category_name VARCHAR,
+    financial_category_type VARCHAR,
+    financial_category_rate NUMERIC(7,4),
+    project_id INTEGER,
+    project_name VARCHAR,
+    PRIMARY KEY (outcome_id, seq)
+);
+
+CREATE TABLE IF NOT EXISTS outcome_departments_costs (
+    outcome_id VARCHAR(30) NOT NULL REFERENCES outcome_data(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    department_id INTEGER,
+    department_name VARCHAR,
+    rate NUMERIC(7,4),
+    PRIMARY KEY (outcome_id, seq)
+);
+
+CREATE TABLE IF NOT EXISTS outcome_buildings_costs (
+    outcome_id VARCHAR(30) NOT NULL REFERENCES outcome_data(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    building_id INTEGER,
+    building_name VARCHAR,
+    building_unit_id INTEGER,
+    building_unit_name VARCHAR,
+    cost_estimation_sheet_id VARCHAR,
+    cost_estimation_sheet_name VARCHAR,
+    rate NUMERIC(7,4),
+    PRIMARY KEY (outcome_id, seq)
+);
+
+-- ==========================================
+-- STEP 2: Backfill from existing JSONB
+-- ==========================================
+
+BEGIN;
+
+TRUNCATE income_receipts, income_receipts_categories,
+         outcome_payments, outcome_payments_categories,
+         outcome_departments_costs, outcome_buildings_costs;
+
+INSERT INTO income_receipts (
+    income_id, seq, operation_type_id, operation_type_name, gross_amount,
+    monetary_correction_amount, interest_amount, fine_amount, discount_amount,
+    tax_amount, net_amount, calculation_date, payment_date, account_company_id
+)
+SELECT
+    i.id, e.seq::INTEGER - 1,
+    (e.item->>'operationTypeId')::INTEGER,
+    e.item->>'operationTypeName',
+    (e.item->>'grossAmount')::NUMERIC,
+    (e.item->>'monetaryCorrectionAmount')::NUMERIC,
+    (e.item->>'interestAmount')::NUMERIC,
+    (e.item->>'fineAmount')::NUMERIC,
+    (e.item->>'discountAmount')::NUMERIC,
+    (e.item->>'taxAmount')::NUMERIC,
+    (e.item->>'netAmount')::NUMERIC,
+    (e.item->>'calculationDate')::DATE,
+    (e.item->>'paymentDate')::DATE,
+    (e.item->>'accountCompanyId')::INTEGER
+FROM income_data i
+CROSS JOIN LATERAL jsonb_array_elements(i.receipts) WITH ORDINALITY AS e(item, seq)
+WHERE jsonb_typeof(i.receipts) = 'array';
+
+INSERT INTO income_receipts_categories (
+    income_id, seq, cost_center_id, cost_center_name, financial_category_id,
+    financial_category_name, financial_category_type, financial_category_rate,
+    project_id, project_name, business_area_id, business_area_name
+)
+SELECT
+    i.id, e.seq::INTEGER - 1,
+    (e.item->>'costCenterId')::INTEGER,
+    e.item->>'costCenterName',
+    e.item->>'financialCategoryId',
+    e.item->>'financialCategoryName',
+    e.item->>'financialCategoryType',
+    (e.item->>'financialCategoryRate')::NUMERIC,
+    (e.item->>'projectId')::INTEGER,
+    e.item->>'projectName',
+    (e.item->>'businessAreaId')::INTEGER,
+    e.item->>'businessAreaName'
+FROM income_data i
+CROSS JOIN LATERAL jsonb_array_elements(i.receipts_categories) WITH ORDINALITY AS e(item, seq)
+WHERE jsonb_typeof(i.receipts_categories) = 'array';
+
+INSERT INTO outcome_payments (
+    outcome_id, seq, operation_type_id, operation_type_name, gross_amount,
+    monetary_correction_amount, interest_amount, fine_amount, discount_amount,
+    tax_amount, net_amount, corrected_net_amount, calculation_date,
+    payment_date, sequencial_number, payment_authentication
+)
+SELECT
+    o.id, e.seq::INTEGER - 1,
+    (e.item->>'operationTypeId')::INTEGER,
+    e.item->>'operationTypeName',
+    (e.item->>'grossAmount')::NUMERIC,
+    (e.item->>'monetaryCorrectionAmount')::NUMERIC,
+    (e.item->>'interestAmount')::NUMERIC,
+    (e.item->>'fineAmount')::NUMERIC,
+    (e.item->>'discountAmount')::NUMERIC,
+    (e.item->>'taxAmount')::NUMERIC,
+    (e.item->>'netAmount')::NUMERIC,
+    (e.item->>'correctedNetAmount')::NUMERIC,
+    (e.item->>'calculationDate')::DATE,
+    (e.item->>'paymentDate')::DATE,
+    (e.item->>'sequencialNumber')::INTEGER,
+    e.item->>'paymentAuthentication'
+FROM outcome_data o
+CROSS JOIN LATERAL jsonb_array_elements(o.payments) WITH ORDINALITY AS e(item, seq)
+WHERE jsonb_typeof(o.payments) = 'array';
+
+INSERT INTO outcome_payments_categories (
+    outcome_id, seq, cost_center_id, cost_center_name, financial_category_id,
+    financial_category_name, financial_category_type, financial_category_rate,
+    project_id, project_name
+)
+SELECT
+    o.id, e.seq::INTEGER - 1,
+    (e.item->>'costCenterId')::INTEGER,
+    e.item->>'costCenterName',
+    e.item->>'financialCategoryId',
+    e.item->>'financialCategoryName',
+    e.item->>'financialCategoryType',
+    (e.item->>'financialCategoryRate')::NUMERIC,
+    (e.item->>'projectId')::INTEGER,
+    e.item->>'projectName'
+FROM outcome_data o
+CROSS JOIN LATERAL jsonb_array_elements(o.payments_categories) WITH ORDINALITY AS e(item, seq)
+WHERE jsonb_typeof(o.payments_categories) = 'array';
+
+INSERT INTO outcome_departments_costs (outcome_id, seq, department_id, department_name, rate)
+SELECT
+    o.id, e.seq::INTEGER - 1,
+    (e.item->>'id')::INTEGER,
+    e.item->>'name',
+    (e.item->>'rate')::NUMERIC
+FROM outcome_data o
+CROSS JOIN LATERAL jsonb_array_elements(o.departments_costs) WITH ORDINALITY AS e(item, seq)
+WHERE jsonb_typeof(o.departments_costs) = 'array';
+
+INSERT INTO outcome_buildings_costs (
+    outcome_id, seq, building_id, building_name, building_unit_id,
+    building_unit_name, cost_estimation_sheet_id, cost_estimation_sheet_name, rate
+)
+SELECT
+    o.id, e.seq::INTEGER - 1,
+    (e.item->>'buildingId')::INTEGER,
+    e.item->>'buildingName',
+    (e.item->>'buildingUnitId')::INTEGER,
+    e.item->>'buildingUnitName',
+    e.item->>'costEstimationSheetId',
+    e.item->>'costEstimationSheetName',
+    (e.item->>'rate')::NUMERIC
+FROM outcome_data o
+CROSS JOIN LATERAL jsonb_array_elements(o.buildings_costs) WITH ORDINALITY AS e(item, seq)
+WHERE jsonb_typeof(o.buildings_costs) = 'array';
+
+COMMIT;
+
+-- ==========================================
+-- STEP 3: Indexes
+-- ==========================================
+
+CREATE INDEX IF NOT EXISTS idx_income_receipts_payment_date ON income_receipts(payment_date);
+CREATE INDEX IF NOT EXISTS idx_income_receipts_cat_cost_center ON income_receipts_categories(cost_center_id);
+CREATE INDEX IF NOT EXISTS idx_income_receipts_cat_cost_center_name ON income_receipts_categories(cost_center_name);
+CREATE INDEX IF NOT EXISTS idx_income_receipts_cat_category ON income_receipts_categories(financial_category_id);
+CREATE INDEX IF NOT EXISTS idx_outcome_payments_payment_date ON outcome_payments(payment_date);
+CREATE INDEX IF NOT EXISTS idx_outcome_payments_cat_cost_center ON outcome_payments_categories(cost_center_id);
+CREATE INDEX IF NOT EXISTS idx_outcome_payments_cat_cost_center_name ON outcome_payments_categories(cost_center_name);
+CREATE INDEX IF NOT EXISTS idx_outcome_payments_cat_category ON outcome_payments_categories(financial_category_id);
+CREATE INDEX IF NOT EXISTS idx_outcome_departments_costs_department ON outcome_departments_costs(department_id);
+CREATE INDEX IF NOT EXISTS idx_outcome_buildings_costs_building ON outcome_buildings_costs(building_id);
+
+ANALYZE income_receipts;
+ANALYZE income_receipts_categories;
+ANALYZE outcome_payments;
+ANALYZE outcome_payments_categories;
+ANALYZE outcome_departments_costs;
+ANALYZE outcome_buildings_costs;
+
+-- ==========================================
+-- STEP 4: Verify the migration
+-- ==========================================
+
+-- Cash by payment date (all split payments, not only element ->0)
+SELECT payment_date, COUNT(*) AS payments, SUM(net_amount) AS total_net
+FROM outcome_payments
+GROUP BY payment_date
+ORDER BY payment_date DESC
+LIMIT 10;
+
+-- ==========================================
+-- ROLLBACK (if needed)
+-- ==========================================
+-- DROP TABLE income_receipts, income_receipts_categories,
+--            outcome_payments, outcome_payments_categories,
+--            outcome_departments_costs, outcome_buildings_costs;
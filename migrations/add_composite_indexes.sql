@@ -0,0 +1,74 @@
+-- Migration: Composite list indexes and partial open-balance indexes
+-- Date: 2026-10-19
+-- Description: Lists are filtered on one column and ordered by
+-- {date_field} DESC, id. With only single-column indexes,
+-- "company_id = ? AND due_date BETWEEN ? AND ? ORDER BY due_date DESC, id LIMIT 1000"
+-- fetched every matching row and sorted it. (filter, due_date DESC, id) indexes
+-- return the page in order and stop after LIMIT rows. The single-column
+-- company/client/creditor indexes are a prefix of the new ones and are dropped.
+-- The overdue views read balance_amount > 0 only: partial indexes keep just
+-- the open installments.
+-- Indexes are built CONCURRENTLY: run this file outside a transaction block
+-- (psql -f, no BEGIN); writes (syncs) are not blocked while they build.
+-- Further indexes for the observed workload: scripts/index_advisor.py
+
+-- ==========================================
+-- STEP 1: Composite list indexes
+-- ==========================================
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_income_company_due ON income_data(company_id, due_date DESC, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_income_client_due ON income_data(client_id, due_date DESC, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_income_project_due ON income_data(project_id, due_date DESC, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_outcome_company_due ON outcome_data(company_id, due_date DESC, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_outcome_creditor_due ON outcome_data(creditor_id, due_date DESC, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_outcome_project_due ON outcome_data(project_id, due_date DESC, id);
+
+-- ==========================================
+-- STEP 2: Partial indexes on open balances
+-- ==========================================
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_income_open_due ON income_data(due_date DESC, id) WHERE balance_amount > 0;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_outcome_open_due ON outcome_data(due_date DESC, id) WHERE balance_amount > 0;
+
+ANALYZE income_data;
+ANALYZE outcome_data;
+
+-- ==========================================
+-- STEP 3: Drop the indexes covered by the composites
+-- ==========================================
+DROP INDEX CONCURRENTLY IF EXISTS idx_income_client;
+DROP INDEX CONCURRENTLY IF EXISTS idx_income_company;
+DROP INDEX CONCURRENTLY IF EXISTS idx_outcome_creditor;
+DROP INDEX CONCURRENTLY IF EXISTS idx_outcome_company;
+
+-- ==========================================
+-- STEP 4: Verify the migration
+-- ==========================================
+-- Expect "Index Scan using idx_outcome_company_due" and no "Sort" node
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT * FROM outcome_data
+WHERE company_id = 1 AND due_date BETWEEN CURRENT_DATE - 365 AND CURRENT_DATE
+ORDER BY due_date DESC, id
+LIMIT 1000;
+
+-- Expect "Index Scan using idx_outcome_open_due"
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT * FROM overdue_outcome;
+
+-- Invalid indexes left by an interrupted CONCURRENTLY build (drop and re-run)
+SELECT indexrelid::regclass AS index_name
+FROM pg_index
+WHERE NOT indisvalid AND indexrelid::regclass::text LIKE '%\_due';
+
+-- Index sizes
+SELECT indexrelid::regclass AS index_name, pg_size_pretty(pg_relation_size(indexrelid)) AS size
+FROM pg_index
+WHERE indexrelid::regclass::text LIKE '%\_due'
+ORDER BY 1;
+
+-- ==========================================
+-- ROLLBACK (if needed)
+-- ==========================================
+-- CREATE INDEX CONCURRENTLY idx_income_client ON income_data(client_id);
+-- CREATE INDEX CONCURRENTLY idx_income_company ON income_data(company_id);
+-- CREATE INDEX CONCURRENTLY idx_outcome_creditor ON outcome_data(creditor_id);
+-- CREATE INDEX CONCURRENTLY idx_outcome_company ON outcome_data(company_id);
+-- DROP INDEX CONCURRENTLY IF EXISTS idx_income_company_due;  -- etc. for each index above
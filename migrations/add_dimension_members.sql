@@ -0,0 +1,160 @@
+-- Migration: Add the dimension catalog (filter dropdowns)
+-- Date: 2026-10-19
+-- Description: Creates dimension_members (distinct id/name pairs of company,
+-- project, business_area, cost_center, client and creditor per source table,
+-- with record counts and due/issue date ranges) and builds it from the full
+-- tables. sync_sienge.py recomputes the synced data type at the end of each run.
+-- Requires pg_trgm (migrations/add_trigram_search.sql).
+
+-- ==========================================
+-- STEP 1: Create catalog table
+-- ==========================================
+
+CREATE TABLE IF NOT EXISTS dimension_members (
+    dimension VARCHAR(20) NOT NULL,       -- company, project, business_area, cost_center, client, creditor
+    source VARCHAR(10) NOT NULL,          -- 'income' or 'outcome'
+    member_id INTEGER,                    -- NULL for cost_center (name only)
+    name VARCHAR NOT NULL,
+    record_count INTEGER NOT NULL,
+    first_due_date DATE,
+    last_due_date DATE,
+    first_issue_date DATE,
+    last_issue_date DATE,
+    refreshed_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_dimension_members_lookup ON dimension_members(dimension, name);
+-- Superseded by uq_dimension_members (STEP 2), which starts with the same columns
+DROP INDEX IF EXISTS idx_dimension_members_source;
+CREATE INDEX IF NOT EXISTS idx_dimension_members_name_trgm ON dimension_members USING GIN(name gin_trgm_ops);
+
+-- ==========================================
+-- STEP 2: Initial build (same statements as SiengeSync.refresh_dimensions)
+-- ==========================================
+BEGIN;
+
+DELETE FROM dimension_members;
+
+-- One row per member: the sync upserts on it (created on the emptied table,
+-- so duplicates left by an earlier build cannot block it)
+CREATE UNIQUE INDEX IF NOT EXISTS uq_dimension_members ON dimension_members(source, dimension, name);
+
+INSERT INTO dimension_members (
+    dimension, source, member_id, name, record_count,
+    first_due_date, last_due_date, first_issue_date, last_issue_date
+)
+SELECT
+    dimension, 'income', (array_agg(member_id ORDER BY record_count DESC))[1], name,
+    SUM(record_count), MIN(first_due_date), MAX(last_due_date),
+    MIN(first_issue_date), MAX(last_issue_date)
+FROM (
+    SELECT
+        CASE
+            WHEN GROUPING(company_name) = 0 THEN 'company'
+            WHEN GROUPING(project_name) = 0 THEN 'project'
+            WHEN GROUPING(business_area_name) = 0 THEN 'business_area'
+            WHEN GROUPING(cost_center_name) = 0 THEN 'cost_center'
+            WHEN GROUPING(client_name) = 0 THEN 'client'
+        END AS dimension,
+        CASE
+            WHEN GROUPING(company_name) = 0 THEN company_id
+            WHEN GROUPING(project_name) = 0 THEN project_id
+            WHEN GROUPING(business_area_name) = 0 THEN business_area_id
+            WHEN GROUPING(cost_center_name) = 0 THEN NULL
+            WHEN GROUPING(client_name) = 0 THEN client_id
+        END AS member_id,
+        CASE
+            WHEN GROUPING(company_name) = 0 THEN company_name
+            WHEN GROUPING(project_name) = 0 THEN project_name
+            WHEN GROUPING(business_area_name) = 0 THEN business_area_name
+            WHEN GROUPING(cost_center_name) = 0 THEN cost_center_name
+            WHEN GROUPING(client_name) = 0 THEN client_name
+        END AS name,
+        COUNT(*) AS record_count,
+        MIN(due_date) AS first_due_date, MAX(due_date) AS last_due_date,
+        MIN(issue_date) AS first_issue_date, MAX(issue_date) AS last_issue_date
+    FROM income_data
+    GROUP BY GROUPING SETS (
+        (company_id, company_name),
+        (project_id, project_name),
+        (business_area_id, business_area_name),
+        (cost_center_name),
+        (client_id, client_name)
+    )
+) members
+WHERE name IS NOT NULL
+GROUP BY dimension, name;
+
+INSERT INTO dimension_members (
+    dimension, source, member_id, name, record_count,
+    first_due_date, last_due_date, first_issue_date, last_issue_date
+)
+SELECT
+    dimension, 'outcome', (array_agg(member_id ORDER BY record_count DESC))[1], name,
+    SUM(record_count), MIN(first_due_date), MAX(last_due_date),
+    MIN(first_issue_date), MAX(last_issue_date)
+FROM (
+    SELECT
+        CASE
+            WHEN GROUPING(company_name) = 0 THEN 'company'
+            WHEN GROUPING(project_name) = 0 THEN 'project'
+            WHEN GROUPING(business_area_name) = 0 THEN 'business_area'
+            WHEN GROUPING(cost_center_name) = 0 THEN 'cost_center'
+            WHEN GROUPING(creditor_name) = 0 THEN 'creditor'
+        END AS dimension,
+        CASE
+            WHEN GROUPING(company_name) = 0 THEN company_id
+            WHEN GROUPING(project_name) = 0 THEN project_id
+            WHEN GROUPING(business_area_name) = 0 THEN business_area_id
+            WHEN GROUPING(cost_center_name) = 0 THEN NULL
+            WHEN GROUPING(creditor_name) = 0 THEN creditor_id
+        END AS member_id,
+        CASE
+            WHEN GROUPING(company_name) = 0 THEN company_name
+            WHEN GROUPING(project_name) = 0 THEN project_name
+            WHEN GROUPING(business_area_name) = 0 THEN business_area_name
+            WHEN GROUPING(cost_center_name) = 0 THEN cost_center_name
+            WHEN GROUPING(creditor_name) = 0 THEN creditor_name
+        END AS name,
+        COUNT(*) AS record_count,
+        MIN(due_date) AS first_due_date, MAX(due_date) AS last_due_date,
+        MIN(issue_date) AS first_issue_date, MAX(issue_date) AS last_issue_date
+    FROM outcome_data
+    GROUP BY GROUPING SETS (
+        (company_id, company_name),
+        (project_id, project_name),
+        (business_area_id, business_area_name),
+        (cost_center_name),
+        (creditor_id, creditor_name)
+    )
+) members
+WHERE name IS NOT NULL
+GROUP BY dimension, name;
+
+COMMIT;
+
+ANALYZE dimension_members;
+
+-- ==========================================
+-- STEP 3: Verify the migration
+-- ==========================================
+SELECT dimension, source, COUNT(*) AS members, SUM(record_count) AS records
+FROM dimension_members
+GROUP BY dimension, source
+ORDER BY dimension, source;
+
+-- No member listed twice (expect no rows)
+SELECT source, dimension, name, COUNT(*)
+FROM dimension_members
+GROUP BY source, dimension, name
+HAVING COUNT(*) > 1;
+
+-- Counts must match the source tables (one row per record per dimension)
+SELECT
+    (SELECT SUM(record_count) FROM dimension_members WHERE dimension = 'company' AND source = 'income') AS catalog,
+    (SELECT COUNT(*) FROM income_data WHERE company_name IS NOT NULL) AS income_data;
+
+-- ==========================================
+-- ROLLBACK (if needed)
+-- ==========================================
+-- DROP TABLE IF EXISTS dimension_members;
@@ -0,0 +1,232 @@
+-- Migration: Add the financial_report reporting snapshot
+-- Date: 2026-10-19
+-- Description: Creates financial_report (income + outcome flattened into the
+-- Looker connector schema, with movement counts, net values and payment status
+-- precomputed) and builds it from the full tables. sync_sienge.py then refreshes
+-- only the records of each run. After bulk deletes (cleanup scripts) rebuild it
+-- with STEP 2 or with: python sync_sienge.py --rebuild-report
+
+-- ==========================================
+-- STEP 1: Create reporting table
+-- ==========================================
+
+CREATE TABLE IF NOT EXISTS financial_report (
+    record_type VARCHAR(10) NOT NULL,     -- 'income' or 'outcome'
+    record_type_label VARCHAR(20) NOT NULL, -- 'Contas a Receber' / 'Contas a Pagar'
+    id VARCHAR(30) NOT NULL,
+    sync_date TIMESTAMP,
+
+    installment_id INTEGER,
+    bill_id INTEGER,
+    company_id INTEGER,
+    company_name VARCHAR,
+    business_area_id INTEGER,
+    business_area_name VARCHAR,
+    project_id INTEGER,
+    project_name VARCHAR,
+    group_company_id INTEGER,
+    group_company_name VARCHAR,
+    holding_id INTEGER,
+    holding_name VARCHAR,
+    subsidiary_id INTEGER,
+    subsidiary_name VARCHAR,
+    business_type_id INTEGER,
+    business_type_name VARCHAR,
+    document_identification_id VARCHAR,
+    document_identification_name VARCHAR,
+    document_number VARCHAR,
+    origin_id VARCHAR,
+    original_amount NUMERIC(15,2),
+    discount_amount NUMERIC(15,2),
+    tax_amount NUMERIC(15,2),
+    indexer_id INTEGER,
+    indexer_name VARCHAR,
+    due_date DATE,
+    issue_date DATE,
+    bill_date DATE,
+    installment_base_date DATE,
+    payment_date DATE,
+    balance_amount NUMERIC(15,2),
+    corrected_balance_amount NUMERIC(15,2),
+    status_parcela VARCHAR,
+    cost_center_name VARCHAR,
+
+    -- Income only
+    client_id INTEGER,
+    client_name VARCHAR,
+    document_forecast VARCHAR,
+    periodicity_type VARCHAR,
+    embedded_interest_amount NUMERIC(15,2),
+    interest_type VARCHAR,
+    interest_rate NUMERIC(5,2),
+    correction_type VARCHAR,
+    interest_base_date DATE,
+    defaulter_situation VARCHAR,
+    sub_judicie VARCHAR,
+    main_unit VARCHAR,
+    installment_number VARCHAR,
+    payment_term_id VARCHAR,
+    payment_term_descrition VARCHAR,
+    bearer_id INTEGER,
+
+    -- Outcome only
+    creditor_id INTEGER,
+    creditor_name VARCHAR,
+    forecast_document VARCHAR,
+    consistency_status VARCHAR,
+    authorization_status VARCHAR,
+    registered_user_id VARCHAR,
+    registered_by VARCHAR,
+    registered_date TIMESTAMP WITH TIME ZONE,
+
+    -- Derived (see SiengeSync.report_select)
+    total_movimentacoes INTEGER NOT NULL DEFAULT 0,  -- receipts / payments
+    valor_liquido NUMERIC(15,2),                     -- SUM(netAmount)
+    data_ultima_movimentacao DATE,                   -- MAX(paymentDate)
+    situacao_pagamento VARCHAR(20),                  -- Pago / Parcial / Pendente
+    taxa_inadimplencia NUMERIC(12,2),                -- balance / original * 100
+    total_departamentos INTEGER,                     -- outcome only
+    total_edificacoes INTEGER,                       -- outcome only
+    total_autorizacoes INTEGER,                      -- outcome only
+
+    refreshed_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (record_type, id)
+);
+
+-- Connector defaults: newest first on the chosen date, filtered by company / project / area
+CREATE INDEX IF NOT EXISTS idx_financial_report_due_date ON financial_report(due_date DESC, record_type, id);
+CREATE INDEX IF NOT EXISTS idx_financial_report_issue_date ON financial_report(issue_date DESC, record_type, id);
+CREATE INDEX IF NOT EXISTS idx_financial_report_payment_date ON financial_report(payment_date DESC, record_type, id);
+CREATE INDEX IF NOT EXISTS idx_financial_report_company ON financial_report(company_id, due_date DESC);
+CREATE INDEX IF NOT EXISTS idx_financial_report_project ON financial_report(project_id, due_date DESC);
+CREATE INDEX IF NOT EXISTS idx_financial_report_business_area ON financial_report(business_area_id, due_date DESC);
+CREATE INDEX IF NOT EXISTS idx_financial_report_client ON financial_report(client_id) WHERE client_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_financial_report_creditor ON financial_report(creditor_id) WHERE creditor_id IS NOT NULL;
+
+-- ==========================================
+-- STEP 2: Full build
+-- ==========================================
+
+BEGIN;
+
+TRUNCATE financial_report;
+
+INSERT INTO financial_report (
+    id, sync_date, installment_id, bill_id, company_id, company_name, business_area_id,
+    business_area_name, project_id, project_name, group_company_id, group_company_name,
+    holding_id, holding_name, subsidiary_id, subsidiary_name, business_type_id,
+    business_type_name, document_identification_id, document_identification_name,
+    document_number, origin_id, original_amount, discount_amount, tax_amount, indexer_id,
+    indexer_name, due_date, issue_date, bill_date, installment_base_date, payment_date,
+    balance_amount, corrected_balance_amount, status_parcela, cost_center_name, client_id,
+    client_name, document_forecast, periodicity_type, embedded_interest_amount,
+    interest_type, interest_rate, correction_type, interest_base_date, defaulter_situation,
+    sub_judicie, main_unit, installment_number, payment_term_id, payment_term_descrition,
+    bearer_id, creditor_id, creditor_name, forecast_document, consistency_status,
+    authorization_status, registered_user_id, registered_by, registered_date, record_type,
+    record_type_label, total_movimentacoes, valor_liquido, data_ultima_movimentacao,
+    situacao_pagamento, taxa_inadimplencia
+)
+SELECT
+    id, sync_date, installment_id, bill_id, company_id, company_name, business_area_id,
+    business_area_name, project_id, project_name, group_company_id, group_company_name,
+    holding_id, holding_name, subsidiary_id, subsidiary_name, business_type_id,
+    business_type_name, document_identification_id, document_identification_name,
+    document_number, origin_id, original_amount, discount_amount, tax_amount, indexer_id,
+    indexer_name, due_date, issue_date, bill_date, installment_base_date, payment_date,
+    balance_amount, corrected_balance_amount, status_parcela, cost_center_name, client_id,
+    client_name, document_forecast, periodicity_type, embedded_interest_amount,
+    interest_type, interest_rate, correction_type, interest_base_date, defaulter_situation,
+    sub_judicie, main_unit, installment_number, payment_term_id, payment_term_descrition,
+    bearer_id, NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL, 'income',
+    'Contas a Receber',
+    COALESCE(jsonb_array_length(receipts), 0),
+    (SELECT COALESCE(SUM(NULLIF(m->>'netAmount', '')::NUMERIC), 0)
+        FROM jsonb_array_elements(receipts) AS m),
+    (SELECT MAX(NULLIF(m->>'paymentDate', '')::DATE)
+        FROM jsonb_array_elements(receipts) AS m),
+    CASE
+        WHEN COALESCE(jsonb_array_length(receipts), 0) = 0 THEN 'Pendente'
+        WHEN COALESCE(balance_amount, 0) <= 0.01 THEN 'Pago'
+        WHEN COALESCE(balance_amount, 0) < COALESCE(original_amount, 0) THEN 'Parcial'
+        ELSE 'Pendente'
+    END,
+    CASE
+        WHEN COALESCE(original_amount, 0) = 0 THEN 0
+        ELSE ROUND(COALESCE(balance_amount, 0) / original_amount * 100, 2)
+    END
+FROM income_data;
+
+INSERT INTO financial_report (
+    id, sync_date, installment_id, bill_id, company_id, company_name, business_area_id,
+    business_area_name, project_id, project_name, group_company_id, group_company_name,
+    holding_id, holding_name, subsidiary_id, subsidiary_name, business_type_id,
+    business_type_name, document_identification_id, document_identification_name,
+    document_number, origin_id, original_amount, discount_amount, tax_amount, indexer_id,
+    indexer_name, due_date, issue_date, bill_date, installment_base_date, payment_date,
+    balance_amount, corrected_balance_amount, status_parcela, cost_center_name,
+    creditor_id, creditor_name, forecast_document, consistency_status,
+    authorization_status, registered_user_id, registered_by, registered_date, client_id,
+    client_name, document_forecast, periodicity_type, embedded_interest_amount,
+    interest_type, interest_rate, correction_type, interest_base_date, defaulter_situation,
+    sub_judicie, main_unit, installment_number, payment_term_id, payment_term_descrition,
+    bearer_id, record_type, record_type_label, total_movimentacoes, valor_liquido,
+    data_ultima_movimentacao, situacao_pagamento, taxa_inadimplencia, total_departamentos,
+    total_edificacoes, total_autorizacoes
+)
+SELECT
+    id, sync_date, installment_id, bill_id, company_id, company_name, business_area_id,
+    business_area_name, project_id, project_name, group_company_id, group_company_name,
+    holding_id, holding_name, subsidiary_id, subsidiary_name, business_type_id,
+    business_type_name, document_identification_id, document_identification_name,
+    document_number, origin_id, original_amount, discount_amount, tax_amount, indexer_id,
+    indexer_name, due_date, issue_date, bill_date, installment_base_date, payment_date,
+    balance_amount, corrected_balance_amount, status_parcela, cost_center_name,
+    creditor_id, creditor_name, forecast_document, consistency_status,
+    authorization_status, registered_user_id, registered_by, registered_date, NULL, NULL,
+    NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL,
+    'outcome', 'Contas a Pagar',
+    COALESCE(jsonb_array_length(payments), 0),
+    (SELECT COALESCE(SUM(NULLIF(m->>'netAmount', '')::NUMERIC), 0)
+        FROM jsonb_array_elements(payments) AS m),
+    (SELECT MAX(NULLIF(m->>'paymentDate', '')::DATE)
+        FROM jsonb_array_elements(payments) AS m),
+    CASE
+        WHEN COALESCE(jsonb_array_length(payments), 0) = 0 THEN 'Pendente'
+        WHEN COALESCE(balance_amount, 0) <= 0.01 THEN 'Pago'
+        WHEN COALESCE(balance_amount, 0) < COALESCE(original_amount, 0) THEN 'Parcial'
+        ELSE 'Pendente'
+    END,
+    CASE
+        WHEN COALESCE(original_amount, 0) = 0 THEN 0
+        ELSE ROUND(COALESCE(balance_amount, 0) / original_amount * 100, 2)
+    END,
+    COALESCE(jsonb_array_length(departments_costs), 0),
+    COALESCE(jsonb_array_length(buildings_costs), 0),
+    COALESCE(jsonb_array_length(authorizations), 0)
+FROM outcome_data;
+
+COMMIT;
+
+ANALYZE financial_report;
+
+-- ==========================================
+-- STEP 3: Verify the migration
+-- ==========================================
+
+-- Row counts must match the source tables
+SELECT 'income' AS record_type, (SELECT COUNT(*) FROM income_data) AS source,
+       (SELECT COUNT(*) FROM financial_report WHERE record_type = 'income') AS report
+UNION ALL
+SELECT 'outcome', (SELECT COUNT(*) FROM outcome_data),
+       (SELECT COUNT(*) FROM financial_report WHERE record_type = 'outcome');
+
+SELECT record_type, situacao_pagamento, COUNT(*), SUM(valor_liquido)
+FROM financial_report
+GROUP BY 1, 2
+ORDER BY 1, 2;
+
+-- ==========================================
+-- ROLLBACK (if needed)
+-- ==========================================
+-- DROP TABLE IF EXISTS financial_report;
@@ -0,0 +1,52 @@
+-- Migration: Add list snapshot tables (consistent multi-page reads)
+-- Date: 2026-10-19
+-- Description: Creates the UNLOGGED tables in which the API materializes the
+-- ordered id list of a snapshot=true list request (/api/income, /api/outcome,
+-- /api/report). Later pages read slices of it through next_cursor, so a sync
+-- committing mid-read no longer shifts pages. The API user needs write access.
+
+-- ==========================================
+-- STEP 1: Create snapshot tables
+-- ==========================================
+
+CREATE UNLOGGED TABLE IF NOT EXISTS list_snapshots (
+    token UUID PRIMARY KEY,
+    table_name VARCHAR(30) NOT NULL,      -- income_data, outcome_data, financial_report
+    total INTEGER NOT NULL DEFAULT 0,     -- rows in the snapshot
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+CREATE UNLOGGED TABLE IF NOT EXISTS list_snapshot_rows (
+    token UUID NOT NULL,                  -- list_snapshots.token (no FK: bulk inserts stay cheap)
+    position INTEGER NOT NULL,            -- 1-based rank in the list ordering
+    record_type VARCHAR(10) NOT NULL DEFAULT '',  -- financial_report only
+    id VARCHAR(30) NOT NULL,
+    PRIMARY KEY (token, position)
+);
+
+CREATE INDEX IF NOT EXISTS idx_list_snapshots_expires ON list_snapshots(expires_at);
+
+-- ==========================================
+-- STEP 2: Permissions for the API user
+-- ==========================================
+GRANT SELECT, INSERT, DELETE ON list_snapshots, list_snapshot_rows TO sienge_app;
+
+-- ==========================================
+-- STEP 3: Verify the migration
+-- ==========================================
+SELECT relname, relpersistence  -- 'u' = unlogged
+FROM pg_class
+WHERE relname IN ('list_snapshots', 'list_snapshot_rows');
+
+-- Live snapshots
+SELECT table_name, COUNT(*) AS snapshots, SUM(total) AS total_rows, MAX(expires_at) AS last_expiry
+FROM list_snapshots
+WHERE expires_at > NOW()
+GROUP BY table_name;
+
+-- ==========================================
+-- ROLLBACK (if needed)
+-- ==========================================
+-- DROP TABLE IF EXISTS list_snapshot_rows;
+-- DROP TABLE IF EXISTS list_snapshots;
@@ -0,0 +1,104 @@
+-- Migration: Add monthly rollup tables
+-- Date: 2026-10-19
+-- Description: Creates income_rollup_monthly / outcome_rollup_monthly and builds
+-- them from the full tables. sync_sienge.py then recomputes only the months
+-- touched by each run. After bulk deletes (cleanup scripts) rebuild the
+-- rollups from scratch with: python sync_sienge.py --rebuild-rollups (or STEP 2)
+
+-- ==========================================
+-- STEP 1: Create rollup tables
+-- ==========================================
+
+CREATE TABLE IF NOT EXISTS income_rollup_monthly (
+    month DATE,                          -- DATE_TRUNC('month', due_date)
+    company_id INTEGER,
+    company_name VARCHAR,
+    project_id INTEGER,
+    project_name VARCHAR,
+    business_area_id INTEGER,
+    business_area_name VARCHAR,
+    cost_center_name VARCHAR,
+    status_parcela VARCHAR,
+    record_count INTEGER NOT NULL,
+    sum_original_amount NUMERIC(18,2),
+    sum_balance_amount NUMERIC(18,2),
+    sum_corrected_balance_amount NUMERIC(18,2),
+    refreshed_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS outcome_rollup_monthly (
+    month DATE,                          -- DATE_TRUNC('month', due_date)
+    company_id INTEGER,
+    company_name VARCHAR,
+    project_id INTEGER,
+    project_name VARCHAR,
+    business_area_id INTEGER,
+    business_area_name VARCHAR,
+    cost_center_name VARCHAR,
+    status_parcela VARCHAR,
+    record_count INTEGER NOT NULL,
+    sum_original_amount NUMERIC(18,2),
+    sum_balance_amount NUMERIC(18,2),
+    sum_corrected_balance_amount NUMERIC(18,2),
+    refreshed_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_income_rollup_month ON income_rollup_monthly(month);
+CREATE INDEX IF NOT EXISTS idx_income_rollup_company ON income_rollup_monthly(company_id, month);
+CREATE INDEX IF NOT EXISTS idx_outcome_rollup_month ON outcome_rollup_monthly(month);
+CREATE INDEX IF NOT EXISTS idx_outcome_rollup_company ON outcome_rollup_monthly(company_id, month);
+
+-- ==========================================
+-- STEP 2: Full build
+-- ==========================================
+
+BEGIN;
+
+TRUNCATE income_rollup_monthly;
+INSERT INTO income_rollup_monthly (
+    month, company_id, company_name, project_id, project_name,
+    business_area_id, business_area_name, cost_center_name, status_parcela,
+    record_count, sum_original_amount, sum_balance_amount, sum_corrected_balance_amount
+)
+SELECT
+    DATE_TRUNC('month', due_date)::DATE AS month, company_id, company_name, project_id, project_name,
+    business_area_id, business_area_name, cost_center_name, status_parcela,
+    COUNT(*), SUM(original_amount), SUM(balance_amount), SUM(corrected_balance_amount)
+FROM income_data
+GROUP BY 1, company_id, company_name, project_id, project_name,
+    business_area_id, business_area_name, cost_center_name, status_parcela;
+
+TRUNCATE outcome_rollup_monthly;
+INSERT INTO outcome_rollup_monthly (
+    month, company_id, company_name, project_id, project_name,
+    business_area_id, business_area_name, cost_center_name, status_parcela,
+    record_count, sum_original_amount, sum_balance_amount, sum_corrected_balance_amount
+)
+SELECT
+    DATE_TRUNC('month', due_date)::DATE AS month, company_id, company_name, project_id, project_name,
+    business_area_id, business_area_name, cost_center_name, status_parcela,
+    COUNT(*), SUM(original_amount), SUM(balance_amount), SUM(corrected_balance_amount)
+FROM outcome_data
+GROUP BY 1, company_id, company_name, project_id, project_name,
+    business_area_id, business_area_name, cost_center_name, status_parcela;
+
+COMMIT;
+
+ANALYZE income_rollup_monthly;
+ANALYZE outcome_rollup_monthly;
+
+-- ==========================================
+-- STEP 3: Verify the migration
+-- ==========================================
+
+-- Totals must match the source tables
+SELECT
+    (SELECT SUM(record_count) FROM income_rollup_monthly) AS rollup_income,
+    (SELECT COUNT(*) FROM income_data) AS income,
+    (SELECT SUM(record_count) FROM outcome_rollup_monthly) AS rollup_outcome,
+    (SELECT COUNT(*) FROM outcome_data) AS outcome;
+
+-- ==========================================
+-- ROLLBACK (if needed)
+-- ==========================================
+-- DROP TABLE income_rollup_monthly, outcome_rollup_monthly;
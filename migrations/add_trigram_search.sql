@@ -0,0 +1,49 @@
+-- Migration: Trigram indexes for the *_name substring filters
+-- Date: 2026-10-19
+-- Description: company_name / client_name / creditor_name filters are
+-- ILIKE '%value%', which no B-tree can serve, so they scanned the whole table.
+-- pg_trgm GIN indexes make them index-assisted.
+-- Indexes are built CONCURRENTLY: run this file outside a transaction block
+-- (psql -f, no BEGIN); writes (syncs) are not blocked while they build.
+
+-- ==========================================
+-- STEP 1: Extension
+-- ==========================================
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- ==========================================
+-- STEP 2: Trigram indexes
+-- ==========================================
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_income_company_name_trgm ON income_data USING GIN(company_name gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_income_client_name_trgm ON income_data USING GIN(client_name gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_income_project_name_trgm ON income_data USING GIN(project_name gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_income_business_area_name_trgm ON income_data USING GIN(business_area_name gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_outcome_company_name_trgm ON outcome_data USING GIN(company_name gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_outcome_creditor_name_trgm ON outcome_data USING GIN(creditor_name gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_outcome_project_name_trgm ON outcome_data USING GIN(project_name gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_outcome_business_area_name_trgm ON outcome_data USING GIN(business_area_name gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_financial_report_company_name_trgm ON financial_report USING GIN(company_name gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_financial_report_client_name_trgm ON financial_report USING GIN(client_name gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_financial_report_creditor_name_trgm ON financial_report USING GIN(creditor_name gin_trgm_ops);
+
+ANALYZE income_data;
+ANALYZE outcome_data;
+ANALYZE financial_report;
+
+-- ==========================================
+-- STEP 3: Verify the migration
+-- ==========================================
+-- Expect "Bitmap Index Scan on idx_outcome_creditor_name_trgm" instead of "Seq Scan"
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT id FROM outcome_data WHERE creditor_name ILIKE '%constru%';
+
+-- Invalid indexes left by an interrupted CONCURRENTLY build (drop and re-run)
+SELECT indexrelid::regclass AS index_name
+FROM pg_index
+WHERE NOT indisvalid AND indexrelid::regclass::text LIKE '%_trgm';
+
+-- ==========================================
+-- ROLLBACK (if needed)
+-- ==========================================
+-- DROP INDEX CONCURRENTLY IF EXISTS idx_income_company_name_trgm;  -- etc. for each index above
+-- DROP EXTENSION pg_trgm;
@@ -0,0 +1,114 @@
+-- Migration: Slim JSONB arrays and switch them to lz4 TOAST compression
+-- Date: 2026-10-19
+-- Description: Sets COMPRESSION lz4 (PostgreSQL 14+) on the nested JSONB columns
+-- and rewrites existing rows with the same key projection sync_sienge.py applies
+-- at ingest (JSONB_PROJECTION). SET COMPRESSION alone only affects new values,
+-- so the UPDATE below is what recompresses the existing data.
+--
+-- IMPORTANT: run migrations/add_child_tables.sql BEFORE this one, the child
+-- tables are backfilled from the full (unprojected) JSONB.
+-- Keep the key lists below in sync with JSONB_PROJECTION if it is overridden.
+
+-- ==========================================
+-- STEP 0: Size before
+-- ==========================================
+SELECT
+    relname,
+    pg_size_pretty(pg_relation_size(oid)) AS heap,
+    pg_size_pretty(pg_total_relation_size(reltoastrelid)) AS toast,
+    pg_size_pretty(pg_total_relation_size(oid)) AS total
+FROM pg_class
+WHERE relname IN ('income_data', 'outcome_data');
+
+-- ==========================================
+-- STEP 1: lz4 compression on JSONB columns
+-- ==========================================
+ALTER TABLE income_data
+    ALTER COLUMN receipts SET COMPRESSION lz4,
+    ALTER COLUMN receipts_categories SET COMPRESSION lz4;
+
+ALTER TABLE outcome_data
+    ALTER COLUMN payments SET COMPRESSION lz4,
+    ALTER COLUMN payments_categories SET COMPRESSION lz4,
+    ALTER COLUMN departments_costs SET COMPRESSION lz4,
+    ALTER COLUMN buildings_costs SET COMPRESSION lz4,
+    ALTER COLUMN authorizations SET COMPRESSION lz4;
+
+-- ==========================================
+-- STEP 2: Projection helper
+-- ==========================================
+-- Keeps only the given keys of each object element, preserving element order
+CREATE OR REPLACE FUNCTION jsonb_project_array(arr JSONB, keys TEXT[])
+RETURNS JSONB AS $$
+    SELECT COALESCE(
+        jsonb_agg(
+            CASE
+                WHEN jsonb_typeof(t.elem) = 'object'
+                THEN COALESCE(
+                    (SELECT jsonb_object_agg(k, v) FROM jsonb_each(t.elem) AS x(k, v) WHERE k = ANY(keys)),
+                    '{}'::JSONB
+                )
+                ELSE t.elem
+            END
+            ORDER BY t.ord
+        ),
+        '[]'::JSONB
+    )
+    FROM jsonb_array_elements(CASE WHEN jsonb_typeof(arr) = 'array' THEN arr ELSE '[]'::JSONB END)
+         WITH ORDINALITY AS t(elem, ord)
+$$ LANGUAGE sql IMMUTABLE;
+
+-- ==========================================
+-- STEP 3: Rewrite existing rows (projection + lz4)
+-- ==========================================
+BEGIN;
+
+UPDATE income_data SET
+    receipts = jsonb_project_array(receipts, ARRAY[
+        'operationTypeId', 'operationTypeName', 'grossAmount', 'netAmount',
+        'calculationDate', 'paymentDate']),
+    receipts_categories = jsonb_project_array(receipts_categories, ARRAY[
+        'costCenterId', 'costCenterName', 'financialCategoryId',
+        'financialCategoryName', 'financialCategoryRate']);
+
+UPDATE outcome_data SET
+    payments = jsonb_project_array(payments, ARRAY[
+        'operationTypeId', 'operationTypeName', 'grossAmount', 'netAmount',
+        'calculationDate', 'paymentDate']),
+    payments_categories = jsonb_project_array(payments_categories, ARRAY[
+        'costCenterId', 'costCenterName', 'financialCategoryId',
+        'financialCategoryName', 'financialCategoryRate']),
+    departments_costs = jsonb_project_array(departments_costs, ARRAY['id', 'name', 'rate']),
+    buildings_costs = jsonb_project_array(buildings_costs, ARRAY['buildingId', 'buildingName', 'rate']),
+    authorizations = jsonb_project_array(authorizations, ARRAY[
+        'authorizationUserName', 'authorizationDate', 'isLastToAuthorize']);
+
+COMMIT;
+
+-- Reclaim the space of the old row versions
+VACUUM (FULL, ANALYZE) income_data;
+VACUUM (FULL, ANALYZE) outcome_data;
+
+-- ==========================================
+-- STEP 4: Verify the migration
+-- ==========================================
+SELECT
+    relname,
+    pg_size_pretty(pg_relation_size(oid)) AS heap,
+    pg_size_pretty(pg_total_relation_size(reltoastrelid)) AS toast,
+    pg_size_pretty(pg_total_relation_size(oid)) AS total
+FROM pg_class
+WHERE relname IN ('income_data', 'outcome_data');
+
+-- Compression method actually used by stored values (NULL = stored inline uncompressed)
+SELECT pg_column_compression(payments) AS method, COUNT(*)
+FROM outcome_data
+GROUP BY 1;
+
+-- ==========================================
+-- ROLLBACK (if needed)
+-- ==========================================
+-- Removed keys cannot be restored from the database; re-run a historical sync
+-- with JSONB_PROJECTION=none to reload full arrays.
+-- ALTER TABLE outcome_data ALTER COLUMN payments SET COMPRESSION pglz;  -- etc.
+-- DROP FUNCTION jsonb_project_array(JSONB, TEXT[]);
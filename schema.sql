@@ -4,6 +4,21 @@
 -- Drop tables if they exist (for clean setup)
 DROP TABLE IF EXISTS income_data CASCADE;
 DROP TABLE IF EXISTS outcome_data CASCADE;
+DROP TABLE IF EXISTS income_receipts CASCADE;
+DROP TABLE IF EXISTS income_receipts_categories CASCADE;
+DROP TABLE IF EXISTS outcome_payments CASCADE;
+DROP TABLE IF EXISTS outcome_payments_categories CASCADE;
+DROP TABLE IF EXISTS outcome_departments_costs CASCADE;
+DROP TABLE IF EXISTS outcome_buildings_costs CASCADE;
+DROP TABLE IF EXISTS income_rollup_monthly CASCADE;
+DROP TABLE IF EXISTS outcome_rollup_monthly CASCADE;
+DROP TABLE IF EXISTS financial_report CASCADE;
+DROP TABLE IF EXISTS list_snapshot_rows CASCADE;
+DROP TABLE IF EXISTS list_snapshots CASCADE;
+DROP TABLE IF EXISTS dimension_members CASCADE;
+
+-- Trigram operator classes for the indexed *_name substring filters (ILIKE '%...%')
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
 
 -- ==========================================
 -- INCOME DATA TABLE (Contas a Receber)
@@ -63,8 +78,9 @@ CREATE TABLE income_data (
     bearer_id INTEGER,
 
     -- Arrays stored as JSONB for flexibility
-    receipts JSONB,
-    receipts_categories JSONB,
+    -- Projected at ingest (JSONB_PROJECTION in sync_sienge.py) and TOASTed with lz4 (PostgreSQL 14+)
+    receipts JSONB COMPRESSION lz4,
+    receipts_categories JSONB COMPRESSION lz4,
 
     -- Generated column for status (considera receipts JSONB para maior precisão)
     -- Nota: Não usa CURRENT_DATE porque torna expressão volátil
@@ -168,11 +184,12 @@ CREATE TABLE outcome_data (
     registered_date TIMESTAMP WITH TIME ZONE,
 
     -- Arrays stored as JSONB for flexibility
-    payments JSONB,
-    payments_categories JSONB,
-    departments_costs JSONB,
-    buildings_costs JSONB,
-    authorizations JSONB,
+    -- Projected at ingest (JSONB_PROJECTION in sync_sienge.py) and TOASTed with lz4 (PostgreSQL 14+)
+    payments JSONB COMPRESSION lz4,
+    payments_categories JSONB COMPRESSION lz4,
+    departments_costs JSONB COMPRESSION lz4,
+    buildings_costs JSONB COMPRESSION lz4,
+    authorizations JSONB COMPRESSION lz4,
 
     -- Generated column for status (considera payments JSONB para maior precisão)
     -- Nota: Não usa CURRENT_DATE porque torna expressão volátil
@@ -247,8 +264,6 @@ ALTER TABLE outcome_data ADD CONSTRAINT unique_outcome_installment_bill UNIQUE (
 CREATE INDEX idx_income_installment ON income_data(installment_id);
 CREATE INDEX idx_income_bill ON income_data(bill_id);
 CREATE INDEX idx_income_due_date ON income_data(due_date);
-CREATE INDEX idx_income_client ON income_data(client_id);
-CREATE INDEX idx_income_company ON income_data(company_id);
 CREATE INDEX idx_income_issue_date ON income_data(issue_date);
 CREATE INDEX idx_income_receipts ON income_data USING GIN(receipts);
 CREATE INDEX idx_income_categories ON income_data USING GIN(receipts_categories);
@@ -259,14 +274,354 @@ CREATE INDEX idx_income_payment_date ON income_data(payment_date);
 CREATE INDEX idx_outcome_installment ON outcome_data(installment_id);
 CREATE INDEX idx_outcome_bill ON outcome_data(bill_id);
 CREATE INDEX idx_outcome_due_date ON outcome_data(due_date);
-CREATE INDEX idx_outcome_creditor ON outcome_data(creditor_id);
-CREATE INDEX idx_outcome_company ON outcome_data(company_id);
 CREATE INDEX idx_outcome_issue_date ON outcome_data(issue_date);
 CREATE INDEX idx_outcome_payments ON outcome_data USING GIN(payments);
 CREATE INDEX idx_outcome_categories ON outcome_data USING GIN(payments_categories);
 CREATE INDEX idx_outcome_cost_center ON outcome_data(cost_center_name);
 CREATE INDEX idx_outcome_payment_date ON outcome_data(payment_date);
 
+-- Filtered lists: equality filter + the list order ({date_field} DESC, id),
+-- so "company_id = ? AND due_date BETWEEN ? AND ? ORDER BY due_date DESC, id
+-- LIMIT n" reads n index entries in order, without a sort
+-- (scripts/index_advisor.py proposes more from the observed workload)
+CREATE INDEX idx_income_company_due ON income_data(company_id, due_date DESC, id);
+CREATE INDEX idx_income_client_due ON income_data(client_id, due_date DESC, id);
+CREATE INDEX idx_income_project_due ON income_data(project_id, due_date DESC, id);
+CREATE INDEX idx_outcome_company_due ON outcome_data(company_id, due_date DESC, id);
+CREATE INDEX idx_outcome_creditor_due ON outcome_data(creditor_id, due_date DESC, id);
+CREATE INDEX idx_outcome_project_due ON outcome_data(project_id, due_date DESC, id);
+
+-- Open balances (overdue views): partial indexes hold only the unpaid installments
+CREATE INDEX idx_income_open_due ON income_data(due_date DESC, id) WHERE balance_amount > 0;
+CREATE INDEX idx_outcome_open_due ON outcome_data(due_date DESC, id) WHERE balance_amount > 0;
+
+-- Name search: trigram indexes serve the ILIKE '%value%' filters on *_name
+-- columns (a B-tree cannot)
+CREATE INDEX idx_income_company_name_trgm ON income_data USING GIN(company_name gin_trgm_ops);
+CREATE INDEX idx_income_client_name_trgm ON income_data USING GIN(client_name gin_trgm_ops);
+CREATE INDEX idx_income_project_name_trgm ON income_data USING GIN(project_name gin_trgm_ops);
+CREATE INDEX idx_income_business_area_name_trgm ON income_data USING GIN(business_area_name gin_trgm_ops);
+CREATE INDEX idx_outcome_company_name_trgm ON outcome_data USING GIN(company_name gin_trgm_ops);
+CREATE INDEX idx_outcome_creditor_name_trgm ON outcome_data USING GIN(creditor_name gin_trgm_ops);
+CREATE INDEX idx_outcome_project_name_trgm ON outcome_data USING GIN(project_name gin_trgm_ops);
+CREATE INDEX idx_outcome_business_area_name_trgm ON outcome_data USING GIN(business_area_name gin_trgm_ops);
+
+-- ==========================================
+-- CHILD TABLES (arrays JSONB explodidos)
+-- ==========================================
+-- One row per element of the JSONB arrays, keyed by the parent id and the
+-- element position (seq). Written by sync_sienge.py on every run, replacing
+-- the rows of each parent touched by the run.
+-- Unlike the generated columns payment_date/cost_center_name (element ->0 only),
+-- these cover split payments and every category apportionment.
+
+CREATE TABLE income_receipts (
+    income_id VARCHAR(30) NOT NULL REFERENCES income_data(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    operation_type_id INTEGER,
+    operation_type_name VARCHAR,
+    gross_amount NUMERIC(15,2),
+    monetary_correction_amount NUMERIC(15,2),
+    interest_amount NUMERIC(15,2),
+    fine_amount NUMERIC(15,2),
+    discount_amount NUMERIC(15,2),
+    tax_amount NUMERIC(15,2),
+    net_amount NUMERIC(15,2),
+    calculation_date DATE,
+    payment_date DATE,
+    account_company_id INTEGER,
+    PRIMARY KEY (income_id, seq)
+);
+
+CREATE TABLE income_receipts_categories (
+    income_id VARCHAR(30) NOT NULL REFERENCES income_data(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    cost_center_id INTEGER,
+    cost_center_name VARCHAR,
+    financial_category_id VARCHAR,
+    financial_category_name VARCHAR,
+    financial_category_type VARCHAR,
+    financial_category_rate NUMERIC(7,4),
+    project_id INTEGER,
+    project_name VARCHAR,
+    business_area_id INTEGER,
+    business_area_name VARCHAR,
+    PRIMARY KEY (income_id, seq)
+);
+
+CREATE TABLE outcome_payments (
+    outcome_id VARCHAR(30) NOT NULL REFERENCES outcome_data(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    operation_type_id INTEGER,
+    operation_type_name VARCHAR,
+    gross_amount NUMERIC(15,2),
+    monetary_correction_amount NUMERIC(15,2),
+    interest_amount NUMERIC(15,2),
+    fine_amount NUMERIC(15,2),
+    discount_amount NUMERIC(15,2),
+    tax_amount NUMERIC(15,2),
+    net_amount NUMERIC(15,2),
+    corrected_net_amount NUMERIC(15,2),
+    calculation_date DATE,
+    payment_date DATE,
+    sequencial_number INTEGER,
+    payment_authentication VARCHAR,
+    PRIMARY KEY (outcome_id, seq)
+);
+
+CREATE TABLE outcome_payments_categories (
+    outcome_id VARCHAR(30) NOT NULL REFERENCES outcome_data(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    cost_center_id INTEGER,
+    cost_center_name VARCHAR,
+    financial_category_id VARCHAR,
+    financial_category_name VARCHAR,
+    financial_category_type VARCHAR,
+    financial_category_rate NUMERIC(7,4),
+    project_id INTEGER,
+    project_name VARCHAR,
+    PRIMARY KEY (outcome_id, seq)
+);
+
+CREATE TABLE outcome_departments_costs (
+    outcome_id VARCHAR(30) NOT NULL REFERENCES outcome_data(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    department_id INTEGER,
+    department_name VARCHAR,
+    rate NUMERIC(7,4),
+    PRIMARY KEY (outcome_id, seq)
+);
+
+CREATE TABLE outcome_buildings_costs (
+    outcome_id VARCHAR(30) NOT NULL REFERENCES outcome_data(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    building_id INTEGER,
+    building_name VARCHAR,
+    building_unit_id INTEGER,
+    building_unit_name VARCHAR,
+    cost_estimation_sheet_id VARCHAR,
+    cost_estimation_sheet_name VARCHAR,
+    rate NUMERIC(7,4),
+    PRIMARY KEY (outcome_id, seq)
+);
+
+-- Child table indexes (cash by payment date, cost center apportionment)
+CREATE INDEX idx_income_receipts_payment_date ON income_receipts(payment_date);
+CREATE INDEX idx_income_receipts_cat_cost_center ON income_receipts_categories(cost_center_id);
+CREATE INDEX idx_income_receipts_cat_cost_center_name ON income_receipts_categories(cost_center_name);
+CREATE INDEX idx_income_receipts_cat_category ON income_receipts_categories(financial_category_id);
+CREATE INDEX idx_outcome_payments_payment_date ON outcome_payments(payment_date);
+CREATE INDEX idx_outcome_payments_cat_cost_center ON outcome_payments_categories(cost_center_id);
+CREATE INDEX idx_outcome_payments_cat_cost_center_name ON outcome_payments_categories(cost_center_name);
+CREATE INDEX idx_outcome_payments_cat_category ON outcome_payments_categories(financial_category_id);
+CREATE INDEX idx_outcome_departments_costs_department ON outcome_departments_costs(department_id);
+CREATE INDEX idx_outcome_buildings_costs_building ON outcome_buildings_costs(building_id);
+
+-- ==========================================
+-- ROLLUP TABLES (resumos mensais)
+-- ==========================================
+-- Monthly totals by due_date month x company x project x business area x
+-- cost center x status. Maintained by sync_sienge.py, which recomputes only
+-- the months touched by each run. The API aggregate endpoints read them when
+-- the requested grouping, metrics and filters can be answered from them.
+
+CREATE TABLE income_rollup_monthly (
+    month DATE,                          -- DATE_TRUNC('month', due_date)
+    company_id INTEGER,
+    company_name VARCHAR,
+    project_id INTEGER,
+    project_name VARCHAR,
+    business_area_id INTEGER,
+    business_area_name VARCHAR,
+    cost_center_name VARCHAR,
+    status_parcela VARCHAR,
+    record_count INTEGER NOT NULL,
+    sum_original_amount NUMERIC(18,2),
+    sum_balance_amount NUMERIC(18,2),
+    sum_corrected_balance_amount NUMERIC(18,2),
+    refreshed_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE TABLE outcome_rollup_monthly (
+    month DATE,                          -- DATE_TRUNC('month', due_date)
+    company_id INTEGER,
+    company_name VARCHAR,
+    project_id INTEGER,
+    project_name VARCHAR,
+    business_area_id INTEGER,
+    business_area_name VARCHAR,
+    cost_center_name VARCHAR,
+    status_parcela VARCHAR,
+    record_count INTEGER NOT NULL,
+    sum_original_amount NUMERIC(18,2),
+    sum_balance_amount NUMERIC(18,2),
+    sum_corrected_balance_amount NUMERIC(18,2),
+    refreshed_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE INDEX idx_income_rollup_month ON income_rollup_monthly(month);
+CREATE INDEX idx_income_rollup_company ON income_rollup_monthly(company_id, month);
+CREATE INDEX idx_outcome_rollup_month ON outcome_rollup_monthly(month);
+CREATE INDEX idx_outcome_rollup_company ON outcome_rollup_monthly(company_id, month);
+
+-- ==========================================
+-- REPORTING SNAPSHOT (Looker connector)
+-- ==========================================
+-- Income and outcome flattened into the connector schema, one row per
+-- installment, with the fields DataTransformer.gs used to derive per row
+-- precomputed. Maintained by sync_sienge.py for the records of each run;
+-- served by the API at /api/report. Aging fields that depend on the current
+-- date (dias_atraso, faixa_aging, situacao_vencimento) are computed at read time.
+
+CREATE TABLE financial_report (
+    record_type VARCHAR(10) NOT NULL,     -- 'income' or 'outcome'
+    record_type_label VARCHAR(20) NOT NULL, -- 'Contas a Receber' / 'Contas a Pagar'
+    id VARCHAR(30) NOT NULL,
+    sync_date TIMESTAMP,
+
+    installment_id INTEGER,
+    bill_id INTEGER,
+    company_id INTEGER,
+    company_name VARCHAR,
+    business_area_id INTEGER,
+    business_area_name VARCHAR,
+    project_id INTEGER,
+    project_name VARCHAR,
+    group_company_id INTEGER,
+    group_company_name VARCHAR,
+    holding_id INTEGER,
+    holding_name VARCHAR,
+    subsidiary_id INTEGER,
+    subsidiary_name VARCHAR,
+    business_type_id INTEGER,
+    business_type_name VARCHAR,
+    document_identification_id VARCHAR,
+    document_identification_name VARCHAR,
+    document_number VARCHAR,
+    origin_id VARCHAR,
+    original_amount NUMERIC(15,2),
+    discount_amount NUMERIC(15,2),
+    tax_amount NUMERIC(15,2),
+    indexer_id INTEGER,
+    indexer_name VARCHAR,
+    due_date DATE,
+    issue_date DATE,
+    bill_date DATE,
+    installment_base_date DATE,
+    payment_date DATE,
+    balance_amount NUMERIC(15,2),
+    corrected_balance_amount NUMERIC(15,2),
+    status_parcela VARCHAR,
+    cost_center_name VARCHAR,
+
+    -- Income only
+    client_id INTEGER,
+    client_name VARCHAR,
+    document_forecast VARCHAR,
+    periodicity_type VARCHAR,
+    embedded_interest_amount NUMERIC(15,2),
+    interest_type VARCHAR,
+    interest_rate NUMERIC(5,2),
+    correction_type VARCHAR,
+    interest_base_date DATE,
+    defaulter_situation VARCHAR,
+    sub_judicie VARCHAR,
+    main_unit VARCHAR,
+    installment_number VARCHAR,
+    payment_term_id VARCHAR,
+    payment_term_descrition VARCHAR,
+    bearer_id INTEGER,
+
+    -- Outcome only
+    creditor_id INTEGER,
+    creditor_name VARCHAR,
+    forecast_document VARCHAR,
+    consistency_status VARCHAR,
+    authorization_status VARCHAR,
+    registered_user_id VARCHAR,
+    registered_by VARCHAR,
+    registered_date TIMESTAMP WITH TIME ZONE,
+
+    -- Derived (see SiengeSync.report_select)
+    total_movimentacoes INTEGER NOT NULL DEFAULT 0,  -- receipts / payments
+    valor_liquido NUMERIC(15,2),                     -- SUM(netAmount)
+    data_ultima_movimentacao DATE,                   -- MAX(paymentDate)
+    situacao_pagamento VARCHAR(20),                  -- Pago / Parcial / Pendente
+    taxa_inadimplencia NUMERIC(12,2),                -- balance / original * 100
+    total_departamentos INTEGER,                     -- outcome only
+    total_edificacoes INTEGER,                       -- outcome only
+    total_autorizacoes INTEGER,                      -- outcome only
+
+    refreshed_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (record_type, id)
+);
+
+-- Connector defaults: newest first on the chosen date, filtered by company / project / area
+CREATE INDEX idx_financial_report_due_date ON financial_report(due_date DESC, record_type, id);
+CREATE INDEX idx_financial_report_issue_date ON financial_report(issue_date DESC, record_type, id);
+CREATE INDEX idx_financial_report_payment_date ON financial_report(payment_date DESC, record_type, id);
+CREATE INDEX idx_financial_report_company ON financial_report(company_id, due_date DESC);
+CREATE INDEX idx_financial_report_project ON financial_report(project_id, due_date DESC);
+CREATE INDEX idx_financial_report_business_area ON financial_report(business_area_id, due_date DESC);
+CREATE INDEX idx_financial_report_client ON financial_report(client_id) WHERE client_id IS NOT NULL;
+CREATE INDEX idx_financial_report_creditor ON financial_report(creditor_id) WHERE creditor_id IS NOT NULL;
+CREATE INDEX idx_financial_report_company_name_trgm ON financial_report USING GIN(company_name gin_trgm_ops);
+CREATE INDEX idx_financial_report_client_name_trgm ON financial_report USING GIN(client_name gin_trgm_ops);
+CREATE INDEX idx_financial_report_creditor_name_trgm ON financial_report USING GIN(creditor_name gin_trgm_ops);
+
+-- ==========================================
+-- DIMENSION CATALOG (filter dropdowns, type-ahead)
+-- ==========================================
+-- Distinct id/name pairs of the filter dimensions, per source table, with
+-- record counts and date ranges. Recomputed by sync_sienge.py for the
+-- synced data type at the end of each run (one GROUPING SETS scan);
+-- served by the API at /api/dimensions/{name} and /api/search/{dimension}.
+
+CREATE TABLE dimension_members (
+    dimension VARCHAR(20) NOT NULL,       -- company, project, business_area, cost_center, client, creditor
+    source VARCHAR(10) NOT NULL,          -- 'income' or 'outcome'
+    member_id INTEGER,                    -- NULL for cost_center (name only)
+    name VARCHAR NOT NULL,
+    record_count INTEGER NOT NULL,
+    first_due_date DATE,
+    last_due_date DATE,
+    first_issue_date DATE,
+    last_issue_date DATE,
+    refreshed_at TIMESTAMP DEFAULT NOW()
+);
+
+-- One row per member: the sync upserts on it
+CREATE UNIQUE INDEX uq_dimension_members ON dimension_members(source, dimension, name);
+CREATE INDEX idx_dimension_members_lookup ON dimension_members(dimension, name);
+CREATE INDEX idx_dimension_members_name_trgm ON dimension_members USING GIN(name gin_trgm_ops);
+
+-- ==========================================
+-- LIST SNAPSHOTS (consistent multi-page reads)
+-- ==========================================
+-- Ordered id lists materialized by the API for snapshot=true list requests;
+-- the pages of a snapshot are slices of its rows (position), so a sync that
+-- commits while a client pages through does not shift pages. Short-lived,
+-- hence UNLOGGED (not WAL-logged, emptied after a crash). Expired snapshots
+-- are deleted by the API when it creates new ones (SNAPSHOT_TTL).
+
+CREATE UNLOGGED TABLE list_snapshots (
+    token UUID PRIMARY KEY,
+    table_name VARCHAR(30) NOT NULL,      -- income_data, outcome_data, financial_report
+    total INTEGER NOT NULL DEFAULT 0,     -- rows in the snapshot
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+CREATE UNLOGGED TABLE list_snapshot_rows (
+    token UUID NOT NULL,                  -- list_snapshots.token (no FK: bulk inserts stay cheap)
+    position INTEGER NOT NULL,            -- 1-based rank in the list ordering
+    record_type VARCHAR(10) NOT NULL DEFAULT '',  -- financial_report only
+    id VARCHAR(30) NOT NULL,
+    PRIMARY KEY (token, position)
+);
+
+CREATE INDEX idx_list_snapshots_expires ON list_snapshots(expires_at);
+
 -- ==========================================
 -- SYNC CONTROL TABLE
 -- ==========================================
@@ -340,4 +695,6 @@ GRANT USAGE, SELECT ON SEQUENCE sync_control_id_seq TO sienge_user;
 
 -- Additional permissions (adjust as needed)
 -- GRANT ALL PRIVILEGES ON ALL TABLES IN SCHEMA public TO sienge_app;
--- GRANT ALL PRIVILEGES ON ALL SEQUENCES IN SCHEMA public TO sienge_app;
\ No newline at end of file
+-- GRANT ALL PRIVILEGES ON ALL SEQUENCES IN SCHEMA public TO sienge_app;
+-- The API writes list snapshots (snapshot=true):
+-- GRANT SELECT, INSERT, DELETE ON list_snapshots, list_snapshot_rows TO sienge_app;
\ No newline at end of file
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the list response serialization paths of the API
+
+Compares, per page of rows shaped like income_data/outcome_data
+(NUMERIC as Decimal, DATE, TIMESTAMP, JSONB arrays):
+
+- response_model: what FastAPI does when an endpoint returns ApiResponse
+  (validate the model, serialize to JSON-able Python, json.dumps)
+- jsonable_encoder: jsonable_encoder + json.dumps (JSONResponse of a plain dict)
+- fast_response: the orjson path used by the endpoints (responses.fast_response)
+
+No database needed. Usage:
+    python scripts/benchmark_serialization.py [--rows 1000] [--runs 50]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from models import ApiResponse  # noqa: E402
+from responses import fast_response  # noqa: E402
+
+
+def make_row(i: int) -> dict:
+    """Synthetic outcome_data row with the column types the API returns"""
+    due = date(2024, 1, 1) + timedelta(days=i % 365)
+    return {
+        'id': f"{i}_{i * 7}",
+        'sync_date': datetime(2024, 6, 1, 3, 0, 0, 123456),
+        'installment_id': i,
+        'bill_id': i * 7,
+        'company_id': i % 12,
+        'company_name': f"Empresa {i % 12} Ltda",
+        'business_area_id': i % 5,
+        'business_area_name': 'Incorporação',
+        'project_id': i % 40,
+        'project_name': f"Obra {i % 40}",
+        'creditor_id': i % 300,
+        'creditor_name': f"Fornecedor {i % 300} S.A.",
+        'document_number': f"NF-{i:08d}",
+        'original_amount': Decimal('12345.67') + i,
+        'discount_amount': Decimal('0.00'),
+        'tax_amount': Decimal('123.45'),
+        'due_date': due,
+        'issue_date': due - timedelta(days=30),
+        'bill_date': due - timedelta(days=30),
+        'installment_base_date': due,
+        'balance_amount': Decimal('0.00') if i % 3 else Decimal('12345.67'),
+        'corrected_balance_amount': Decimal('0.00'),
+        'authorization_status': 'Autorizado',
+        'status_parcela': 'Paga',
+        'cost_center_name': 'Administrativo',
+        'payment_date': due,
+        'payments': [{
+            'operationTypeId': 1, 'operationTypeName': 'Pagamento',
+            'grossAmount': 12345.67, 'netAmount': 12345.67,
+            'calculationDate': due.isoformat(), 'paymentDate': due.isoformat()
+        }],
+        'payments_categories': [{
+            'costCenterId': 10, 'costCenterName': 'Administrativo',
+            'financialCategoryId': '2.01', 'financialCategoryName': 'Materiais',
+            'financialCategoryRate': 100
+        }],
+        'departments_costs': [{'id': 1, 'name': 'Obras', 'rate': 100}],
+        'buildings_costs': [{'buildingId': i % 40, 'buildingName': f"Obra {i % 40}", 'rate': 100}],
+        'authorizations': [{
+            'authorizationUserName': 'gestor', 'authorizationDate': due.isoformat(),
+            'isLastToAuthorize': True
+        }]
+    }
+
+
+def response_model_path(response: ApiResponse, adapter: TypeAdapter) -> bytes:
+    validated = ApiResponse.model_validate(dict(response))
+    content = adapter.dump_python(validated, mode='json')
+    return json.dumps(content, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def jsonable_encoder_path(response: ApiResponse) -> bytes:
+    content = jsonable_encoder(response)
+    return json.dumps(content, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def fast_response_path(response: ApiResponse) -> bytes:
+    return fast_response(response).body
+
+
+def measure(func, runs: int) -> tuple[float, float]:
+    """Return (median, p95) duration in milliseconds"""
+    func()  # warm up
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    durations.sort()
+    return statistics.median(durations), durations[int(len(durations) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1000, help='Rows per page (default: 1000)')
+    parser.add_argument('--runs', type=int, default=50, help='Timed runs per path (default: 50)')
+    args = parser.parse_args()
+
+    rows = [make_row(i) for i in range(args.rows)]
+    response = ApiResponse(success=True, total=args.rows, total_mode='exact', count=args.rows,
+                           limit=args.rows, offset=0, data=rows)
+    adapter = TypeAdapter(ApiResponse)
+
+    paths = {
+        'response_model': lambda: response_model_path(response, adapter),
+        'jsonable_encoder': lambda: jsonable_encoder_path(response),
+        'fast_response': lambda: fast_response_path(response),
+    }
+
+    # Same payload on every path (modulo Decimal/number formatting of jsonable_encoder)
+    if json.loads(paths['response_model']()) != json.loads(paths['fast_response']()):
+        print('WARNING: response_model and fast_response produce different JSON')
+
+    print(f"{args.rows} rows, {args.runs} runs per path")
+    print(f"{'path':<18}{'median ms':>12}{'p95 ms':>10}{'per 1000 rows':>16}{'bytes':>12}")
+    baseline = None
+    for name, func in paths.items():
+        median, p95 = measure(func, args.runs)
+        baseline = baseline or median
+        per_1000 = median * 1000 / args.rows
+        print(f"{name:<18}{median:>12.2f}{p95:>10.2f}{per_1000:>13.2f} ms{len(func()):>12}"
+              f"  ({baseline / median:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
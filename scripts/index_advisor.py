@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Index advisor for the list queries of the API
+
+Mines the workload and proposes the B-tree indexes that serve it in order:
+
+- pg_stat_statements: statements on income_data / outcome_data /
+  financial_report and the overdue views, weighted by execution time
+- the API's filter pattern log ("filter_patterns" of /api/stats, live or a
+  saved copy; counted per worker, so it is a sample of the traffic)
+
+Lists are ordered by {date_field} DESC, id (financial_report: DESC,
+record_type, id), so a query with equality filters gets a composite
+(filter, date_field DESC, id) candidate and a query restricted to
+balance_amount > 0 a partial index on open balances. Candidates already
+served by a valid index are skipped.
+
+Each candidate is checked on a representative query (most common filter
+value, last 12 months of its date field) with EXPLAIN (ANALYZE, BUFFERS):
+before, and with --apply after CREATE INDEX CONCURRENTLY. The report is
+printed as Markdown.
+
+Database settings come from the POSTGRES_* environment variables. Usage:
+    python scripts/index_advisor.py [--api-url http://localhost:8000] [--patterns stats.json]
+                                    [--top 10] [--min-calls 20] [--apply] [--report report.md]
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import statistics
+import sys
+import urllib.request
+from collections import defaultdict
+from datetime import timedelta
+from typing import NamedTuple, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+import psycopg  # noqa: E402
+from psycopg.rows import dict_row  # noqa: E402
+
+from database import (  # noqa: E402
+    DB_CONFIG, DATE_FIELDS, FILTER_CONDITIONS, FINANCIAL_TABLES, REPORT_TABLE, TABLE_COLUMNS
+)
+
+# Tables whose list queries the advisor indexes -> index name prefix
+INDEXED_TABLES = {'income_data': 'income', 'outcome_data': 'outcome', REPORT_TABLE: 'financial_report'}
+
+# Views over open balances (balance_amount > 0, by due_date) -> base table
+OPEN_BALANCE_VIEWS = {'overdue_income': 'income_data', 'overdue_outcome': 'outcome_data'}
+
+# API filter patterns on a virtual table -> tables the query actually reads
+TABLE_ALIASES = {'financial': tuple(FINANCIAL_TABLES.values())}
+
+OPEN_BALANCE_PREDICATE = 'balance_amount > 0'
+
+# Rows per page of the representative query (the API default page size)
+EXPLAIN_LIMIT = 1000
+
+STATEMENT_TABLE_RE = re.compile(
+    r'\bFROM\s+(' + '|'.join(list(INDEXED_TABLES) + list(OPEN_BALANCE_VIEWS)) + r')\b', re.IGNORECASE
+)
+EQUALITY_RE = re.compile(r'\b([a-z_]+)\s*=\s*\$\d+', re.IGNORECASE)
+RANGE_RE = re.compile(r'\b([a-z_]+)\s*(?:>=|<=|<|>|BETWEEN)\s*\$\d+', re.IGNORECASE)
+ORDER_RE = re.compile(r'\bORDER\s+BY\s+([a-z_]+)\s+DESC', re.IGNORECASE)
+OPEN_BALANCE_RE = re.compile(r'\bbalance_amount\s*>\s*(?:0|\$\d+)', re.IGNORECASE)
+INDEX_KEYS_RE = re.compile(r'USING btree \((.*?)\)(?: INCLUDE \(.*?\))?(?: WHERE (.*))?$')
+
+
+class Candidate(NamedTuple):
+    """An index serving one query shape in order"""
+    table: str
+    filters: tuple
+    date_field: str
+    partial: bool
+
+    @property
+    def keys(self) -> tuple:
+        order = (f"{self.date_field} DESC",) + (('record_type',) if self.table == REPORT_TABLE else ()) + ('id',)
+        return self.filters + order
+
+    @property
+    def name(self) -> str:
+        name = '_'.join(
+            ['idx', INDEXED_TABLES[self.table]] + list(self.filters) + [self.date_field]
+            + (['open'] if self.partial else [])
+        )
+        if len(name) > 63:
+            # PostgreSQL truncates identifiers to 63 bytes: keep them distinct
+            digest = hashlib.sha1(name.encode()).hexdigest()[:8]
+            name = f"{name[:54]}_{digest}"
+        return name
+
+    def ddl(self) -> str:
+        ddl = f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {self.name} ON {self.table} ({', '.join(self.keys)})"
+        return f"{ddl} WHERE {OPEN_BALANCE_PREDICATE}" if self.partial else ddl
+
+
+def make_candidate(table: str, filters, date_field: Optional[str], partial: bool,
+                   max_columns: int) -> Optional[Candidate]:
+    """
+    Build the candidate of a query shape, or None when no index would help
+
+    Only whitelisted equality filters become key columns: *_name filters are
+    ILIKE (trigram-indexed) and ranges on other columns cannot precede the order.
+    """
+    columns = TABLE_COLUMNS[table]
+    filters = tuple(sorted(
+        f for f in set(filters)
+        if f in columns and f != 'id' and f not in FILTER_CONDITIONS
+        and f not in DATE_FIELDS and not f.endswith('_name')
+    ))[:max_columns]
+    if date_field not in DATE_FIELDS:
+        return None
+    if not filters and not partial:
+        # Plain date order: the single-column date indexes already serve it
+        return None
+    return Candidate(table, filters, date_field, partial)
+
+
+def parse_statement(query: str, max_columns: int) -> Optional[Candidate]:
+    """Derive the candidate of a normalized pg_stat_statements query text"""
+    match = STATEMENT_TABLE_RE.search(query)
+    if not match:
+        return None
+    relation = match.group(1).lower()
+    if relation in OPEN_BALANCE_VIEWS:
+        return Candidate(OPEN_BALANCE_VIEWS[relation], (), 'due_date', True)
+
+    order = ORDER_RE.search(query)
+    date_field = order.group(1).lower() if order else None
+    if date_field not in DATE_FIELDS:
+        date_field = next((f.lower() for f in RANGE_RE.findall(query) if f.lower() in DATE_FIELDS), None)
+    filters = [f.lower() for f in EQUALITY_RE.findall(query)]
+    return make_candidate(relation, filters, date_field, bool(OPEN_BALANCE_RE.search(query)), max_columns)
+
+
+def statement_workload(conn, max_columns: int) -> dict:
+    """Candidate -> [calls, total ms] from pg_stat_statements (empty when not installed)"""
+    workload = defaultdict(lambda: [0, 0.0])
+    try:
+        rows = conn.execute("""
+            SELECT query, calls, total_exec_time
+            FROM pg_stat_statements
+            WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+              AND query ~* %s
+        """, ('|'.join(list(INDEXED_TABLES) + list(OPEN_BALANCE_VIEWS)),)).fetchall()
+    except psycopg.errors.UndefinedTable:
+        print("pg_stat_statements is not installed (CREATE EXTENSION pg_stat_statements), skipping it",
+              file=sys.stderr)
+        return workload
+
+    for row in rows:
+        candidate = parse_statement(row['query'], max_columns)
+        if candidate:
+            workload[candidate][0] += row['calls']
+            workload[candidate][1] += row['total_exec_time']
+    return workload
+
+
+def load_filter_patterns(api_urls: list, pattern_files: list) -> list:
+    """Read filter_patterns entries from running API instances and saved /api/stats copies"""
+    patterns = []
+    for url in api_urls:
+        with urllib.request.urlopen(f"{url.rstrip('/')}/api/stats", timeout=10) as response:
+            patterns += json.load(response).get('filter_patterns', [])
+    for path in pattern_files:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        patterns += data.get('filter_patterns', []) if isinstance(data, dict) else data
+    return patterns
+
+
+def api_workload(patterns: list, max_columns: int) -> dict:
+    """Candidate -> [calls, total ms] from the API filter patterns (no timings: 0 ms)"""
+    workload = defaultdict(lambda: [0, 0.0])
+    for pattern in patterns:
+        for table in TABLE_ALIASES.get(pattern['table'], (pattern['table'],)):
+            if table not in INDEXED_TABLES:
+                continue
+            candidate = make_candidate(table, pattern['filters'], pattern['date_field'], False, max_columns)
+            if candidate:
+                workload[candidate][0] += pattern['count']
+    return workload
+
+
+def existing_indexes(conn) -> list:
+    """(table, key columns, predicate) of the valid B-tree indexes on the indexed tables"""
+    rows = conn.execute("""
+        SELECT c.relname AS table_name, pg_get_indexdef(ix.indexrelid) AS definition
+        FROM pg_index ix
+        JOIN pg_class c ON c.oid = ix.indrelid
+        WHERE c.relname = ANY(%s) AND ix.indisvalid
+    """, (list(INDEXED_TABLES),)).fetchall()
+    indexes = []
+    for row in rows:
+        match = INDEX_KEYS_RE.search(row['definition'])
+        if match:
+            keys = tuple(key.strip() for key in match.group(1).split(','))
+            indexes.append((row['table_name'], keys, match.group(2)))
+    return indexes
+
+
+def is_served(candidate: Candidate, indexes: list) -> bool:
+    """Tell whether an existing index starts with the candidate's keys (and predicate)"""
+    for table, keys, predicate in indexes:
+        if table != candidate.table or keys[:len(candidate.keys)] != candidate.keys:
+            continue
+        if not candidate.partial or (predicate and 'balance_amount >' in predicate):
+            return True
+    return False
+
+
+def representative_query(conn, candidate: Candidate) -> tuple[str, list]:
+    """
+    A list query of the candidate's shape
+
+    Uses the most common value of each filter (the largest result) and the
+    last 12 months of the date field, ordered and limited like the API.
+    """
+    conditions, params = [], []
+    for column in candidate.filters:
+        row = conn.execute(
+            f"SELECT {column} AS value FROM {candidate.table} WHERE {column} IS NOT NULL "
+            f"GROUP BY 1 ORDER BY COUNT(*) DESC LIMIT 1"
+        ).fetchone()
+        conditions.append(f"{column} = %s")
+        params.append(row['value'] if row else None)
+
+    row = conn.execute(f"SELECT MAX({candidate.date_field}) AS value FROM {candidate.table}").fetchone()
+    if row and row['value']:
+        conditions.append(f"{candidate.date_field} BETWEEN %s AND %s")
+        params += [row['value'] - timedelta(days=365), row['value']]
+    if candidate.partial:
+        conditions.append(OPEN_BALANCE_PREDICATE)
+
+    order = ', '.join(key for key in candidate.keys if key not in candidate.filters)
+    query = (
+        f"SELECT * FROM {candidate.table} WHERE {' AND '.join(conditions) or 'TRUE'} "
+        f"ORDER BY {order} LIMIT {EXPLAIN_LIMIT}"
+    )
+    return query, params
+
+
+def plan_nodes(node: dict):
+    """Walk an EXPLAIN JSON plan depth first"""
+    yield node
+    for child in node.get('Plans', []):
+        yield from plan_nodes(child)
+
+
+def explain(conn, query: str, params: list, runs: int) -> dict:
+    """Median execution time, buffers and access path of query over runs EXPLAIN ANALYZE runs"""
+    timings, plan = [], None
+    for _ in range(runs):
+        result = conn.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}", params).fetchone()
+        output = result['QUERY PLAN']
+        if isinstance(output, str):
+            output = json.loads(output)
+        plan = output[0]
+        timings.append(plan['Execution Time'])
+
+    nodes = list(plan_nodes(plan['Plan']))
+    scans = [
+        f"{node['Node Type']} using {node['Index Name']}" if 'Index Name' in node else node['Node Type']
+        for node in nodes if 'Scan' in node['Node Type']
+    ]
+    has_sort = any(node['Node Type'] in ('Sort', 'Incremental Sort') for node in nodes)
+    top = plan['Plan']
+    return {
+        'ms': statistics.median(timings),
+        'buffers': top.get('Shared Hit Blocks', 0) + top.get('Shared Read Blocks', 0),
+        'access': ', '.join(dict.fromkeys(scans)) + (" + Sort" if has_sort else '')
+    }
+
+
+def format_plan(result: Optional[dict]) -> str:
+    if result is None:
+        return '-'
+    return f"{result['ms']:.1f} ms, {result['buffers']} buffers, {result['access']}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--api-url', action='append', default=[],
+                        help='API base URL to read /api/stats filter patterns from (repeatable)')
+    parser.add_argument('--patterns', action='append', default=[],
+                        help='Saved /api/stats JSON (or its filter_patterns list) (repeatable)')
+    parser.add_argument('--top', type=int, default=10, help='Candidates to report (default: 10)')
+    parser.add_argument('--min-calls', type=int, default=20,
+                        help='Ignore query shapes seen fewer times (default: 20)')
+    parser.add_argument('--max-columns', type=int, default=2,
+                        help='Equality filter columns per index (default: 2)')
+    parser.add_argument('--runs', type=int, default=3, help='EXPLAIN ANALYZE runs per query (default: 3)')
+    parser.add_argument('--apply', action='store_true',
+                        help='Create the proposed indexes (CONCURRENTLY) and EXPLAIN again')
+    parser.add_argument('--report', help='Also write the Markdown report to this file')
+    args = parser.parse_args()
+
+    # Autocommit: CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with psycopg.connect(**DB_CONFIG, row_factory=dict_row, autocommit=True) as conn:
+        workload = defaultdict(lambda: [0, 0.0])
+        sources = [statement_workload(conn, args.max_columns),
+                   api_workload(load_filter_patterns(args.api_url, args.patterns), args.max_columns)]
+        for source in sources:
+            for candidate, (calls, total_ms) in source.items():
+                workload[candidate][0] += calls
+                workload[candidate][1] += total_ms
+
+        indexes = existing_indexes(conn)
+        ranked = sorted(
+            ((c, calls, ms) for c, (calls, ms) in workload.items()
+             if calls >= args.min_calls and not is_served(c, indexes)),
+            key=lambda item: (item[2], item[1]), reverse=True
+        )[:args.top]
+
+        lines = [
+            '# Index advisor report', '',
+            f"{len(workload)} query shapes observed, {len(ranked)} not served by an existing index"
+            + (' (applied)' if args.apply else ' (dry run, use --apply to create them)'), '',
+            '| Index | Calls | Total ms | Before | After |',
+            '|---|---:|---:|---|---|'
+        ]
+        for candidate, calls, total_ms in ranked:
+            query, params = representative_query(conn, candidate)
+            before = explain(conn, query, params, args.runs)
+            after = None
+            if args.apply:
+                print(f"Creating {candidate.name}...", file=sys.stderr)
+                conn.execute(candidate.ddl())
+                conn.execute(f"ANALYZE {candidate.table}")
+                after = explain(conn, query, params, args.runs)
+            lines.append(
+                f"| `{candidate.ddl()}` | {calls} | {total_ms:.0f} | {format_plan(before)} | {format_plan(after)} |"
+            )
+
+    report = '\n'.join(lines) + '\n'
+    print(report)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            f.write(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -26,6 +26,181 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Channel used to tell API workers that new data landed (LISTEN in api/cache.py)
+SYNC_NOTIFY_CHANNEL = os.getenv('SYNC_NOTIFY_CHANNEL', 'sienge_data_changed')
+
+# Date field filtered by each Sienge selectionType (sync window semantics)
+SELECTION_DATE_FIELDS = {'I': 'issue_date', 'D': 'due_date', 'P': 'payment_date', 'B': 'bill_date'}
+
+# Keys kept from each element of the nested JSONB arrays (ingest-time projection).
+# The full elements still feed the child tables below; only the JSONB copy is slimmed.
+# Override with JSONB_PROJECTION='{"payments": ["netAmount", "paymentDate"]}' (merged
+# over these defaults, a null list keeps the column verbatim) or JSONB_PROJECTION=none.
+JSONB_PROJECTION = {
+    'receipts': ['operationTypeId', 'operationTypeName', 'grossAmount', 'netAmount',
+                 'calculationDate', 'paymentDate'],
+    'receipts_categories': ['costCenterId', 'costCenterName', 'financialCategoryId',
+                            'financialCategoryName', 'financialCategoryRate'],
+    'payments': ['operationTypeId', 'operationTypeName', 'grossAmount', 'netAmount',
+                 'calculationDate', 'paymentDate'],
+    'payments_categories': ['costCenterId', 'costCenterName', 'financialCategoryId',
+                            'financialCategoryName', 'financialCategoryRate'],
+    'departments_costs': ['id', 'name', 'rate'],
+    'buildings_costs': ['buildingId', 'buildingName', 'rate'],
+    'authorizations': ['authorizationUserName', 'authorizationDate', 'isLastToAuthorize'],
+}
+
+
+def load_jsonb_projection() -> Dict[str, Optional[List[str]]]:
+    """Build the nested array projection from defaults and the JSONB_PROJECTION env var"""
+    override = os.getenv('JSONB_PROJECTION', '').strip()
+    if override.lower() == 'none':
+        return {}
+
+    projection = dict(JSONB_PROJECTION)
+    if override:
+        try:
+            projection.update(json.loads(override))
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Invalid JSONB_PROJECTION, using defaults: {e}")
+
+    return {column: keys for column, keys in projection.items() if keys is not None}
+
+
+# Monthly rollups maintained at the end of each sync: data_type -> (source table, rollup table)
+ROLLUP_TABLES = {
+    'income': ('income_data', 'income_rollup_monthly'),
+    'outcome': ('outcome_data', 'outcome_rollup_monthly'),
+}
+ROLLUP_DIMENSIONS = [
+    'company_id', 'company_name', 'project_id', 'project_name',
+    'business_area_id', 'business_area_name', 'cost_center_name', 'status_parcela'
+]
+
+# Denormalized reporting table (income + outcome in the connector schema)
+# refreshed for the records of each run; derived columns mirror DataTransformer.gs
+REPORT_TABLE = 'financial_report'
+
+REPORT_COMMON_COLUMNS = [
+    'id', 'sync_date', 'installment_id', 'bill_id',
+    'company_id', 'company_name', 'business_area_id', 'business_area_name',
+    'project_id', 'project_name', 'group_company_id', 'group_company_name',
+    'holding_id', 'holding_name', 'subsidiary_id', 'subsidiary_name',
+    'business_type_id', 'business_type_name',
+    'document_identification_id', 'document_identification_name', 'document_number', 'origin_id',
+    'original_amount', 'discount_amount', 'tax_amount', 'indexer_id', 'indexer_name',
+    'due_date', 'issue_date', 'bill_date', 'installment_base_date', 'payment_date',
+    'balance_amount', 'corrected_balance_amount', 'status_parcela', 'cost_center_name'
+]
+
+# data_type -> (source table, record type label, movements array, type-specific columns)
+REPORT_SOURCES = {
+    'income': ('income_data', 'Contas a Receber', 'receipts', [
+        'client_id', 'client_name', 'document_forecast', 'periodicity_type',
+        'embedded_interest_amount', 'interest_type', 'interest_rate', 'correction_type',
+        'interest_base_date', 'defaulter_situation', 'sub_judicie', 'main_unit',
+        'installment_number', 'payment_term_id', 'payment_term_descrition', 'bearer_id'
+    ]),
+    'outcome': ('outcome_data', 'Contas a Pagar', 'payments', [
+        'creditor_id', 'creditor_name', 'forecast_document', 'consistency_status',
+        'authorization_status', 'registered_user_id', 'registered_by', 'registered_date'
+    ]),
+}
+
+# Dimension catalog (filter dropdowns) recomputed per data type at the end of each run
+DIMENSION_TABLE = 'dimension_members'
+
+# dimension -> (id column or None, name column)
+DIMENSION_COLUMNS = {
+    'company': ('company_id', 'company_name'),
+    'project': ('project_id', 'project_name'),
+    'business_area': ('business_area_id', 'business_area_name'),
+    'cost_center': (None, 'cost_center_name'),
+    'client': ('client_id', 'client_name'),
+    'creditor': ('creditor_id', 'creditor_name'),
+}
+
+# data_type -> (source table, dimensions)
+DIMENSION_SOURCES = {
+    'income': ('income_data', ['company', 'project', 'business_area', 'cost_center', 'client']),
+    'outcome': ('outcome_data', ['company', 'project', 'business_area', 'cost_center', 'creditor']),
+}
+
+# Child tables exploded from the JSONB arrays at load time.
+# data_type -> (parent key column, {table: (record array key, [(column, element key), ...])})
+CHILD_TABLES = {
+    'income': ('income_id', {
+        'income_receipts': ('receipts', [
+            ('operation_type_id', 'operationTypeId'),
+            ('operation_type_name', 'operationTypeName'),
+            ('gross_amount', 'grossAmount'),
+            ('monetary_correction_amount', 'monetaryCorrectionAmount'),
+            ('interest_amount', 'interestAmount'),
+            ('fine_amount', 'fineAmount'),
+            ('discount_amount', 'discountAmount'),
+            ('tax_amount', 'taxAmount'),
+            ('net_amount', 'netAmount'),
+            ('calculation_date', 'calculationDate'),
+            ('payment_date', 'paymentDate'),
+            ('account_company_id', 'accountCompanyId'),
+        ]),
+        'income_receipts_categories': ('receiptsCategories', [
+            ('cost_center_id', 'costCenterId'),
+            ('cost_center_name', 'costCenterName'),
+            ('financial_category_id', 'financialCategoryId'),
+            ('financial_category_name', 'financialCategoryName'),
+            ('financial_category_type', 'financialCategoryType'),
+            ('financial_category_rate', 'financialCategoryRate'),
+            ('project_id', 'projectId'),
+            ('project_name', 'projectName'),
+            ('business_area_id', 'businessAreaId'),
+            ('business_area_name', 'businessAreaName'),
+        ]),
+    }),
+    'outcome': ('outcome_id', {
+        'outcome_payments': ('payments', [
+            ('operation_type_id', 'operationTypeId'),
+            ('operation_type_name', 'operationTypeName'),
+            ('gross_amount', 'grossAmount'),
+            ('monetary_correction_amount', 'monetaryCorrectionAmount'),
+            ('interest_amount', 'interestAmount'),
+            ('fine_amount', 'fineAmount'),
+            ('discount_amount', 'discountAmount'),
+            ('tax_amount', 'taxAmount'),
+            ('net_amount', 'netAmount'),
+            ('corrected_net_amount', 'correctedNetAmount'),
+            ('calculation_date', 'calculationDate'),
+            ('payment_date', 'paymentDate'),
+            ('sequencial_number', 'sequencialNumber'),
+            ('payment_authentication', 'paymentAuthentication'),
+        ]),
+        'outcome_payments_categories': ('paymentsCategories', [
+            ('cost_center_id', 'costCenterId'),
+            ('cost_center_name', 'costCenterName'),
+            ('financial_category_id', 'financialCategoryId'),
+            ('financial_category_name', 'financialCategoryName'),
+            ('financial_category_type', 'financialCategoryType'),
+            ('financial_category_rate', 'financialCategoryRate'),
+            ('project_id', 'projectId'),
+            ('project_name', 'projectName'),
+        ]),
+        'outcome_departments_costs': ('departamentsCosts', [  # Typo from API
+            ('department_id', 'id'),
+            ('department_name', 'name'),
+            ('rate', 'rate'),
+        ]),
+        'outcome_buildings_costs': ('buildingsCosts', [
+            ('building_id', 'buildingId'),
+            ('building_name', 'buildingName'),
+            ('building_unit_id', 'buildingUnitId'),
+            ('building_unit_name', 'buildingUnitName'),
+            ('cost_estimation_sheet_id', 'costEstimationSheetId'),
+            ('cost_estimation_sheet_name', 'costEstimationSheetName'),
+            ('rate', 'rate'),
+        ]),
+    }),
+}
+
 
 class SiengeSync:
     """Main class for syncing Sienge data to PostgreSQL"""
@@ -44,6 +219,9 @@ class SiengeSync:
             'password': os.getenv('POSTGRES_PASSWORD')
         }
 
+        # Keys kept per nested JSONB array column
+        self.jsonb_projection = load_jsonb_projection()
+
         self.conn = None
         self.cursor = None
 
@@ -206,13 +384,35 @@ class SiengeSync:
                     records_updated = %s,
                     execution_time_seconds = %s
                 WHERE id = %s
+                RETURNING data_type, start_date, end_date
             """, (records_synced, records_inserted, records_updated, execution_time, sync_id))
 
+            row = self.cursor.fetchone()
+            if row:
+                self.notify_data_changed(sync_id, row['data_type'], row['start_date'], row['end_date'])
+
             self.conn.commit()
             logger.info(f"Recorded sync completion (id={sync_id}): {records_synced} records")
         except Exception as e:
             logger.error(f"Failed to record sync completion: {e}")
 
+    def notify_data_changed(self, sync_id: int, data_type: str, start_date, end_date,
+                            selection_type: str = 'I'):
+        """
+        Queue a NOTIFY for API workers, delivered when the current transaction commits
+
+        The payload carries the data type and the synced window so listeners can
+        invalidate only the cached results that window can affect.
+        """
+        payload = json.dumps({
+            'sync_id': sync_id,
+            'data_type': data_type,
+            'date_field': SELECTION_DATE_FIELDS.get(selection_type, 'issue_date'),
+            'start_date': str(start_date),
+            'end_date': str(end_date)
+        })
+        self.cursor.execute("SELECT pg_notify(%s, %s)", (SYNC_NOTIFY_CHANNEL, payload))
+
     def record_sync_failure(self, sync_id: int, error_message: str, execution_time: int):
         """
         Update sync_control record with failure status
@@ -294,6 +494,21 @@ class SiengeSync:
             logger.error(f"Failed to fetch outcome data: {e}")
             return []
 
+    def project_nested_array(self, column: str, items: Optional[List]) -> str:
+        """
+        Serialize a nested API array for a JSONB column, keeping only the projected keys
+
+        Columns without a projection are stored verbatim.
+        """
+        items = items or []
+        keys = self.jsonb_projection.get(column)
+        if keys is not None:
+            items = [
+                {key: item[key] for key in keys if key in item} if isinstance(item, dict) else item
+                for item in items
+            ]
+        return json.dumps(items, separators=(',', ':'))
+
     def calculate_income_status(self, balance_amount: float, due_date: str) -> str:
         """Calculate status for income record"""
         from datetime import datetime
@@ -371,8 +586,8 @@ class SiengeSync:
             'payment_term_id': payment_term.get('id') if payment_term else None,
             'payment_term_descrition': payment_term.get('descrition') if payment_term else None,  # Typo from API
             'bearer_id': record.get('bearerId'),
-            'receipts': json.dumps(record.get('receipts', [])),
-            'receipts_categories': json.dumps(record.get('receiptsCategories', [])),
+            'receipts': self.project_nested_array('receipts', record.get('receipts')),
+            'receipts_categories': self.project_nested_array('receipts_categories', record.get('receiptsCategories')),
             'status_parcela': self.calculate_income_status(record.get('balanceAmount'), record.get('dueDate'))
         }
 
@@ -447,11 +662,11 @@ class SiengeSync:
             'registered_user_id': record.get('registeredUserId'),
             'registered_by': record.get('registeredBy'),
             'registered_date': record.get('registeredDate'),
-            'payments': json.dumps(record.get('payments', [])),
-            'payments_categories': json.dumps(record.get('paymentsCategories', [])),
-            'departments_costs': json.dumps(record.get('departamentsCosts', [])),
-            'buildings_costs': json.dumps(record.get('buildingsCosts', [])),
-            'authorizations': json.dumps(record.get('authorizations', [])),
+            'payments': self.project_nested_array('payments', record.get('payments')),
+            'payments_categories': self.project_nested_array('payments_categories', record.get('paymentsCategories')),
+            'departments_costs': self.project_nested_array('departments_costs', record.get('departamentsCosts')),
+            'buildings_costs': self.project_nested_array('buildings_costs', record.get('buildingsCosts')),
+            'authorizations': self.project_nested_array('authorizations', record.get('authorizations')),
             'status_parcela': self.calculate_outcome_status(
                 record.get('balanceAmount'),
                 record.get('dueDate'),
@@ -479,7 +694,6 @@ class SiengeSync:
             self.cursor.execute(insert_query, values)
         except psycopg.Error as e:
             logger.error(f"Failed to upsert income record {data.get('installment_id')}: {e}")
-            self.conn.rollback()
             raise
 
     def upsert_outcome_record(self, data: Dict):
@@ -500,9 +714,280 @@ class SiengeSync:
             self.cursor.execute(insert_query, values)
         except psycopg.Error as e:
             logger.error(f"Failed to upsert outcome record {data.get('installment_id')}: {e}")
-            self.conn.rollback()
             raise
 
+    def collect_child_rows(self, data_type: str, parent_id: str, record: Dict,
+                           child_rows: Dict[str, Dict[str, List[tuple]]]):
+        """
+        Explode the nested arrays of a raw API record into child table rows
+
+        Rows are stored in child_rows[table][parent_id] as tuples in the column
+        order of CHILD_TABLES: (parent_id, seq, *element fields). A parent
+        returned twice by the API keeps only its last version.
+        """
+        _, tables = CHILD_TABLES[data_type]
+        for table, (array_key, fields) in tables.items():
+            child_rows.setdefault(table, {})[parent_id] = [
+                (parent_id, seq) + tuple(item.get(key) for _, key in fields)
+                for seq, item in enumerate(record.get(array_key) or [])
+                if isinstance(item, dict)
+            ]
+
+    def replace_child_rows(self, data_type: str, parent_ids: List[str],
+                           child_rows: Dict[str, Dict[str, List[tuple]]]):
+        """
+        Replace the child table rows of the given parents
+
+        Deletes the existing rows of every parent touched by the run and
+        bulk-loads the new ones with COPY, inside the caller's transaction.
+        """
+        if not parent_ids:
+            return
+
+        parent_column, tables = CHILD_TABLES[data_type]
+        for table, (_, fields) in tables.items():
+            columns = [parent_column, 'seq'] + [column for column, _ in fields]
+            rows = [row for parent_rows in child_rows.get(table, {}).values() for row in parent_rows]
+
+            self.cursor.execute(
+                f"DELETE FROM {table} WHERE {parent_column} = ANY(%s)",
+                (parent_ids,)
+            )
+            with self.cursor.copy(f"COPY {table} ({', '.join(columns)}) FROM STDIN") as copy:
+                for row in rows:
+                    copy.write_row(row)
+
+            logger.info(f"Replaced {table}: {len(rows)} rows for {len(parent_ids)} parents")
+
+    def get_touched_months(self, data_type: str, record_ids: List[str]) -> set:
+        """Return the due_date months (None for NULL due dates) of the given records"""
+        if not record_ids:
+            return set()
+
+        source_table, _ = ROLLUP_TABLES[data_type]
+        self.cursor.execute(f"""
+            SELECT DISTINCT DATE_TRUNC('month', due_date)::DATE AS month
+            FROM {source_table}
+            WHERE id = ANY(%s)
+        """, (record_ids,))
+        return {row['month'] for row in self.cursor.fetchall()}
+
+    def refresh_rollup(self, data_type: str, months: Optional[set] = None):
+        """
+        Recompute the monthly rollup rows for the given due_date months (all months if None)
+
+        Runs inside the caller's transaction so the rollup commits together
+        with the data it summarizes.
+        """
+        source_table, rollup_table = ROLLUP_TABLES[data_type]
+        dimensions = ', '.join(ROLLUP_DIMENSIONS)
+
+        if months is None:
+            self.cursor.execute(f"DELETE FROM {rollup_table}")
+            self.cursor.execute(f"""
+                INSERT INTO {rollup_table} (
+                    month, {dimensions}, record_count,
+                    sum_original_amount, sum_balance_amount, sum_corrected_balance_amount
+                )
+                SELECT
+                    DATE_TRUNC('month', due_date)::DATE AS month, {dimensions},
+                    COUNT(*), SUM(original_amount), SUM(balance_amount), SUM(corrected_balance_amount)
+                FROM {source_table}
+                GROUP BY 1, {dimensions}
+            """)
+            logger.info(f"Rebuilt {rollup_table}: {self.cursor.rowcount} rows")
+            return
+
+        if not months:
+            return
+
+        month_list = sorted(m for m in months if m is not None)
+        include_null = None in months
+        first_month = month_list[0] if month_list else None
+        last_month = month_list[-1] if month_list else None
+
+        self.cursor.execute(f"""
+            DELETE FROM {rollup_table}
+            WHERE month = ANY(%s::DATE[]) OR (%s AND month IS NULL)
+        """, (month_list, include_null))
+
+        self.cursor.execute(f"""
+            INSERT INTO {rollup_table} (
+                month, {dimensions}, record_count,
+                sum_original_amount, sum_balance_amount, sum_corrected_balance_amount
+            )
+            SELECT
+                DATE_TRUNC('month', due_date)::DATE AS month, {dimensions},
+                COUNT(*), SUM(original_amount), SUM(balance_amount), SUM(corrected_balance_amount)
+            FROM {source_table}
+            WHERE (due_date >= %s AND due_date < (%s::DATE + INTERVAL '1 month')
+                   AND DATE_TRUNC('month', due_date)::DATE = ANY(%s::DATE[]))
+               OR (%s AND due_date IS NULL)
+            GROUP BY 1, {dimensions}
+        """, (first_month, last_month, month_list, include_null))
+
+        logger.info(f"Refreshed {rollup_table} for {len(months)} months")
+
+    def report_select(self, data_type: str) -> tuple[list, str]:
+        """
+        Build the column list and SELECT expressions that feed REPORT_TABLE
+
+        Returns:
+            Tuple of (target columns, SELECT list over the source table)
+        """
+        source_table, label, movements, own_columns = REPORT_SOURCES[data_type]
+        other_columns = [
+            column for other_type, (_, _, _, columns) in REPORT_SOURCES.items()
+            if other_type != data_type for column in columns
+        ]
+        derived = [
+            ('record_type', f"'{data_type}'"),
+            ('record_type_label', f"'{label}'"),
+            # Movements (receipts / payments)
+            ('total_movimentacoes', f"COALESCE(jsonb_array_length({movements}), 0)"),
+            ('valor_liquido', f"""(SELECT COALESCE(SUM(NULLIF(m->>'netAmount', '')::NUMERIC), 0)
+                                  FROM jsonb_array_elements({movements}) AS m)"""),
+            ('data_ultima_movimentacao', f"""(SELECT MAX(NULLIF(m->>'paymentDate', '')::DATE)
+                                             FROM jsonb_array_elements({movements}) AS m)"""),
+            ('situacao_pagamento', f"""CASE
+                WHEN COALESCE(jsonb_array_length({movements}), 0) = 0 THEN 'Pendente'
+                WHEN COALESCE(balance_amount, 0) <= 0.01 THEN 'Pago'
+                WHEN COALESCE(balance_amount, 0) < COALESCE(original_amount, 0) THEN 'Parcial'
+                ELSE 'Pendente'
+            END"""),
+            ('taxa_inadimplencia', """CASE
+                WHEN COALESCE(original_amount, 0) = 0 THEN 0
+                ELSE ROUND(COALESCE(balance_amount, 0) / original_amount * 100, 2)
+            END"""),
+        ]
+        if data_type == 'outcome':
+            derived += [
+                ('total_departamentos', "COALESCE(jsonb_array_length(departments_costs), 0)"),
+                ('total_edificacoes', "COALESCE(jsonb_array_length(buildings_costs), 0)"),
+                ('total_autorizacoes', "COALESCE(jsonb_array_length(authorizations), 0)"),
+            ]
+
+        columns = REPORT_COMMON_COLUMNS + own_columns + other_columns + [name for name, _ in derived]
+        expressions = (
+            REPORT_COMMON_COLUMNS + own_columns + ['NULL'] * len(other_columns)
+            + [expression for _, expression in derived]
+        )
+        return columns, ',\n                '.join(expressions)
+
+    def refresh_report(self, data_type: str, record_ids: Optional[list] = None):
+        """
+        Rebuild the REPORT_TABLE rows of the given records (all records if None)
+
+        Runs inside the caller's transaction so the report commits together
+        with the data it is derived from.
+        """
+        source_table = REPORT_SOURCES[data_type][0]
+        columns, select_list = self.report_select(data_type)
+
+        if record_ids is None:
+            self.cursor.execute(f"DELETE FROM {REPORT_TABLE} WHERE record_type = %s", (data_type,))
+            where_clause, params = "TRUE", ()
+        else:
+            if not record_ids:
+                return
+            self.cursor.execute(
+                f"DELETE FROM {REPORT_TABLE} WHERE record_type = %s AND id = ANY(%s)",
+                (data_type, record_ids)
+            )
+            where_clause, params = "id = ANY(%s)", (record_ids,)
+
+        self.cursor.execute(f"""
+            INSERT INTO {REPORT_TABLE} ({', '.join(columns)})
+            SELECT
+                {select_list}
+            FROM {source_table}
+            WHERE {where_clause}
+        """, params)
+
+        logger.info(f"Refreshed {REPORT_TABLE} for {self.cursor.rowcount} {data_type} records")
+
+    def rebuild_report(self):
+        """Rebuild REPORT_TABLE from scratch (after migrations or bulk deletes)"""
+        try:
+            self.connect_db()
+            for data_type in REPORT_SOURCES:
+                self.refresh_report(data_type)
+            self.conn.commit()
+            logger.info(f"✅ {REPORT_TABLE} rebuilt")
+        finally:
+            self.close_db()
+
+    def rebuild_rollups(self):
+        """
+        Rebuild the monthly rollup tables from scratch
+
+        A sync only recomputes the months it touched: rows removed by cleanup
+        or changed outside the sync are picked up here.
+        """
+        try:
+            self.connect_db()
+            for data_type in ROLLUP_TABLES:
+                self.refresh_rollup(data_type)
+            self.conn.commit()
+            logger.info("✅ Rollup tables rebuilt")
+        finally:
+            self.close_db()
+
+    def refresh_dimensions(self, data_type: str):
+        """
+        Recompute the DIMENSION_TABLE members of one data type
+
+        A single scan of the source table with GROUPING SETS, one set per
+        dimension. Members are unique per (source, dimension, name): a name
+        shared by several ids keeps the id with most records, and rows are
+        upserted so an overlapping refresh cannot duplicate them. Runs inside
+        the caller's transaction so the catalog commits together with the
+        data it describes.
+        """
+        source_table, dimensions = DIMENSION_SOURCES[data_type]
+        grouping_sets, dimension_cases, id_cases, name_cases = [], [], [], []
+        for dimension in dimensions:
+            id_column, name_column = DIMENSION_COLUMNS[dimension]
+            grouping_sets.append(f"({id_column}, {name_column})" if id_column else f"({name_column})")
+            dimension_cases.append(f"WHEN GROUPING({name_column}) = 0 THEN '{dimension}'")
+            id_cases.append(f"WHEN GROUPING({name_column}) = 0 THEN {id_column or 'NULL'}")
+            name_cases.append(f"WHEN GROUPING({name_column}) = 0 THEN {name_column}")
+
+        self.cursor.execute(f"DELETE FROM {DIMENSION_TABLE} WHERE source = %s", (data_type,))
+        self.cursor.execute(f"""
+            INSERT INTO {DIMENSION_TABLE} (
+                dimension, source, member_id, name, record_count,
+                first_due_date, last_due_date, first_issue_date, last_issue_date
+            )
+            SELECT
+                dimension, %s, (array_agg(member_id ORDER BY record_count DESC))[1], name,
+                SUM(record_count), MIN(first_due_date), MAX(last_due_date),
+                MIN(first_issue_date), MAX(last_issue_date)
+            FROM (
+                SELECT
+                    CASE {' '.join(dimension_cases)} END AS dimension,
+                    CASE {' '.join(id_cases)} END AS member_id,
+                    CASE {' '.join(name_cases)} END AS name,
+                    COUNT(*) AS record_count,
+                    MIN(due_date) AS first_due_date, MAX(due_date) AS last_due_date,
+                    MIN(issue_date) AS first_issue_date, MAX(issue_date) AS last_issue_date
+                FROM {source_table}
+                GROUP BY GROUPING SETS ({', '.join(grouping_sets)})
+            ) members
+            WHERE name IS NOT NULL
+            GROUP BY dimension, name
+            ON CONFLICT (source, dimension, name) DO UPDATE SET
+                member_id = EXCLUDED.member_id,
+                record_count = EXCLUDED.record_count,
+                first_due_date = EXCLUDED.first_due_date,
+                last_due_date = EXCLUDED.last_due_date,
+                first_issue_date = EXCLUDED.first_issue_date,
+                last_issue_date = EXCLUDED.last_issue_date,
+                refreshed_at = NOW()
+        """, (data_type,))
+
+        logger.info(f"Refreshed {DIMENSION_TABLE}: {self.cursor.rowcount} {data_type} members")
+
     def sync_income(self, sync_type: str, start_date: str, end_date: str):
         """Sync income data for the specified date range"""
         logger.info(f"Starting income sync from {start_date} to {end_date}")
@@ -526,17 +1011,42 @@ class SiengeSync:
             success_count = 0
             error_count = 0
 
+            parent_ids = []
+            child_rows = {}
+
+            # Months the records belonged to before this run (due_date may change)
+            record_ids = [f"{r.get('installmentId')}_{r.get('billId')}" for r in records]
+            touched_months = self.get_touched_months('income', record_ids)
+
             # Note: We can't track insert vs update at this level without checking before upsert
             # For now, we'll just track total synced
             for record in records:
                 try:
                     processed_data = self.process_income_record(record)
-                    self.upsert_income_record(processed_data)
+                    # Savepoint per record: a failed upsert only undoes this record,
+                    # the rows already written in the run are kept
+                    with self.conn.transaction():
+                        self.upsert_income_record(processed_data)
+                    parent_ids.append(processed_data['id'])
+                    self.collect_child_rows('income', processed_data['id'], record, child_rows)
                     success_count += 1
                 except Exception as e:
                     logger.error(f"Failed to process income record: {e}")
                     error_count += 1
 
+            # Rebuild exploded child rows for the records touched by this run
+            self.replace_child_rows('income', parent_ids, child_rows)
+
+            # Recompute the monthly rollup for the months touched by this run
+            touched_months |= self.get_touched_months('income', parent_ids)
+            self.refresh_rollup('income', touched_months)
+
+            # Refresh the reporting snapshot for the records of this run
+            self.refresh_report('income', parent_ids)
+
+            # Recompute the dimension catalog (filter dropdowns)
+            self.refresh_dimensions('income')
+
             # Commit the transaction
             self.conn.commit()
 
@@ -573,15 +1083,40 @@ class SiengeSync:
             success_count = 0
             error_count = 0
 
+            parent_ids = []
+            child_rows = {}
+
+            # Months the records belonged to before this run (due_date may change)
+            record_ids = [f"{r.get('installmentId')}_{r.get('billId')}" for r in records]
+            touched_months = self.get_touched_months('outcome', record_ids)
+
             for record in records:
                 try:
                     processed_data = self.process_outcome_record(record)
-                    self.upsert_outcome_record(processed_data)
+                    # Savepoint per record: a failed upsert only undoes this record,
+                    # the rows already written in the run are kept
+                    with self.conn.transaction():
+                        self.upsert_outcome_record(processed_data)
+                    parent_ids.append(processed_data['id'])
+                    self.collect_child_rows('outcome', processed_data['id'], record, child_rows)
                     success_count += 1
                 except Exception as e:
                     logger.error(f"Failed to process outcome record: {e}")
                     error_count += 1
 
+            # Rebuild exploded child rows for the records touched by this run
+            self.replace_child_rows('outcome', parent_ids, child_rows)
+
+            # Recompute the monthly rollup for the months touched by this run
+            touched_months |= self.get_touched_months('outcome', parent_ids)
+            self.refresh_rollup('outcome', touched_months)
+
+            # Refresh the reporting snapshot for the records of this run
+            self.refresh_report('outcome', parent_ids)
+
+            # Recompute the dimension catalog (filter dropdowns)
+            self.refresh_dimensions('outcome')
+
             # Commit the transaction
             self.conn.commit()
 
@@ -648,6 +1183,10 @@ def main():
     parser.add_argument('--end-date', help='End date (YYYY-MM-DD)')
     parser.add_argument('--test-connection', action='store_true',
                        help='Test database connection only')
+    parser.add_argument('--rebuild-report', action='store_true',
+                       help=f'Rebuild the {REPORT_TABLE} reporting table from scratch and exit')
+    parser.add_argument('--rebuild-rollups', action='store_true',
+                       help='Rebuild the monthly rollup tables from scratch and exit')
 
     args = parser.parse_args()
 
@@ -659,6 +1198,10 @@ def main():
         sync.connect_db()
         logger.info("Database connection successful!")
         sync.close_db()
+    elif args.rebuild_report:
+        sync.rebuild_report()
+    elif args.rebuild_rollups:
+        sync.rebuild_rollups()
     else:
         # Run full sync
         sync.run(args.start_date, args.end_date)